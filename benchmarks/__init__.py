@@ -0,0 +1,3 @@
+"""Performance benchmarks for the Numexa SDK. Run from the repository root,
+e.g. `python -m benchmarks.bench_sse_decoder`.
+"""
@@ -0,0 +1,76 @@
+"""Microbenchmark: pydantic chunk models vs lite response views.
+
+Builds each streamed chat completion chunk the way AsyncStream does,
+`cast_to(**payload)`, from already parsed payloads, then reads
+`choices[0].delta.content` off it as a consumer would.
+
+    python -m benchmarks.bench_chunk_models [--chunks 5000]
+"""
+import argparse
+import timeit
+from typing import Any, Dict, List
+
+from numexa.api_resources.lite_responses import LiteChatCompletionChunk
+from numexa.api_resources.utils import ChatCompletionChunk
+
+
+def make_payloads(chunks: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-3.5-turbo",
+            "choices": [
+                {"index": 0, "delta": {"content": f" token{i}"}, "finish_reason": None}
+            ],
+        }
+        for i in range(chunks)
+    ]
+
+
+def consume(cast_to: Any, payloads: List[Dict[str, Any]], read: bool) -> int:
+    count = 0
+    for payload in payloads:
+        chunk = cast_to(**payload)
+        if read:
+            chunk.choices[0].delta.get("content")
+        count += 1
+    return count
+
+
+def bench(chunks: int, repeat: int) -> dict:
+    payloads = make_payloads(chunks)
+    results = {}
+    for read in (False, True):
+        for name, cast_to in (
+            ("ChatCompletionChunk", ChatCompletionChunk),
+            ("LiteChatCompletionChunk", LiteChatCompletionChunk),
+        ):
+            best = min(
+                timeit.repeat(
+                    lambda: consume(cast_to, payloads, read), number=1, repeat=repeat
+                )
+            )
+            results[(name, read)] = chunks / best
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    results = bench(args.chunks, args.repeat)
+    for read in (False, True):
+        label = "build + read" if read else "build only"
+        old = results[("ChatCompletionChunk", read)]
+        new = results[("LiteChatCompletionChunk", read)]
+        print(
+            f"{label:<13} pydantic {old:>12,.0f} chunks/s   "
+            f"lite {new:>12,.0f} chunks/s   x{new / old:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""End-to-end benchmark of APIClient against the local mock upstream.
+
+Runs the single, fallback, ab_test and streaming paths through
+`APIClient.post` over real sockets to `benchmarks.mock_server`, and reports
+throughput, latency percentiles, time to first token for streams, and
+memory allocated while a smaller run is traced. In the fallback scenario the
+first llm always answers 503, so every call pays for one failed attempt.
+Client and server share one event loop, so numbers are relative: compare
+runs on the same machine.
+
+    python -m benchmarks.bench_client [--requests 2000] [--concurrency 50]
+        [--scenario streaming] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import platform
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from numexa import ChatCompletion, ChatCompletionChunk, LLMOptions, Params
+from numexa.api_resources.base_client import APIClient
+from numexa.api_resources.latency import percentile
+from numexa.api_resources.streaming import AsyncStream
+from numexa.version import VERSION
+
+from .mock_server import LATENCY_DISTRIBUTIONS, MockServer
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "single": {"mode": "single", "models": ["model-a"]},
+    "fallback": {"mode": "fallback", "models": ["model-down", "model-a"]},
+    "ab_test": {"mode": "ab_test", "models": ["model-a", "model-b"], "weights": [3, 1]},
+    "streaming": {"mode": "single", "models": ["model-a"], "stream": True},
+}
+MESSAGES = [{"role": "user", "content": "Say something."}]
+
+
+def targets(models: List[str]) -> List[LLMOptions]:
+    # No retries: the bench measures the routing path, not backoff sleeps.
+    return [
+        LLMOptions(
+            provider="openai",
+            model=m,
+            api_key="bench",
+            retry={"attempts": 0, "on_status_codes": []},
+        )
+        for m in models
+    ]
+
+
+async def call(client: APIClient, scenario: Dict[str, Any]) -> Dict[str, float]:
+    stream = scenario.get("stream", False)
+    start = time.perf_counter()
+    res = await client.post(
+        "/chat/completions",
+        body=targets(scenario["models"]),
+        mode=scenario["mode"],
+        params=Params(messages=MESSAGES),
+        cast_to=ChatCompletion,
+        stream_cls=AsyncStream[ChatCompletionChunk],
+        stream=stream,
+        weights=scenario.get("weights"),
+    )
+    timing = {}
+    if stream:
+        async for _ in res:
+            if "ttft" not in timing:
+                timing["ttft"] = time.perf_counter() - start
+    timing["latency"] = time.perf_counter() - start
+    return timing
+
+
+async def run_requests(
+    client: APIClient, scenario: Dict[str, Any], requests: int, concurrency: int
+) -> Dict[str, Any]:
+    timings: List[Dict[str, float]] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            try:
+                timings.append(await call(client, scenario))
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"timings": timings, "errors": errors, "elapsed": elapsed}
+
+
+def ms(values: List[float], q: float) -> Optional[float]:
+    return round(percentile(values, q) * 1000, 3) if values else None
+
+
+async def bench_scenario(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    scenario = SCENARIOS[name]
+    server = MockServer(
+        latency_ms=args.latency_ms,
+        distribution=args.distribution,
+        tokens=args.tokens,
+        token_rate=args.token_rate,
+        error_rate=args.error_rate,
+        failing_models=["model-down"],
+        seed=args.seed,
+    )
+    async with server:
+        client = APIClient(base_url=server.base_url, api_key="bench")
+        try:
+            await run_requests(client, scenario, args.concurrency, args.concurrency)
+            run = await run_requests(client, scenario, args.requests, args.concurrency)
+
+            tracemalloc.start()
+            baseline, _ = tracemalloc.get_traced_memory()
+            await run_requests(client, scenario, args.alloc_requests, args.concurrency)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            await client.aclose()
+
+    latencies = [t["latency"] for t in run["timings"]]
+    ttfts = [t["ttft"] for t in run["timings"] if "ttft" in t]
+    return {
+        "requests": args.requests,
+        "errors": run["errors"],
+        "elapsed_s": round(run["elapsed"], 4),
+        "rps": round(len(latencies) / run["elapsed"], 2),
+        "latency_p50_ms": ms(latencies, 50),
+        "latency_p90_ms": ms(latencies, 90),
+        "latency_p99_ms": ms(latencies, 99),
+        "ttft_p50_ms": ms(ttfts, 50),
+        "ttft_p99_ms": ms(ttfts, 99),
+        "alloc_peak_kib": round((peak - baseline) / 1024, 1),
+        "alloc_retained_kib": round((current - baseline) / 1024, 1),
+        "upstream_requests": server.requests,
+    }
+
+
+async def bench(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    for name in args.scenario or list(SCENARIOS):
+        results[name] = await bench_scenario(name, args)
+    return {
+        "sdk_version": VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            k: v for k, v in vars(args).items() if k not in ("output", "scenario")
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--alloc-requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--tokens", type=int, default=50)
+    parser.add_argument("--token-rate", type=float, default=2000.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    report = asyncio.run(bench(args))
+    for name, result in report["results"].items():
+        ttft = result["ttft_p50_ms"]
+        print(
+            f"{name:<10} {result['rps']:>9,.1f} rps   "
+            f"p50 {result['latency_p50_ms']:>8.2f} ms   "
+            f"p99 {result['latency_p99_ms']:>8.2f} ms   "
+            + (f"ttft p50 {ttft:>7.2f} ms   " if ttft is not None else "")
+            + f"errors {result['errors']}   "
+            f"alloc peak {result['alloc_peak_kib']:,.0f} KiB"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Microbenchmark: standard library json vs the installed json_codec backends.
+
+Times the three hot paths of a call: encoding a chat request body, decoding
+a chat completion response and decoding the `data` payloads of a stream.
+
+    python -m benchmarks.bench_json_codec [--messages 20] [--chunks 2000]
+"""
+import argparse
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from numexa.api_resources.json_codec import _BACKENDS, _stdlib_dumps, _stdlib_loads
+
+
+def make_request(messages: int) -> Dict[str, Any]:
+    return {
+        "model": "gpt-3.5-turbo",
+        "temperature": 0.2,
+        "max_tokens": 512,
+        "messages": [
+            {
+                "role": "user" if i % 2 == 0 else "assistant",
+                "content": f"Message {i}: " + "lorem ipsum dolor sit amet " * 20,
+            }
+            for i in range(messages)
+        ],
+    }
+
+
+def make_response(dumps: Callable[..., bytes]) -> bytes:
+    return dumps(
+        {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-3.5-turbo",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "lorem ipsum " * 200},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 900, "completion_tokens": 400, "total_tokens": 1300},
+        }
+    )
+
+
+def make_chunks(dumps: Callable[..., bytes], chunks: int) -> List[bytes]:
+    return [
+        dumps(
+            {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "gpt-3.5-turbo",
+                "choices": [
+                    {"index": 0, "delta": {"content": f" token{i}"}, "finish_reason": None}
+                ],
+            }
+        )
+        for i in range(chunks)
+    ]
+
+
+def codecs() -> List[Tuple[str, Callable[..., bytes], Callable[[Any], Any]]]:
+    found = [("json", _stdlib_dumps, _stdlib_loads)]
+    for name, load in _BACKENDS.items():
+        try:
+            found.append((name, *load()))
+        except ImportError:
+            pass
+    return found
+
+
+def bench(messages: int, chunks: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    request = make_request(messages)
+    response = make_response(_stdlib_dumps)
+    payloads = make_chunks(_stdlib_dumps, chunks)
+    results: Dict[str, Dict[str, float]] = {}
+    for name, dumps, loads in codecs():
+        cases = {
+            "encode request": (lambda: dumps(request), 1),
+            "decode response": (lambda: loads(response), 1),
+            "decode chunks": (lambda: [loads(p) for p in payloads], chunks),
+        }
+        results[name] = {
+            case: count / min(timeit.repeat(run, number=1, repeat=repeat))
+            for case, (run, count) in cases.items()
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    results = bench(args.messages, args.chunks, args.repeat)
+    baseline = results["json"]
+    for case in baseline:
+        line = f"{case:<16} json {baseline[case]:>12,.0f}/s"
+        for name, rates in results.items():
+            if name != "json":
+                line += f"   {name} {rates[case]:>12,.0f}/s x{rates[case] / baseline[case]:.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Microbenchmark: line-based SSEDecoder vs byte-level SSEBytesDecoder.
+
+Both decoders are fed the same streamed chat completion, cut into network
+sized chunks. The line path is what AsyncStream used to do: split the bytes
+into lines, decode each to `str`, run `SSEDecoder.decode` and parse the
+payload from text. The byte path feeds the chunks to `SSEBytesDecoder` and
+parses the payload straight from bytes.
+
+    python -m benchmarks.bench_sse_decoder [--tokens 2000] [--chunk-size 512]
+"""
+import argparse
+import json
+import timeit
+from typing import Iterator, List
+
+from numexa.api_resources.streaming import SSEBytesDecoder, SSEDecoder
+
+
+def make_body(tokens: int) -> bytes:
+    events = []
+    for i in range(tokens):
+        chunk = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-3.5-turbo",
+            "choices": [
+                {"index": 0, "delta": {"content": f" token{i}"}, "finish_reason": None}
+            ],
+        }
+        events.append(f"data: {json.dumps(chunk)}\r\n\r\n")
+    events.append("data: [DONE]\r\n\r\n")
+    return "".join(events).encode("utf-8")
+
+
+def split(body: bytes, chunk_size: int) -> List[bytes]:
+    return [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+
+def iter_lines(chunks: List[bytes]) -> Iterator[str]:
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        lines = buffer.splitlines(keepends=True)
+        buffer = lines.pop() if lines and not lines[-1].endswith(b"\n") else b""
+        for line in lines:
+            yield line.rstrip(b"\r\n").decode("utf-8")
+
+
+def line_decoder(chunks: List[bytes], parse: bool) -> int:
+    count = 0
+    for sse in SSEDecoder().iter(iter_lines(chunks)):
+        if parse:
+            sse.json()
+        count += 1
+    return count
+
+
+def bytes_decoder(chunks: List[bytes], parse: bool) -> int:
+    count = 0
+    decoder = SSEBytesDecoder()
+    for chunk in chunks:
+        for sse in decoder.feed(chunk):
+            if parse:
+                sse.json()
+            count += 1
+    return count
+
+
+def bench(tokens: int, chunk_size: int, repeat: int) -> dict:
+    chunks = split(make_body(tokens), chunk_size)
+    assert line_decoder(chunks, True) == bytes_decoder(chunks, True) == tokens + 1
+    results = {}
+    for parse in (False, True):
+        for name, fn in (("SSEDecoder", line_decoder), ("SSEBytesDecoder", bytes_decoder)):
+            best = min(
+                timeit.repeat(lambda: fn(chunks, parse), number=1, repeat=repeat)
+            )
+            results[(name, parse)] = (tokens + 1) / best
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    results = bench(args.tokens, args.chunk_size, args.repeat)
+    for parse in (False, True):
+        label = "decode + json" if parse else "decode only"
+        old = results[("SSEDecoder", parse)]
+        new = results[("SSEBytesDecoder", parse)]
+        print(
+            f"{label:<14} SSEDecoder {old:>12,.0f} events/s   "
+            f"SSEBytesDecoder {new:>12,.0f} events/s   x{new / old:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
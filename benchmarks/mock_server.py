@@ -0,0 +1,231 @@
+"""Local mock of an OpenAI-style `/chat/completions` upstream.
+
+A plain asyncio HTTP/1.1 server with keep-alive, so benchmarks exercise real
+sockets and connection pooling instead of an in-process transport. Each
+request waits for a latency drawn from the configured distribution, then
+answers with a chat completion, or with a streamed one (SSE over chunked
+encoding) paced at `token_rate` tokens per second. A share `error_rate` of
+requests, and every request for a model in `failing_models`, gets a 503.
+
+The server streams when the request body has `"stream": true`, or for
+every request when started with `stream=True`.
+
+    python -m benchmarks.mock_server --port 8080 --latency-ms 50 --stream
+"""
+import argparse
+import asyncio
+import json
+import random
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+class MockServer:
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 20.0,
+        distribution: str = "lognormal",
+        tokens: int = 50,
+        token_rate: float = 500.0,
+        error_rate: float = 0.0,
+        failing_models: Iterable[str] = (),
+        stream: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of {LATENCY_DISTRIBUTIONS}")
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.tokens = tokens
+        self.token_rate = token_rate
+        self.error_rate = error_rate
+        self.failing_models = set(failing_models)
+        self.stream = stream
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "MockServer":
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "MockServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.stop()
+
+    def latency(self) -> float:
+        """One latency sample, in seconds, with mean `latency_ms`."""
+        mean = self.latency_ms / 1000
+        if self.distribution == "fixed":
+            return mean
+        if self.distribution == "uniform":
+            return self._random.uniform(0, 2 * mean)
+        if self.distribution == "exponential":
+            return self._random.expovariate(1 / mean) if mean > 0 else 0.0
+        # Lognormal with sigma 0.5: a long tail, like real upstreams.
+        sigma = 0.5
+        mu = -sigma**2 / 2
+        return mean * self._random.lognormvariate(mu, sigma)
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                self.requests += 1
+                await self._respond(request, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(
+        self, request: Tuple[str, Dict[str, Any]], writer: asyncio.StreamWriter
+    ) -> None:
+        path, body = request
+        model = body.get("model", "")
+        await asyncio.sleep(self.latency())
+        if not path.endswith("/chat/completions"):
+            return await _write_json(writer, 404, {"error": {"message": "not found"}})
+        if model in self.failing_models or self._random.random() < self.error_rate:
+            return await _write_json(
+                writer, 503, {"error": {"message": "mock upstream unavailable"}}
+            )
+        if body.get("stream") or self.stream:
+            return await self._write_stream(writer, model)
+        return await _write_json(writer, 200, completion(model, self.tokens))
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, model: str) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        delay = 1 / self.token_rate if self.token_rate > 0 else 0.0
+        for i in range(self.tokens):
+            event = f"data: {json.dumps(chunk(model, f' tok{i}'))}\n\n".encode()
+            writer.write(b"%x\r\n%s\r\n" % (len(event), event))
+            await writer.drain()
+            if delay:
+                await asyncio.sleep(delay)
+        done = b"data: [DONE]\n\n"
+        writer.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(done), done))
+        await writer.drain()
+
+
+def completion(model: str, tokens: int) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "created": 0,
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {
+                    "role": "assistant",
+                    "content": "".join(f" tok{i}" for i in range(tokens)),
+                },
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 10, "completion_tokens": tokens, "total_tokens": 10 + tokens},
+    }
+
+
+def chunk(model: str, content: str) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": model,
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+    }
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    lines = head.decode("latin-1").split("\r\n")
+    _, path, _ = lines[0].split(" ", 2)
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    raw = await reader.readexactly(length) if length else b""
+    return path, json.loads(raw) if raw else {}
+
+
+async def _write_json(writer: asyncio.StreamWriter, status: int, payload: Any) -> None:
+    body = json.dumps(payload).encode()
+    reason = {200: "OK", 404: "Not Found", 503: "Service Unavailable"}[status]
+    writer.write(
+        f"HTTP/1.1 {status} {reason}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--tokens", type=int, default=50)
+    parser.add_argument("--token-rate", type=float, default=500.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--failing-model", action="append", default=[])
+    parser.add_argument("--stream", action="store_true")
+    args = parser.parse_args()
+
+    async def serve() -> None:
+        server = MockServer(
+            host=args.host,
+            port=args.port,
+            latency_ms=args.latency_ms,
+            distribution=args.distribution,
+            tokens=args.tokens,
+            token_rate=args.token_rate,
+            error_rate=args.error_rate,
+            failing_models=args.failing_model,
+            stream=args.stream,
+        )
+        await server.start()
+        print(f"Serving on {server.base_url}")
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
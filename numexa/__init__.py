@@ -15,11 +15,33 @@ from numexa.api_resources import (
     Params,
     Config,
     RetrySettings,
+    RateLimitSettings,
+    HedgingSettings,
+    CircuitBreakerSettings,
+    AdaptiveConcurrencySettings,
+    TimeoutSettings,
+    StreamSettings,
     ChatCompletion,
     ChatCompletionChunk,
     TextCompletion,
     TextCompletionChunk,
     Generations,
+    close_clients,
+    AsyncStream,
+    BatchResults,
+    BatchStats,
+    CacheBackend,
+    InMemoryCache,
+    SQLiteCache,
+    RedisCache,
+    SemanticCache,
+    LiteResponse,
+    LiteChatCompletion,
+    LiteChatCompletionChunk,
+    LiteTextCompletion,
+    LiteTextCompletionChunk,
+    RawResponse,
+    RawStream,
 )
 from numexa.version import VERSION
 from numexa.api_resources.global_constants import (
@@ -39,6 +61,8 @@ else:
         raise Exception("IF NUMEXA_PROXY Is not set then please set OPEN_API_KEY os.environ['OPEN_API_KEY']='Bearer YOUR_KEY'")
 config: Optional[Config] = None
 mode: Optional[Union[Modes, ModesLiteral]] = None
+cache_backend: Optional[CacheBackend] = None
+semantic_cache_backend: Optional[SemanticCache] = None
 __version__ = VERSION
 __all__ = [
     "LLMOptions",
@@ -54,11 +78,33 @@ __all__ = [
     "Completions",
     "Params",
     "RetrySettings",
+    "RateLimitSettings",
+    "HedgingSettings",
+    "CircuitBreakerSettings",
+    "AdaptiveConcurrencySettings",
+    "TimeoutSettings",
+    "StreamSettings",
     "ChatCompletion",
     "ChatCompletionChunk",
     "TextCompletion",
     "TextCompletionChunk",
     "Generations",
+    "close_clients",
+    "AsyncStream",
+    "BatchResults",
+    "BatchStats",
+    "CacheBackend",
+    "InMemoryCache",
+    "SQLiteCache",
+    "RedisCache",
+    "SemanticCache",
+    "LiteResponse",
+    "LiteChatCompletion",
+    "LiteChatCompletionChunk",
+    "LiteTextCompletion",
+    "LiteTextCompletionChunk",
+    "RawResponse",
+    "RawStream",
     "Config",
     "api_key",
     "base_url",
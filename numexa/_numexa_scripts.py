@@ -1,6 +1,52 @@
 """main file"""
 import argparse
+import asyncio
+import json
 from .version import VERSION
+from .api_resources.global_constants import (
+    DEFAULT_BATCH_CONCURRENCY,
+    DEFAULT_CHECKPOINT_EVERY,
+)
+
+
+def _batch_config(args):
+    """Build the Config for `numexa batch` from --config or --provider/--model."""
+    from .api_resources.utils import Config, LLMOptions
+
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            return Config(**json.load(f))
+    if args.model:
+        return Config(
+            mode=args.mode,
+            llms=[LLMOptions(provider=args.provider, model=m) for m in args.model],
+        )
+    return None
+
+
+def batch(args):
+    """Run a JSONL file of chat requests and write the results."""
+    from .api_resources.batch import run_batch
+    from .api_resources.client import close_clients
+
+    async def run():
+        try:
+            return await run_batch(
+                args.input,
+                args.output,
+                config=_batch_config(args),
+                concurrency=args.concurrency,
+                resume=not args.no_resume,
+                checkpoint_every=args.checkpoint_every,
+            )
+        finally:
+            await close_clients()
+
+    summary = asyncio.run(run())
+    print(
+        f"{summary['succeeded']} succeeded, {summary['failed']} failed, "
+        f"{summary['skipped']} skipped in {summary['elapsed']:.1f}s"
+    )
 
 
 def main():
@@ -13,8 +59,48 @@ def main():
         version=f"Numexa {VERSION}",
         help="Print version and exit.",
     )
+    commands = parser.add_subparsers(dest="command")
+
+    batch_parser = commands.add_parser(
+        "batch", help="Run a JSONL file of chat completion requests."
+    )
+    batch_parser.add_argument(
+        "input", help="JSONL file, one object of ChatCompletions.create args per line."
+    )
+    batch_parser.add_argument(
+        "output", help="JSONL file the results are appended to, by line index."
+    )
+    batch_parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_BATCH_CONCURRENCY, help="Requests in flight at once."
+    )
+    batch_parser.add_argument(
+        "--config", help="JSON file with the numexa Config to use."
+    )
+    batch_parser.add_argument(
+        "--mode", default="single", help="Mode used with --model: single, fallback, ab_test."
+    )
+    batch_parser.add_argument(
+        "--provider", default="openai", help="Provider used with --model."
+    )
+    batch_parser.add_argument(
+        "--model", action="append", help="Target model, repeat for several llms."
+    )
+    batch_parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=DEFAULT_CHECKPOINT_EVERY,
+        help="Save progress after this many results.",
+    )
+    batch_parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Start over instead of resuming from the last checkpoint.",
+    )
+    batch_parser.set_defaults(func=batch)
 
-    _ = parser.parse_args()
+    args = parser.parse_args()
+    if getattr(args, "func", None) is not None:
+        args.func(args)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,20 @@
 """"""
 from .apis import ChatCompletions, Completions, Generations
+from .batch import BatchResults, BatchStats
+from .cache import CacheBackend, InMemoryCache
+from .disk_cache import SQLiteCache
+from .redis_cache import RedisCache
+from .semantic_cache import SemanticCache
+from .lite_responses import (
+    LiteResponse,
+    LiteChatCompletion,
+    LiteChatCompletionChunk,
+    LiteTextCompletion,
+    LiteTextCompletionChunk,
+)
+from .client import close_clients
+from .streaming import AsyncStream
+from .raw import RawResponse, RawStream
 from .utils import (
     Modes,
     ModesLiteral,
@@ -13,6 +28,12 @@ from .utils import (
     Params,
     Config,
     RetrySettings,
+    RateLimitSettings,
+    HedgingSettings,
+    CircuitBreakerSettings,
+    AdaptiveConcurrencySettings,
+    TimeoutSettings,
+    StreamSettings,
     ChatCompletion,
     ChatCompletionChunk,
     TextCompletion,
@@ -37,9 +58,31 @@ __all__ = [
     "Params",
     "Config",
     "RetrySettings",
+    "RateLimitSettings",
+    "HedgingSettings",
+    "CircuitBreakerSettings",
+    "AdaptiveConcurrencySettings",
+    "TimeoutSettings",
+    "StreamSettings",
     "ChatCompletion",
     "ChatCompletionChunk",
     "TextCompletion",
     "TextCompletionChunk",
     "Generations",
+    "close_clients",
+    "AsyncStream",
+    "BatchResults",
+    "BatchStats",
+    "CacheBackend",
+    "InMemoryCache",
+    "SQLiteCache",
+    "RedisCache",
+    "SemanticCache",
+    "LiteResponse",
+    "LiteChatCompletion",
+    "LiteChatCompletionChunk",
+    "LiteTextCompletion",
+    "LiteTextCompletionChunk",
+    "RawResponse",
+    "RawStream",
 ]
@@ -1,6 +1,20 @@
 import os
-from typing import Optional, Union, overload, Literal, List, Mapping, Any
+from functools import partial
+from typing import (
+    Optional,
+    Union,
+    overload,
+    Literal,
+    List,
+    Mapping,
+    Any,
+    Iterable,
+    Sequence,
+)
 from numexa.api_resources.base_client import APIClient
+from numexa.api_resources.client import get_client
+from .batch import BatchRun, BatchResults, collect
+from .global_constants import DEFAULT_BATCH_CONCURRENCY
 from .utils import (
     Modes,
     Config,
@@ -14,7 +28,8 @@ from .utils import (
     GenericResponse,
 )
 
-from .streaming import Stream
+from .streaming import AsyncStream
+from .raw import RawResponse, RawStream
 
 __all__ = ["Completions", "ChatCompletions"]
 
@@ -50,8 +65,10 @@ class Completions(APIResource):
         max_tokens: Optional[int] = None,
         top_k: Optional[int] = None,
         top_p: Optional[float] = None,
+        weights: Optional[List[float]] = None,
+        raw: Literal[False] = False,
         **kwargs,
-    ) -> Stream[TextCompletionChunk]:
+    ) -> AsyncStream[TextCompletionChunk]:
         ...
 
     @classmethod
@@ -66,10 +83,48 @@ class Completions(APIResource):
         max_tokens: Optional[int] = None,
         top_k: Optional[int] = None,
         top_p: Optional[float] = None,
+        weights: Optional[List[float]] = None,
+        raw: Literal[False] = False,
         **kwargs,
     ) -> TextCompletion:
         ...
 
+    @classmethod
+    @overload
+    async def create(
+        cls,
+        *,
+        prompt: Optional[str] = None,
+        config: Optional[Config] = None,
+        stream: Literal[True],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        top_k: Optional[int] = None,
+        top_p: Optional[float] = None,
+        weights: Optional[List[float]] = None,
+        raw: Literal[True],
+        **kwargs,
+    ) -> RawStream:
+        ...
+
+    @classmethod
+    @overload
+    async def create(
+        cls,
+        *,
+        prompt: Optional[str] = None,
+        config: Optional[Config] = None,
+        stream: Literal[False] = False,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        top_k: Optional[int] = None,
+        top_p: Optional[float] = None,
+        weights: Optional[List[float]] = None,
+        raw: Literal[True],
+        **kwargs,
+    ) -> RawResponse:
+        ...
+
     @classmethod
     @overload
     async def create(
@@ -82,8 +137,10 @@ class Completions(APIResource):
         max_tokens: Optional[int] = None,
         top_k: Optional[int] = None,
         top_p: Optional[float] = None,
+        weights: Optional[List[float]] = None,
+        raw: bool = False,
         **kwargs,
-    ) -> Union[TextCompletion, Stream[TextCompletionChunk]]:
+    ) -> Union[TextCompletion, AsyncStream[TextCompletionChunk], RawResponse, RawStream]:
         ...
 
     @classmethod
@@ -97,11 +154,18 @@ class Completions(APIResource):
         max_tokens: Optional[int] = None,
         top_k: Optional[int] = None,
         top_p: Optional[float] = None,
+        weights: Optional[List[float]] = None,
+        raw: bool = False,
         **kwargs,
-    ) -> Union[TextCompletion, Stream[TextCompletionChunk]]:
+    ) -> Union[TextCompletion, AsyncStream[TextCompletionChunk], RawResponse, RawStream]:
         if config is None:
             config = retrieve_config()
-        _client = APIClient(api_key=config.api_key, base_url=config.base_url)
+        cast_to, stream_cls = (
+            (RawResponse, RawStream)
+            if raw
+            else (TextCompletion, AsyncStream[TextCompletionChunk])
+        )
+        _client = get_client(api_key=config.api_key, base_url=config.base_url)
         params = Params(
             prompt=prompt,
             temperature=temperature,
@@ -112,33 +176,39 @@ class Completions(APIResource):
         )
         if config.mode == Modes.SINGLE.value:
             return await cls(_client)._post(
-                "/v1/complete",
+                "/complete",
                 body=config.llms,
                 mode=Modes.SINGLE.value,
                 params=params,
-                cast_to=TextCompletion,
-                stream_cls=Stream[TextCompletionChunk],
+                cast_to=cast_to,
+                stream_cls=stream_cls,
                 stream=stream,
+                weights=weights,
+                config=config,
             )
         if config.mode == Modes.FALLBACK.value:
             return await cls(_client)._post(
-                "/v1/complete",
+                "/complete",
                 body=config.llms,
                 mode=Modes.FALLBACK,
                 params=params,
-                cast_to=TextCompletion,
-                stream_cls=Stream[TextCompletionChunk],
+                cast_to=cast_to,
+                stream_cls=stream_cls,
                 stream=stream,
+                weights=weights,
+                config=config,
             )
         if config.mode == Modes.AB_TEST.value:
             return await cls(_client)._post(
-                "/v1/complete",
+                "/complete",
                 body=config.llms,
                 mode=Modes.AB_TEST,
                 params=params,
-                cast_to=TextCompletion,
-                stream_cls=Stream[TextCompletionChunk],
+                cast_to=cast_to,
+                stream_cls=stream_cls,
                 stream=stream,
+                weights=weights,
+                config=config,
             )
         raise NotImplementedError("Mode not implemented.")
 
@@ -156,8 +226,10 @@ class ChatCompletions(APIResource):
         max_tokens: Optional[int] = None,
         top_k: Optional[int] = None,
         top_p: Optional[float] = None,
+        weights: Optional[List[float]] = None,
+        raw: Literal[False] = False,
         **kwargs,
-    ) -> Stream[ChatCompletionChunk]:
+    ) -> AsyncStream[ChatCompletionChunk]:
         ...
 
     @classmethod
@@ -172,10 +244,48 @@ class ChatCompletions(APIResource):
         max_tokens: Optional[int] = None,
         top_k: Optional[int] = None,
         top_p: Optional[float] = None,
+        weights: Optional[List[float]] = None,
+        raw: Literal[False] = False,
         **kwargs,
     ) -> ChatCompletion:
         ...
 
+    @classmethod
+    @overload
+    async def create(
+        cls,
+        *,
+        messages: Optional[List[Message]] = None,
+        config: Optional[Config] = None,
+        stream: Literal[True],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        top_k: Optional[int] = None,
+        top_p: Optional[float] = None,
+        weights: Optional[List[float]] = None,
+        raw: Literal[True],
+        **kwargs,
+    ) -> RawStream:
+        ...
+
+    @classmethod
+    @overload
+    async def create(
+        cls,
+        *,
+        messages: Optional[List[Message]] = None,
+        config: Optional[Config] = None,
+        stream: Literal[False] = False,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        top_k: Optional[int] = None,
+        top_p: Optional[float] = None,
+        weights: Optional[List[float]] = None,
+        raw: Literal[True],
+        **kwargs,
+    ) -> RawResponse:
+        ...
+
     @classmethod
     @overload
     async def create(
@@ -188,8 +298,10 @@ class ChatCompletions(APIResource):
         max_tokens: Optional[int] = None,
         top_k: Optional[int] = None,
         top_p: Optional[float] = None,
+        weights: Optional[List[float]] = None,
+        raw: bool = False,
         **kwargs,
-    ) -> Union[ChatCompletion, Stream[ChatCompletionChunk]]:
+    ) -> Union[ChatCompletion, AsyncStream[ChatCompletionChunk], RawResponse, RawStream]:
         ...
 
     @classmethod
@@ -203,11 +315,18 @@ class ChatCompletions(APIResource):
         max_tokens: Optional[int] = None,
         top_k: Optional[int] = None,
         top_p: Optional[float] = None,
+        weights: Optional[List[float]] = None,
+        raw: bool = False,
         **kwargs,
-    ) -> Union[ChatCompletion, Stream[ChatCompletionChunk]]:
+    ) -> Union[ChatCompletion, AsyncStream[ChatCompletionChunk], RawResponse, RawStream]:
         if config is None:
             config = retrieve_config()
-        _client = APIClient(api_key=config.api_key, base_url=config.base_url)
+        cast_to, stream_cls = (
+            (RawResponse, RawStream)
+            if raw
+            else (ChatCompletion, AsyncStream[ChatCompletionChunk])
+        )
+        _client = get_client(api_key=config.api_key, base_url=config.base_url)
         params = Params(
             messages=messages,
             temperature=temperature,
@@ -228,9 +347,11 @@ class ChatCompletions(APIResource):
                 body=config.llms,
                 mode=Modes.SINGLE.value,
                 params=params,
-                cast_to=ChatCompletion,
-                stream_cls=Stream[ChatCompletionChunk],
+                cast_to=cast_to,
+                stream_cls=stream_cls,
                 stream=stream,
+                weights=weights,
+                config=config,
             )
         if config.mode == Modes.FALLBACK.value:
             return await cls(_client)._post(
@@ -238,9 +359,11 @@ class ChatCompletions(APIResource):
                 body=config.llms,
                 mode=Modes.FALLBACK,
                 params=params,
-                cast_to=ChatCompletion,
-                stream_cls=Stream[ChatCompletionChunk],
+                cast_to=cast_to,
+                stream_cls=stream_cls,
                 stream=stream,
+                weights=weights,
+                config=config,
             )
         if config.mode == Modes.AB_TEST.value:
             return await cls(_client)._post(
@@ -248,12 +371,61 @@ class ChatCompletions(APIResource):
                 body=config.llms,
                 mode=Modes.AB_TEST,
                 params=params,
-                cast_to=ChatCompletion,
-                stream_cls=Stream[ChatCompletionChunk],
+                cast_to=cast_to,
+                stream_cls=stream_cls,
                 stream=stream,
+                weights=weights,
+                config=config,
             )
         raise NotImplementedError("Mode not implemented.")
 
+    @classmethod
+    def iter_many(
+        cls,
+        requests: Iterable[Mapping[str, Any]],
+        *,
+        config: Optional[Config] = None,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> BatchRun:
+        """Run `create()` for each request, yielding `(index, result)` as they
+        complete. Each request is a dict of `create()` arguments; `kwargs` are
+        shared by all of them. The run's `stats` summarise the batch.
+        """
+        if config is None:
+            config = retrieve_config()
+        return BatchRun(
+            partial(cls.create, config=config, **kwargs),
+            requests,
+            concurrency=concurrency,
+            return_exceptions=return_exceptions,
+        )
+
+    @classmethod
+    async def create_many(
+        cls,
+        requests: Sequence[Mapping[str, Any]],
+        *,
+        config: Optional[Config] = None,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> BatchResults:
+        """Run `create()` for each request, at most `concurrency` at a time, and
+        return the results in input order. The first failure is raised unless
+        `return_exceptions` is set, in which case it takes the place of its
+        result.
+        """
+        run = cls.iter_many(
+            requests,
+            config=config,
+            concurrency=concurrency,
+            return_exceptions=return_exceptions,
+            **kwargs,
+        )
+        return await collect(run, len(requests))
+
 
 class Generations(APIResource):
     @classmethod
@@ -263,10 +435,10 @@ class Generations(APIResource):
         prompt_id: str,
         config: Optional[Config] = None,
         variables: Optional[Mapping[str, Any]] = None,
-    ) -> Union[GenericResponse, Stream[GenericResponse]]:
+    ) -> Union[GenericResponse, AsyncStream[GenericResponse]]:
         if config is None:
             config = retrieve_config()
-        _client = APIClient(api_key=config.api_key, base_url=config.base_url)
+        _client = get_client(api_key=config.api_key, base_url=config.base_url)
         body = {"variables": variables}
         return await cls(_client)._post(
             f"/v1/prompts/{prompt_id}/generate",
@@ -274,6 +446,7 @@ class Generations(APIResource):
             mode=None,
             params=None,
             cast_to=GenericResponse,
-            stream_cls=Stream[GenericResponse],
+            stream_cls=AsyncStream[GenericResponse],
             stream=False,
+            config=config,
         )
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
 import os
-import socket
-from datetime import datetime
+import time
+from collections import OrderedDict
 from types import TracebackType
 from typing import (
     Dict,
@@ -14,13 +15,25 @@ from typing import (
     List,
     Optional,
     Type,
+    Tuple,
+    Callable,
+    Awaitable,
     overload,
     Literal,
     get_args,
+    get_origin,
 )
 import httpx
 import platform
-from .global_constants import NUMEXA_HEADER_PREFIX, OPEN_API_KEY, NUMEXA_INGEST_LOGS
+from .global_constants import (
+    NUMEXA_HEADER_PREFIX,
+    OPEN_API_KEY,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_KEEPALIVE_EXPIRY,
+    DEFAULT_MAX_ROUTERS,
+    DEFAULT_SEMANTIC_CACHE_THRESHOLD,
+)
 from .utils import (
     remove_empty_values,
     Body,
@@ -31,16 +44,51 @@ from .utils import (
     Params,
     Constructs,
     NumexaApiPaths,
+    Config,
+    CacheType,
+    CircuitBreakerSettings,
+    AdaptiveConcurrencySettings,
+    TimeoutSettings,
+    StreamSettings,
 )
 from .exceptions import (
     APIStatusError,
     APITimeoutError,
     APIConnectionError,
+    CircuitOpenError,
+    ConcurrencyLimitError,
 )
 from numexa.version import VERSION
-from .utils import ResponseT, make_status_error, default_api_key, default_base_url
+from .utils import (
+    ResponseT,
+    Modes,
+    make_status_error,
+    default_api_key,
+    default_base_url,
+    target_id,
+)
 from .common_types import StreamT
-from .streaming import Stream
+from .streaming import Stream, AsyncStream, Resume
+from .log_shipper import LogShipper, log_timestamp, source_ip
+from .router import WeightedRouter
+from .hedging import hedge_delay, send_hedged
+from .latency import LatencyTracker
+from .retries import RetryBudget, RetryPolicy
+from .cache import active_cache, request_cache_key
+from .semantic_cache import active_semantic_cache, semantic_query
+from .coalescing import SingleFlight, StreamFanout
+from .circuit_breaker import CircuitBreaker, CircuitOpen, is_target_failure
+from .rate_limit import RateLimiter, estimate_tokens, usage_tokens
+from .concurrency import AdaptiveLimiter, Overloaded, is_overload
+from .deadline import Deadline, DeadlineExceeded, attempt_timeout
+from .stream_timeouts import guard_stream
+from .json_codec import ascii_dumps, dumps, loads
+from .lite_responses import lite_type
+from .raw import RawResponse, RawStream
+
+
+# Params acted on by the SDK itself and never sent upstream.
+_CLIENT_PARAMS = frozenset({"model", "timeout", "retry_settings"})
 
 
 class MissingStreamClassError(TypeError):
@@ -60,13 +108,30 @@ class APIClient:
         *,
         base_url: Optional[str] = None,
         api_key: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
     ) -> None:
         self.api_key = api_key or default_api_key()
         self.base_url = base_url or default_base_url()
-        self._client = httpx.AsyncClient(
+        self._client = http_client or httpx.AsyncClient(
             base_url=self.base_url,
             headers={"Accept": "application/json"},
+            limits=httpx.Limits(
+                max_connections=DEFAULT_MAX_CONNECTIONS,
+                max_keepalive_connections=DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY,
+            ),
         )
+        self._log_shipper = LogShipper(self._client, api_key=self.api_key)
+        self._routers: "OrderedDict[Tuple[Any, ...], WeightedRouter]" = OrderedDict()
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._concurrency: Dict[str, AdaptiveLimiter] = {}
+        self._retry_budget = RetryBudget()
+        self._single_flight = SingleFlight()
+        # Requests currently being sent through this client. The client
+        # registry never closes a client while this is non-zero.
+        self._in_flight = 0
 
     def _serialize_header_values(
         self, headers: Optional[Mapping[str, Any]]
@@ -74,7 +139,7 @@ class APIClient:
         if headers is None:
             return {}
         return {
-            f"{NUMEXA_HEADER_PREFIX}{k}": json.dumps(v)
+            f"{NUMEXA_HEADER_PREFIX}{k}": ascii_dumps(v)
             if isinstance(v, (dict, list))
             else str(v)
             for k, v in headers.items()
@@ -95,6 +160,8 @@ class APIClient:
         stream: Literal[True],
         stream_cls: type[StreamT],
         params: Params,
+        weights: Optional[List[float]] = None,
+        config: Optional[Config] = None,
     ) -> StreamT:
         ...
 
@@ -109,6 +176,8 @@ class APIClient:
         stream: Literal[False],
         stream_cls: type[StreamT],
         params: Params,
+        weights: Optional[List[float]] = None,
+        config: Optional[Config] = None,
     ) -> ResponseT:
         ...
 
@@ -123,6 +192,8 @@ class APIClient:
         stream: bool,
         stream_cls: type[StreamT],
         params: Params,
+        weights: Optional[List[float]] = None,
+        config: Optional[Config] = None,
     ) -> Union[ResponseT, StreamT]:
         ...
 
@@ -136,6 +207,8 @@ class APIClient:
         stream: bool,
         stream_cls: type[StreamT],
         params: Params,
+        weights: Optional[List[float]] = None,
+        config: Optional[Config] = None,
     ) -> Union[ResponseT, StreamT]:
         if path in [NumexaApiPaths.CHAT_COMPLETION, NumexaApiPaths.COMPLETION]:
             body = cast(List[Body], body)
@@ -147,6 +220,7 @@ class APIClient:
                 mode=mode,
                 stream=stream,
                 params=params,
+                weights=weights,
             )
         elif path in NumexaApiPaths.CHAT_COMPLETION_DIRECT:
             body = cast(List[Body], body)
@@ -157,6 +231,7 @@ class APIClient:
                 mode=mode,
                 stream=stream,
                 params=params,
+                weights=weights,
             )
 
         elif path.endswith("/generate"):
@@ -170,6 +245,7 @@ class APIClient:
             )
         else:
             raise NotImplementedError(f"This API path `{path}` is not implemented.")
+        opts.config = config
 
         res = await self._request(
             options=opts,
@@ -228,19 +304,103 @@ class APIClient:
             mode: str,
             stream: bool,
             params: Params,
+            weights: Optional[List[float]] = None,
     ) -> Options:
         opts = Options.construct()
         opts.method = method
         opts.url = url
+        opts.mode = mode
+        opts.llms = self._select_targets(mode, body, weights)
         params_dict = {} if params is None else params.dict()
+        opts.retry_settings = params_dict.get("retry_settings")
+        # Time budget of the whole call, across fallbacks and retries.
+        opts.timeout = params_dict.get("timeout")
+        opts.request_params = {**params_dict, "stream": stream}
+        # Everything the upstream understands: the SDK-side settings stay
+        # behind and `model` is replaced by the list of target models.
         json_body = {
-            "model": self._config_direct(mode, body),
-            "messages": params_dict.get("messages", [{}])
+            **{k: v for k, v in params_dict.items() if k not in _CLIENT_PARAMS},
+            "stream": stream,
+            "model": self._config_direct(mode, opts.llms),
         }
         opts.json_body = remove_empty_values(json_body)
         opts.headers = None
         return opts
 
+    def _select_targets(
+        self, mode: str, body: List[Body], weights: Optional[List[float]] = None
+    ) -> List[Body]:
+        """Order the llms for an attempt. In ab_test mode a single llm is picked
+        by weight, `weights` overriding the `weight` set on each llm.
+        """
+        if mode != Modes.AB_TEST or len(body) < 2:
+            return list(body)
+        if weights is None:
+            weights = [1.0 if i.weight is None else i.weight for i in body]
+        elif len(weights) != len(body):
+            raise ValueError(
+                f"Expected {len(body)} weights, one per llm, but got {len(weights)}."
+            )
+        # One router per llms and weights, so callers with different weights
+        # keep their own round-robin state. Only the most recently used
+        # routers are kept, as per-call weights can take any value.
+        key = (*(target_id(i) for i in body), *weights)
+        router = self._routers.pop(key, None)
+        if router is None:
+            router = WeightedRouter(weights)
+            if len(self._routers) >= DEFAULT_MAX_ROUTERS:
+                self._routers.popitem(last=False)
+        self._routers[key] = router
+        return [body[router.select()]]
+
+    def routing_stats(self) -> List[Dict[int, int]]:
+        """Selections made per target by each ab_test router of this client."""
+        return [router.stats() for router in self._routers.values()]
+
+    def rate_limit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Limits and queued callers of each rate limited target."""
+        return {label: limiter.stats() for label, limiter in self._limiters.items()}
+
+    def _rate_limiter(self, label: str, settings: Mapping[str, Any]) -> RateLimiter:
+        requests_per_minute = settings.get("requests_per_minute")
+        tokens_per_minute = settings.get("tokens_per_minute")
+        limiter = self._limiters.get(label)
+        if (
+            limiter is None
+            or limiter.requests_per_minute != requests_per_minute
+            or limiter.tokens_per_minute != tokens_per_minute
+        ):
+            limiter = self._limiters[label] = RateLimiter(
+                requests_per_minute, tokens_per_minute
+            )
+        return limiter
+
+    def concurrency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Current adaptive concurrency limit and load of each target."""
+        return {
+            label: limiter.stats() for label, limiter in self._concurrency.items()
+        }
+
+    def _adaptive_limiter(
+        self, label: str, settings: AdaptiveConcurrencySettings
+    ) -> AdaptiveLimiter:
+        limiter = self._concurrency.get(label)
+        if limiter is None or limiter.settings != settings:
+            limiter = self._concurrency[label] = AdaptiveLimiter(settings)
+        return limiter
+
+    def circuit_breaker_stats(self) -> Dict[str, Dict[str, Any]]:
+        """State and recent outcomes of the circuit breaker of each target."""
+        return {label: breaker.stats() for label, breaker in self._breakers.items()}
+
+    def _circuit_breaker(
+        self, label: str, settings: CircuitBreakerSettings
+    ) -> CircuitBreaker:
+        breaker = self._breakers.get(label)
+        if breaker is None or breaker.settings != settings:
+            breaker = self._breakers[label] = CircuitBreaker(settings)
+        return breaker
+
     def _config(self, mode: str, body: List[Body]) -> RequestConfig:
         config = RequestConfig(mode=mode, options=[])
         for i in body:
@@ -298,23 +458,28 @@ class APIClient:
     def is_closed(self) -> bool:
         return self._client.is_closed
 
-    def close(self) -> None:
+    def is_idle(self) -> bool:
+        return self._in_flight == 0
+
+    async def aclose(self) -> None:
         """Close the underlying HTTPX client.
 
-        The client will *not* be usable after this.
+        Logs still queued for ingestion are flushed first. The client will
+        *not* be usable after this.
         """
-        self._client.close()
+        await self._log_shipper.aclose()
+        await self._client.aclose()
 
-    def __enter__(self: Any) -> Any:
+    async def __aenter__(self: Any) -> Any:
         return self
 
-    def __exit__(
+    async def __aexit__(
         self,
         exc_type: Optional[BaseException],
         exc: Optional[BaseException],
         exc_tb: Optional[TracebackType],
     ) -> None:
-        self.close()
+        await self.aclose()
 
     def _build_request(self, options: Options) -> List[httpx.Request]:
         headers = self._build_headers(options)
@@ -325,28 +490,29 @@ class APIClient:
             url=options.url,
             headers=headers,
             params=params,
-            json=json_body,
+            content=dumps(json_body),
             timeout=options.timeout,
         )
         return [request]
 
     async def _build_request_direct(self, options: Options) -> List[httpx.Request]:
         headers = self._build_headers(options)
-        new_payload = dict()
         request_list = []
         params = options.params
         json_body = options.json_body
-        messages = json_body.get("messages", [{}])
         models = json_body.get("model", [""])
-        new_payload["messages"] = messages
+        # Only the model differs between targets: encode the messages and
+        # params once and splice each model in, instead of re-encoding the
+        # conversation for every fallback.
+        shared = dumps({k: v for k, v in json_body.items() if k != "model"})
+        head = shared[:-1] + (b',"model":' if len(shared) > 2 else b'"model":')
         for model in models:
-            new_payload["model"] = model
             request_list.append(self._client.build_request(
                 method=options.method,
                 url=options.url,
                 headers=headers,
                 params=params,
-                json=new_payload,
+                content=head + dumps(model) + b"}",
                 timeout=options.timeout,
             ))
         return request_list
@@ -391,6 +557,22 @@ class APIClient:
         stream: bool,
         cast_to: Type[ResponseT],
         stream_cls: Type[StreamT],
+    ) -> Union[ResponseT, StreamT]:
+        self._in_flight += 1
+        try:
+            return await self._send_request(
+                options=options, stream=stream, cast_to=cast_to, stream_cls=stream_cls
+            )
+        finally:
+            self._in_flight -= 1
+
+    async def _send_request(
+        self,
+        *,
+        options: Options,
+        stream: bool,
+        cast_to: Type[ResponseT],
+        stream_cls: Type[StreamT],
     ) -> Union[ResponseT, StreamT]:
         # proxy on
         if not os.environ.get("NUMEXA_PROXY"):
@@ -399,73 +581,518 @@ class APIClient:
         # proxy off
         else:
             request_list = await self._build_request_direct(options)
-        for request in request_list:
-            try:
-                initiated_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                res = await self._client.send(request, auth=self.custom_auth, stream=stream)
-                if os.environ.get("NUMEXA_PROXY"):
-                    response_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                    # Preparing Monger Request Body
-                    monger_request_body = dict()
-                    monger_request_body["request_time"] = initiated_timestamp
-                    hostname = socket.gethostname()
-                    monger_request_body["source_ip"] = socket.gethostbyname(hostname)
-                    monger_request_body["request_method"] = "POST"
-                    monger_request_body["request_url"] = str(request.url)
-                    monger_request_body["request_body"] = json.loads(request.content.decode("utf-8"))
-                    request.headers.update(
-                        {"X-Numexa-Log-Type": "request", "X-Numexa-Api-Key": os.environ.get("NUMEXA_API_KEY")})
-                    request.headers.update(
-                        {"Content-Length": str(len(json.dumps(monger_request_body, default=str).encode("utf-8")))})
-                    #  Monger Request Ingestion Start
-                    monger_request_option = Options(method=request.method, headers=request.headers,
-                                                    json_body=monger_request_body,
-                                                    url=NUMEXA_INGEST_LOGS)
-                    monger_request = self._build_monger(options=monger_request_option)
-                    await self._client.send(monger_request, auth=self.custom_auth, stream=stream)
-                    #  Monger Request Ingestion End
-
-                    # Preparing Monger Response Body
-                    monger_response_body = dict()
-                    monger_response_body["initiated_timestamp"] = initiated_timestamp
-                    monger_response_body["response_timestamp"] = response_timestamp
-                    monger_response_body["response_status_code"] = res.status_code
-                    monger_response_body["response_body"] = json.loads(res.content.decode("utf-8"))
-                    res.headers.update(
-                        {"X-Numexa-Log-Type": "response", "X-Numexa-Api-Key": os.environ.get("NUMEXA_API_KEY")})
-                    res.headers.update(
-                        {"Content-Length": str(len(json.dumps(monger_response_body, default=str).encode("utf-8")))})
-                    # Monger Response Ingestion Start
-                    monger_response_option = Options(method=request.method, headers=res.headers,
-                                                     json_body=monger_response_body, url=NUMEXA_INGEST_LOGS)
-                    monger_response = self._build_monger(options=monger_response_option)
-                    await self._client.send(monger_response, auth=self.custom_auth, stream=stream)
-                    # Monger Response Ingestion End
-                res.raise_for_status()
-            except httpx.HTTPStatusError as err:  # 4xx and 5xx errors
-                # If the response is streamed then we need to explicitly read the response
-                # to completion before attempting to access the response text.
-                print(err.response.read())
+        targets = options.llms or [None] * len(request_list)
+        lite = getattr(options.config, "lite_responses", False)
+        if lite:
+            cast_to = lite_type(cast_to)
+        request_keys = self._request_keys(options, targets)
+        cache_keys = self._cache_keys(request_keys, targets, stream)
+        cache = active_cache()
+        for target, key in zip(targets, cache_keys):
+            if key is None or target.cache_force_refresh:
                 continue
-                # raise self._make_status_error_from_response(request, err.response) from None
-            except httpx.TimeoutException as err:
-                raise APITimeoutError(request=request) from err
-            except Exception as err:
-                raise APIConnectionError(request=request) from err
-            if stream or res.headers["content-type"] == "text/event-stream":
-                if stream_cls is None:
-                    raise MissingStreamClassError()
-                stream_response = stream_cls(
-                    response=res, cast_to=self._extract_stream_chunk_type(stream_cls)
+            body = await cache.get(key, max_age=target.cache_age)
+            if body is not None:
+                return cast(ResponseT, self._cached_response(cast_to, body))
+        semantic_queries = self._semantic_queries(options, targets, stream)
+        semantic_cache = active_semantic_cache()
+        for target, query in zip(targets, semantic_queries):
+            if query is None or target.cache_force_refresh:
+                continue
+            threshold = target.cache_threshold
+            if threshold is None:
+                threshold = DEFAULT_SEMANTIC_CACHE_THRESHOLD
+            body = semantic_cache.get(*query, threshold=threshold, max_age=target.cache_age)
+            if body is not None:
+                return cast(ResponseT, self._cached_response(cast_to, body))
+        store = functools.partial(
+            self._store_response, request_list, targets, cache_keys, semantic_queries
+        )
+        if getattr(options.config, "coalesce", False) and all(request_keys):
+            flight_key = ("stream:" if stream else "") + ",".join(request_keys)
+            shared = await self._single_flight.do(
+                flight_key,
+                functools.partial(
+                    self._dispatch_shared, options, request_list, targets, stream, store
+                ),
+            )
+            res = shared.response() if isinstance(shared, StreamFanout) else shared
+            resume = None
+        else:
+            res = await self._dispatch(options, request_list, targets, stream)
+            await store(res)
+            resume = self._stream_resumer(options, request_list, targets, stream)
+        return self._process_response(res, stream, cast_to, stream_cls, resume, lite)
+
+    async def _store_response(
+        self,
+        request_list: List[httpx.Request],
+        targets: List[Optional[Body]],
+        cache_keys: List[Optional[str]],
+        semantic_queries: List[Optional[Tuple[str, str]]],
+        res: httpx.Response,
+    ) -> None:
+        """Cache `res` under the keys of the target whose request it answers.
+        `res` must answer one of `request_list`, so a coalesced call stores
+        only from the caller that dispatched it.
+        """
+        if not any(cache_keys) and not any(semantic_queries):
+            return
+        index = [id(i) for i in request_list].index(id(res.request))
+        key, query = cache_keys[index], semantic_queries[index]
+        if key is not None:
+            await active_cache().set(key, res.content, ttl=targets[index].cache_age)
+        if query is not None:
+            active_semantic_cache().set(*query, res.content, ttl=targets[index].cache_age)
+
+    def _stream_resumer(
+        self,
+        options: Options,
+        request_list: List[httpx.Request],
+        targets: List[Optional[Body]],
+        stream: bool,
+    ) -> Optional[Resume]:
+        """With `StreamSettings.resume`, a callback continuing a broken stream
+        on the llms after the one serving it, None otherwise.
+        """
+        settings = getattr(options.config, "streaming", None)
+        if not stream or settings is None or not settings.resume:
+            return None
+
+        async def resume(
+            failed: httpx.Response, partial: str
+        ) -> Optional[httpx.Response]:
+            nonlocal request_list, targets
+            ids = [id(i) for i in request_list]
+            if id(failed.request) not in ids:
+                return None
+            remaining = targets[ids.index(id(failed.request)) + 1 :]
+            if not remaining or None in remaining:
+                return None
+            body = options.json_body or {}
+            if body.get("prompt") is not None and not body.get("messages"):
+                # Completions continue the prompt itself.
+                update: Dict[str, Any] = {"prompt": body["prompt"] + partial}
+            else:
+                update = {
+                    "messages": [
+                        *body.get("messages", []),
+                        {"role": "assistant", "content": partial},
+                    ]
+                }
+            continuation = options.copy(
+                update={
+                    "llms": remaining,
+                    "json_body": {
+                        **body,
+                        "model": self._config_direct(options.mode, remaining),
+                        **update,
+                    },
+                    "request_params": {**(options.request_params or {}), **update},
+                }
+            )
+            request_list = await self._build_request_direct(continuation)
+            targets = remaining
+            return await self._dispatch(continuation, request_list, targets, True)
+
+        return resume
+
+    async def _dispatch(
+        self,
+        options: Options,
+        request_list: List[httpx.Request],
+        targets: List[Optional[Body]],
+        stream: bool,
+    ) -> httpx.Response:
+        """Send the request to its targets per the mode and return the first
+        successful response, raising an `APIError` if there is none.
+        """
+        labels = [None if i is None else target_id(i) for i in targets]
+        breaker_settings = getattr(options.config, "circuit_breaker", None)
+        concurrency = getattr(options.config, "adaptive_concurrency", None)
+        timeouts = getattr(options.config, "timeouts", None)
+        stream_settings = getattr(options.config, "streaming", None) if stream else None
+        deadline = None if options.timeout is None else Deadline(options.timeout)
+        attempts: List[Callable[[], Awaitable[httpx.Response]]] = []
+        attempt_labels: List[Optional[str]] = []
+        tokens: Optional[int] = None
+        for request, label, target in zip(request_list, labels, targets):
+            send = functools.partial(
+                self._attempt,
+                request,
+                label,
+                stream,
+                deadline,
+                timeouts,
+                stream_settings,
+            )
+            if concurrency is not None and label is not None:
+                send = functools.partial(
+                    self._attempt_concurrency_limited,
+                    request,
+                    self._adaptive_limiter(label, concurrency),
+                    send,
+                )
+            if target is not None and target.rate_limit and label is not None:
+                if tokens is None:
+                    tokens = estimate_tokens(options.request_params)
+                limiter = self._rate_limiter(label, target.rate_limit)
+                send = functools.partial(
+                    self._attempt_rate_limited, limiter, tokens, stream, send
+                )
+            attempt = functools.partial(
+                self._attempt_with_retries,
+                send,
+                self._retry_policy(options, target),
+                deadline,
+            )
+            if breaker_settings is not None and label is not None:
+                breaker = self._circuit_breaker(label, breaker_settings)
+                if not breaker.available():
+                    continue
+                attempt = functools.partial(
+                    self._attempt_with_breaker, request, breaker, attempt
+                )
+            attempts.append(attempt)
+            attempt_labels.append(label)
+        if not attempts:
+            raise CircuitOpenError(
+                request=request_list[0], targets=[str(i) for i in labels]
+            )
+        labels = attempt_labels
+        hedging = getattr(options.config, "hedging", None)
+        try:
+            if (
+                hedging is not None
+                and options.mode == Modes.FALLBACK
+                and len(attempts) > 1
+            ):
+
+                def delay(index: int) -> float:
+                    label = labels[index]
+                    tracker = self._latencies.get(label) if label else None
+                    return hedge_delay(hedging, tracker)
+
+                run = send_hedged(attempts, delay)
+            else:
+                run = self._send_in_order(attempts)
+            if deadline is None:
+                return await run
+            try:
+                return await asyncio.wait_for(run, deadline.remaining())
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(
+                    "Deadline exceeded.", request=request_list[0]
+                ) from None
+        except DeadlineExceeded as err:
+            raise APITimeoutError(request=err.request) from None
+        except Overloaded as err:
+            raise ConcurrencyLimitError(request=err.request) from None
+        except CircuitOpen as err:
+            raise CircuitOpenError(
+                request=err.request, targets=[str(i) for i in labels]
+            ) from None
+        except httpx.HTTPStatusError as err:  # 4xx and 5xx errors
+            raise self._make_status_error_from_response(
+                err.request, err.response
+            ) from None
+        except httpx.TimeoutException as err:
+            raise APITimeoutError(request=err.request) from err
+        except httpx.HTTPError as err:
+            raise APIConnectionError(request=err.request) from err
+
+    async def _dispatch_shared(
+        self,
+        options: Options,
+        request_list: List[httpx.Request],
+        targets: List[Optional[Body]],
+        stream: bool,
+        store: Callable[[httpx.Response], Awaitable[None]],
+    ) -> Union[httpx.Response, StreamFanout]:
+        res = await self._dispatch(options, request_list, targets, stream)
+        if stream:
+            return StreamFanout(res)
+        await store(res)
+        return res
+
+    def _request_keys(
+        self, options: Options, targets: List[Optional[Body]]
+    ) -> List[Optional[str]]:
+        """Canonical hash of the request as sent to each target."""
+        params = options.request_params or {}
+        url = self._cache_url(options)
+        return [
+            None if target is None else request_cache_key(url, target_id(target), params)
+            for target in targets
+        ]
+
+    def _cache_url(self, options: Options) -> str:
+        # The full URL, so clients of different gateways never share entries.
+        return self.base_url.rstrip("/") + options.url
+
+    def _cache_keys(
+        self,
+        request_keys: List[Optional[str]],
+        targets: List[Optional[Body]],
+        stream: bool,
+    ) -> List[Optional[str]]:
+        """Response cache key of each target, None where it has `cache` off.
+        Streamed responses are never cached.
+        """
+        return [
+            None
+            if stream
+            or target is None
+            or not target.cache
+            or target.cache_status == CacheType.SEMANTIC
+            else key
+            for key, target in zip(request_keys, targets)
+        ]
+
+    def _semantic_queries(
+        self, options: Options, targets: List[Optional[Body]], stream: bool
+    ) -> List[Optional[Tuple[str, str]]]:
+        """Semantic cache scope and prompt text of each target, None where it
+        does not use the semantic cache. Streamed responses are never cached.
+        """
+        params = options.request_params or {}
+        url = self._cache_url(options)
+        return [
+            None
+            if stream
+            or target is None
+            or not target.cache
+            or target.cache_status != CacheType.SEMANTIC
+            else semantic_query(url, target_id(target), params)
+            for target in targets
+        ]
+
+    async def _send_in_order(
+        self, attempts: List[Callable[[], Awaitable[httpx.Response]]]
+    ) -> httpx.Response:
+        """Try each target in turn, returning the first successful response.
+        Raises the error of the last target if they all fail.
+        """
+        last_error: Optional[httpx.HTTPError] = None
+        for attempt in attempts:
+            try:
+                return await attempt()
+            except httpx.HTTPError as err:
+                last_error = err
+        assert last_error is not None
+        raise last_error
+
+    def _retry_policy(self, options: Options, target: Optional[Body]) -> RetryPolicy:
+        settings = [options.retry_settings]
+        if target is not None:
+            settings = [target.retry, target.retry_settings, *settings]
+        if options.max_retries is not None and not any(settings):
+            return RetryPolicy(attempts=options.max_retries)
+        return RetryPolicy.from_settings(*settings)
+
+    async def _attempt_with_retries(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        policy: RetryPolicy,
+        deadline: Optional[Deadline] = None,
+    ) -> httpx.Response:
+        """Send to one target, retrying retryable failures with backoff while
+        the policy, the client's retry budget and the call's deadline allow
+        it.
+        """
+        self._retry_budget.record_request()
+        retry = 0
+        while True:
+            try:
+                return await send()
+            except httpx.HTTPError as err:
+                if retry >= policy.attempts or not policy.is_retryable(err):
+                    raise
+                response = (
+                    err.response if isinstance(err, httpx.HTTPStatusError) else None
                 )
-                return stream_response
-            response = cast(
-                ResponseT,
-                cast_to(**res.json()),
+                delay = policy.backoff(retry, response)
+                if delay is None or (
+                    deadline is not None and delay >= deadline.remaining()
+                ):
+                    raise
+                if not self._retry_budget.try_acquire():
+                    raise
+                retry += 1
+                await asyncio.sleep(delay)
+
+    async def _attempt_rate_limited(
+        self,
+        limiter: RateLimiter,
+        tokens: int,
+        stream: bool,
+        send: Callable[[], Awaitable[httpx.Response]],
+    ) -> httpx.Response:
+        """Wait for room in the target's rate limits, then `send`. The token
+        estimate is corrected with the usage the response reports, and
+        refunded if the request fails.
+        """
+        await limiter.acquire(tokens)
+        try:
+            res = await send()
+        except BaseException:
+            limiter.reconcile(tokens, None)
+            raise
+        if not stream:
+            actual = usage_tokens(res.content)
+            if actual is not None:
+                limiter.reconcile(tokens, actual)
+        return res
+
+    async def _attempt_concurrency_limited(
+        self,
+        request: httpx.Request,
+        limiter: AdaptiveLimiter,
+        send: Callable[[], Awaitable[httpx.Response]],
+    ) -> httpx.Response:
+        """`send` within the target's adaptive concurrency limit, feeding its
+        latency or overload back into the limit. A streamed call gives up
+        its slot once the response headers are in.
+        """
+        await limiter.acquire(request)
+        start = time.monotonic()
+        try:
+            res = await send()
+        except httpx.HTTPError as err:
+            limiter.release(overload=is_overload(err))
+            raise
+        except BaseException:
+            limiter.release()
+            raise
+        limiter.release(time.monotonic() - start)
+        return res
+
+    async def _attempt_with_breaker(
+        self,
+        request: httpx.Request,
+        breaker: CircuitBreaker,
+        attempt: Callable[[], Awaitable[httpx.Response]],
+    ) -> httpx.Response:
+        """Run `attempt` if the target's breaker admits it, recording how it
+        went. Raises `CircuitOpen` when the breaker refuses the call.
+        """
+        if not breaker.allow():
+            raise CircuitOpen("Circuit open.", request=request)
+        try:
+            res = await attempt()
+        except httpx.HTTPError as err:
+            if is_target_failure(err):
+                breaker.record_failure()
+            else:
+                breaker.release()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_success()
+        return res
+
+    async def _attempt(
+        self,
+        request: httpx.Request,
+        label: Optional[str],
+        stream: bool,
+        deadline: Optional[Deadline] = None,
+        timeouts: Optional[TimeoutSettings] = None,
+        stream_settings: Optional[StreamSettings] = None,
+    ) -> httpx.Response:
+        """Send one request to one target, within the time left before the
+        deadline. Raises `httpx.HTTPStatusError` on 4xx and 5xx responses
+        after reading their body, and `StreamStalled` when a stream sends no
+        first token in time.
+        """
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded("Deadline exceeded.", request=request)
+        if deadline is not None or timeouts is not None:
+            request.extensions["timeout"] = attempt_timeout(
+                request.extensions.get("timeout", {}), timeouts, deadline
+            )
+        initiated_timestamp = log_timestamp()
+        start = time.monotonic()
+        try:
+            res = await self._client.send(
+                request, auth=self.custom_auth, stream=stream
             )
-            return response
+        except httpx.TimeoutException:
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded("Deadline exceeded.", request=request) from None
+            raise
+        if res.is_error:
+            # A streamed response has to be read before its text is available.
+            await res.aread()
+        elif label is not None:
+            self._latency_tracker(label).record(time.monotonic() - start)
+        if os.environ.get("NUMEXA_PROXY"):
+            self._ship_logs(request, res, initiated_timestamp, stream)
+        res.raise_for_status()
+        if stream_settings is not None and (
+            stream_settings.first_token_timeout is not None
+            or stream_settings.idle_timeout is not None
+        ):
+            res = await guard_stream(
+                res, stream_settings.first_token_timeout, stream_settings.idle_timeout
+            )
+        return res
+
+    def _latency_tracker(self, label: str) -> LatencyTracker:
+        tracker = self._latencies.get(label)
+        if tracker is None:
+            tracker = self._latencies[label] = LatencyTracker()
+        return tracker
+
+    def _process_response(
+        self,
+        res: httpx.Response,
+        stream: bool,
+        cast_to: Type[ResponseT],
+        stream_cls: Type[StreamT],
+        resume: Optional[Resume] = None,
+        lite: bool = False,
+    ) -> Union[ResponseT, StreamT]:
+        if stream or res.headers["content-type"] == "text/event-stream":
+            if stream_cls is None:
+                raise MissingStreamClassError()
+            cast_to = self._extract_stream_chunk_type(stream_cls)
+            if lite:
+                cast_to = lite_type(cast_to)
+            if issubclass(get_origin(stream_cls) or stream_cls, AsyncStream):
+                # An open stream keeps its connection busy until it is closed.
+                self._in_flight += 1
+                stream_response = stream_cls(
+                    response=res,
+                    cast_to=cast_to,
+                    on_close=self._stream_closed,
+                    resume=resume,
+                )
+            else:
+                stream_response = stream_cls(response=res, cast_to=cast_to)
+            return stream_response
+        if issubclass(cast_to, RawResponse):
+            return cast(ResponseT, RawResponse.from_response(res))
+        response = cast(
+            ResponseT,
+            cast_to(**loads(res.content)),
+        )
+        return response
+
+    @staticmethod
+    def _cached_response(cast_to: Type[ResponseT], body: bytes) -> Any:
+        if issubclass(cast_to, RawResponse):
+            return RawResponse.from_cache(body)
+        return cast_to(**loads(body))
+
+    def _stream_closed(self) -> None:
+        self._in_flight -= 1
 
     def _extract_stream_chunk_type(self, stream_cls: Type) -> type:
+        if isinstance(stream_cls, type) and issubclass(stream_cls, RawStream):
+            # Raw streams yield payload bytes rather than a model.
+            return bytes
         args = get_args(stream_cls)
         if not args:
             raise TypeError(
@@ -473,19 +1100,35 @@ class APIClient:
             )
         return cast(type, args[0])
     
-    def _build_monger(self, options: Options) -> httpx.Request:
-        headers = options.headers
-        method = options.method
-        params = options.params
-        url = options.url
-        json_body = options.json_body
-        return self._client.build_request(
-            method=method,
-            url=url,
-            headers=headers,
-            params=params,
-            json=json_body,
-            timeout=options.timeout)
+    def _ship_logs(
+        self,
+        request: httpx.Request,
+        res: httpx.Response,
+        initiated_timestamp: str,
+        stream: bool,
+    ) -> None:
+        # Bodies are queued as bytes and decoded by the shipper's background
+        # task. A streamed response has not been read yet, so only its
+        # status is logged.
+        self._log_shipper.submit(
+            "request",
+            {
+                "request_time": initiated_timestamp,
+                "source_ip": source_ip(),
+                "request_method": request.method,
+                "request_url": str(request.url),
+                "request_body": request.content,
+            },
+        )
+        self._log_shipper.submit(
+            "response",
+            {
+                "initiated_timestamp": initiated_timestamp,
+                "response_timestamp": log_timestamp(),
+                "response_status_code": res.status_code,
+                "response_body": None if stream else res.content,
+            },
+        )
 
     def _make_status_error_from_response(
         self,
@@ -496,7 +1139,7 @@ class APIClient:
         body = err_text
 
         try:
-            body = json.loads(err_text)["error"]["message"]
+            body = loads(err_text)["error"]["message"]
             err_msg = f"Error code: {response.status_code} - {body}"
         except Exception:
             err_msg = err_text or f"Error code: {response.status_code}"
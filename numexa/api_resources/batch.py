@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .global_constants import DEFAULT_BATCH_CONCURRENCY, DEFAULT_CHECKPOINT_EVERY
+from .json_codec import dumps, loads
+from .latency import percentile
+from .utils import Config
+
+__all__ = ["BatchStats", "BatchRun", "BatchResults", "BatchProgress", "run_batch"]
+
+
+class BatchStats:
+    """Throughput and latency of one batch of requests."""
+
+    def __init__(self) -> None:
+        self.succeeded = 0
+        self.failed = 0
+        self.latencies: List[float] = []
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def start(self) -> None:
+        self._started = time.monotonic()
+
+    def finish(self) -> None:
+        self._finished = time.monotonic()
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.latencies.append(seconds)
+        if ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+    @property
+    def elapsed(self) -> float:
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.monotonic()) - self._started
+
+    @property
+    def throughput(self) -> float:
+        """Completed requests per second."""
+        elapsed = self.elapsed
+        return len(self.latencies) / elapsed if elapsed > 0 else 0.0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return percentile(self.latencies, q)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "requests": len(self.latencies),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+    def __repr__(self) -> str:
+        return f"BatchStats({self.summary()})"
+
+
+class BatchRun:
+    """Runs many `create()` calls with at most `concurrency` in flight.
+
+    Iterating yields `(index, result)` pairs as the calls complete, where
+    `index` is the request's position in `requests`. Requests are pulled from
+    the iterable lazily, so a generator of any length can be fed in. A failed
+    call raises when reached, or is yielded as the result with
+    `return_exceptions`; the calls still in flight are cancelled when
+    iteration stops early.
+    """
+
+    def __init__(
+        self,
+        create: Callable[..., Awaitable[Any]],
+        requests: Iterable[Mapping[str, Any]],
+        *,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        return_exceptions: bool = False,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self._create = create
+        self._requests = requests
+        self.concurrency = concurrency
+        self.return_exceptions = return_exceptions
+        self.stats = BatchStats()
+
+    def __aiter__(self) -> AsyncIterator[Tuple[int, Any]]:
+        return self._run()
+
+    async def _call(self, index: int, request: Mapping[str, Any]) -> Tuple[int, Any]:
+        start = time.monotonic()
+        try:
+            result = await self._create(**request)
+        except Exception as err:
+            self.stats.record(time.monotonic() - start, ok=False)
+            return index, err
+        self.stats.record(time.monotonic() - start, ok=True)
+        return index, result
+
+    def _result(self, task: "asyncio.Task[Tuple[int, Any]]") -> Tuple[int, Any]:
+        index, result = task.result()
+        if isinstance(result, Exception) and not self.return_exceptions:
+            raise result
+        return index, result
+
+    async def _run(self) -> AsyncIterator[Tuple[int, Any]]:
+        pending: Set["asyncio.Task[Tuple[int, Any]]"] = set()
+        self.stats.start()
+        try:
+            for index, request in enumerate(self._requests):
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        yield self._result(task)
+                pending.add(asyncio.ensure_future(self._call(index, request)))
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield self._result(task)
+        finally:
+            for task in pending:
+                task.cancel()
+            self.stats.finish()
+
+
+class BatchResults(List[Any]):
+    """Results of `create_many()` in input order, with the batch's `stats`."""
+
+    def __init__(self, results: Iterable[Any], stats: BatchStats) -> None:
+        super().__init__(results)
+        self.stats = stats
+
+
+async def collect(run: BatchRun, size: int) -> BatchResults:
+    results: List[Any] = [None] * size
+    async for index, result in run:
+        results[index] = result
+    return BatchResults(results, run.stats)
+
+
+class BatchProgress:
+    """Which input lines are done.
+
+    Everything below `watermark` is done; `done` only holds the indices above
+    it that finished out of order. It stays small while requests complete
+    roughly in order, but grows with every later completion while the
+    request at the watermark is still running.
+    """
+
+    def __init__(self, watermark: int = 0, done: Optional[Set[int]] = None) -> None:
+        self.watermark = watermark
+        self.done = set(done or ())
+        self._advance()
+
+    def is_done(self, index: int) -> bool:
+        return index < self.watermark or index in self.done
+
+    def mark(self, index: int) -> None:
+        self.done.add(index)
+        self._advance()
+
+    def _advance(self) -> None:
+        while self.watermark in self.done:
+            self.done.remove(self.watermark)
+            self.watermark += 1
+
+
+def _checkpoint_path(output_path: str) -> str:
+    return f"{output_path}.checkpoint"
+
+
+def _load_checkpoint(output_path: str) -> Tuple[int, BatchProgress]:
+    try:
+        with open(_checkpoint_path(output_path), encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return 0, BatchProgress()
+    return state["offset"], BatchProgress(state["watermark"], set(state["done"]))
+
+
+def _save_checkpoint(output_path: str, offset: int, progress: BatchProgress) -> None:
+    path = _checkpoint_path(output_path)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "offset": offset,
+                "watermark": progress.watermark,
+                "done": sorted(progress.done),
+            },
+            f,
+        )
+    os.replace(tmp, path)
+
+
+def _result_record(index: int, result: Any) -> Dict[str, Any]:
+    if isinstance(result, BaseException):
+        return {"index": index, "error": f"{type(result).__name__}: {result}"}
+    return {"index": index, "response": result.dict() if hasattr(result, "dict") else result}
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    *,
+    config: Optional[Config] = None,
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    resume: bool = True,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+    create: Optional[Callable[..., Awaitable[Any]]] = None,
+) -> Dict[str, Any]:
+    """Run every line of a JSONL file through `ChatCompletions.create`.
+
+    Each input line is a JSON object of `create()` keyword arguments, e.g.
+    `{"messages": [...], "temperature": 0}`. Results are appended to
+    `output_path` as they complete, as `{"index": n, "response": {...}}` or
+    `{"index": n, "error": "..."}` where `n` is the 0-based input line.
+
+    Input is read lazily and at most `concurrency` requests are in flight,
+    so memory stays flat for any input size. Progress is checkpointed next
+    to the output every `checkpoint_every` results; with `resume`, a rerun
+    skips lines already done and drops any output written after the last
+    checkpoint.
+    """
+    if create is None:
+        from .apis import ChatCompletions
+
+        create = ChatCompletions.create
+
+    offset, progress = 0, BatchProgress()
+    if resume:
+        offset, progress = _load_checkpoint(output_path)
+        try:
+            size = os.path.getsize(output_path)
+        except FileNotFoundError:
+            size = -1
+        if size < offset:
+            # The results the checkpoint counts are gone: start over rather
+            # than skip lines whose output no longer exists.
+            offset, progress = 0, BatchProgress()
+    mode = "r+b" if os.path.exists(output_path) else "w+b"
+    summary = {"succeeded": 0, "failed": 0, "skipped": 0}
+    start = time.monotonic()
+
+    async def call(index: int, line: str) -> Tuple[int, Any]:
+        # Never raises, so the line a failure belongs to is kept.
+        try:
+            kwargs = loads(line)
+            if not isinstance(kwargs, dict):
+                raise ValueError("each line must be a JSON object")
+            return index, await create(config=config, **kwargs)
+        except Exception as err:
+            return index, err
+
+    def requests(lines: Iterable[str]) -> Iterable[Dict[str, Any]]:
+        for index, line in enumerate(lines):
+            if progress.is_done(index):
+                summary["skipped"] += 1
+            elif not line.strip():
+                progress.mark(index)
+            else:
+                yield {"index": index, "line": line}
+
+    with open(output_path, mode) as out, open(input_path, encoding="utf-8") as lines:
+        out.truncate(offset)
+        out.seek(offset)
+        since_checkpoint = 0
+
+        def checkpoint() -> None:
+            nonlocal since_checkpoint
+            out.flush()
+            os.fsync(out.fileno())
+            _save_checkpoint(output_path, out.tell(), progress)
+            since_checkpoint = 0
+
+        results = BatchRun(call, requests(lines), concurrency=concurrency).__aiter__()
+        try:
+            async for _, (index, result) in results:
+                record = _result_record(index, result)
+                out.write(dumps(record, default=str) + b"\n")
+                summary["failed" if "error" in record else "succeeded"] += 1
+                progress.mark(index)
+                since_checkpoint += 1
+                if since_checkpoint >= checkpoint_every:
+                    checkpoint()
+        finally:
+            # Cancels the calls still in flight if the loop stopped early.
+            await results.aclose()
+            checkpoint()
+
+    summary["elapsed"] = time.monotonic() - start
+    return summary
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numexa
+
+from .global_constants import (
+    DEFAULT_CACHE_AGE,
+    DEFAULT_CACHE_MAX_BYTES,
+    DEFAULT_CACHE_MAX_ENTRIES,
+)
+
+__all__ = [
+    "request_cache_key",
+    "CacheBackend",
+    "InMemoryCache",
+    "response_cache",
+    "active_cache",
+]
+
+# Request params that do not change the generated response.
+_UNKEYED_PARAMS = frozenset({"stream", "timeout", "retry_settings"})
+
+
+def request_cache_key(url: str, target: Optional[str], params: Mapping[str, Any]) -> str:
+    """Canonical hash of a request: the full endpoint URL, the target (its
+    `target_id`: provider, model and account) and every param that affects
+    the output (messages or prompt plus sampling params). Params left unset
+    do not change the key.
+    """
+    canonical = {
+        k: v for k, v in params.items() if v is not None and k not in _UNKEYED_PARAMS
+    }
+    canonical["target"] = target
+    canonical["url"] = url
+    # Always the standard library, not json_codec: keys stored in a shared
+    # cache must not change with the JSON backend a process happens to load.
+    payload = json.dumps(
+        canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CacheBackend:
+    """Store for cached response bodies.
+
+    `get` returns a body stored less than `max_age` seconds ago (any age when
+    None) that has not expired, `set` stores one for `ttl` seconds.
+    """
+
+    async def get(self, key: str, max_age: Optional[float] = None) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+class InMemoryCache(CacheBackend):
+    """Process-local LRU cache with per-entry TTL and a total size cap.
+
+    The least recently used entries are evicted once either `max_entries` or
+    `max_bytes` of stored bodies is exceeded.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (stored_at, expires_at, body)
+        self._entries: "OrderedDict[str, Tuple[float, float, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_nowait(self, key: str, max_age: Optional[float] = None) -> Optional[bytes]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, expires_at, value = entry
+                if now >= expires_at:
+                    self._remove(key)
+                elif max_age is None or now - stored_at <= max_age:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def set_nowait(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        now = time.monotonic()
+        expires_at = now + (DEFAULT_CACHE_AGE if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (now, expires_at, value)
+            self._size += len(value)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+    async def get(self, key: str, max_age: Optional[float] = None) -> Optional[bytes]:
+        return self.get_nowait(key, max_age)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self.set_nowait(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._size,
+        }
+
+
+response_cache = InMemoryCache()
+
+
+def active_cache() -> CacheBackend:
+    """Backend set as `numexa.cache_backend`, or the process-local
+    `response_cache` when there is none.
+    """
+    return numexa.cache_backend or response_cache
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, List, Optional
+
+import httpx
+
+from .utils import CircuitBreakerSettings
+
+__all__ = ["CircuitState", "CircuitBreaker", "CircuitOpen", "is_target_failure"]
+
+
+class CircuitOpen(httpx.TransportError):
+    """A call refused by its target's circuit breaker before any I/O."""
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def is_target_failure(err: BaseException) -> bool:
+    """Whether an error says the target itself is unhealthy.
+
+    Connection errors, timeouts, 408, 429 and 5xx responses count; other 4xx
+    responses are the caller's fault and say nothing about the target.
+    """
+    if isinstance(err, httpx.HTTPStatusError):
+        status = err.response.status_code
+        return status >= 500 or status in (408, 429)
+    return isinstance(err, (httpx.TimeoutException, httpx.TransportError))
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker for one llm target.
+
+    While closed, outcomes are counted in one-second buckets over a sliding
+    `window`. Once at least `min_requests` have been seen and the share of
+    failures reaches `failure_rate`, the circuit opens and `allow()` refuses
+    every call for `cooldown` seconds. It is then half-open: up to
+    `half_open_requests` probes are let through at a time, and that many
+    successes close it again while any failure opens it for another cooldown.
+    """
+
+    def __init__(self, settings: Optional[CircuitBreakerSettings] = None) -> None:
+        self.settings = settings or CircuitBreakerSettings()
+        self.state = CircuitState.CLOSED
+        # [second, successes, failures]
+        self._buckets: Deque[List[int]] = deque()
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self.times_opened = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _current(self) -> List[int]:
+        now = int(time.monotonic())
+        buckets = self._buckets
+        while buckets and buckets[0][0] <= now - self.settings.window:
+            buckets.popleft()
+        if not buckets or buckets[-1][0] != now:
+            buckets.append([now, 0, 0])
+        return buckets[-1]
+
+    def _open(self) -> None:
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._probes = 0
+        self._probe_successes = 0
+        self.times_opened += 1
+
+    def _close(self) -> None:
+        self.state = CircuitState.CLOSED
+        self._buckets.clear()
+        self._probes = 0
+        self._probe_successes = 0
+
+    def available(self) -> bool:
+        """Whether `allow()` would admit a call right now, without taking a
+        probe. A target found unavailable is counted as rejected.
+        """
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                ok = time.monotonic() - self._opened_at >= self.settings.cooldown
+            elif self.state == CircuitState.HALF_OPEN:
+                ok = self._probes < self.settings.half_open_requests
+            else:
+                ok = True
+            if not ok:
+                self.rejected += 1
+            return ok
+
+    def allow(self) -> bool:
+        """Admit a call to the target, or refuse it without any I/O. Every
+        admitted call must be followed by `record_success()`,
+        `record_failure()` or `release()`.
+        """
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if time.monotonic() - self._opened_at < self.settings.cooldown:
+                    self.rejected += 1
+                    return False
+                self.state = CircuitState.HALF_OPEN
+            if self.state == CircuitState.HALF_OPEN:
+                if self._probes >= self.settings.half_open_requests:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                if self._probes > 0:
+                    self._probes -= 1
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.settings.half_open_requests:
+                        self._close()
+            elif self.state == CircuitState.CLOSED:
+                self._current()[1] += 1
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self._open()
+            elif self.state == CircuitState.CLOSED:
+                self._current()[2] += 1
+                successes = sum(b[1] for b in self._buckets)
+                failures = sum(b[2] for b in self._buckets)
+                total = successes + failures
+                if (
+                    total >= self.settings.min_requests
+                    and failures >= self.settings.failure_rate * total
+                ):
+                    self._open()
+
+    def release(self) -> None:
+        """End an admitted call whose outcome says nothing about the target,
+        such as a cancelled hedge or a 4xx response.
+        """
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                self._current()
+            return {
+                "state": self.state.value,
+                "successes": sum(b[1] for b in self._buckets),
+                "failures": sum(b[2] for b in self._buckets),
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
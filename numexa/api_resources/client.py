@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+from .base_client import APIClient
+from .global_constants import DEFAULT_CLIENT_IDLE_TIMEOUT
+from .utils import default_api_key, default_base_url
+
+__all__ = ["ClientRegistry", "registry", "get_client", "close_clients"]
+
+ClientKey = Tuple[str, str, int]
+
+
+class _Entry:
+    __slots__ = ("client", "loop", "last_used")
+
+    def __init__(
+        self, client: APIClient, loop: asyncio.AbstractEventLoop, last_used: float
+    ) -> None:
+        self.client = client
+        self.loop = weakref.ref(loop)
+        self.last_used = last_used
+
+
+class ClientRegistry:
+    """Process-wide cache of `APIClient` instances.
+
+    An `httpx.AsyncClient` is bound to the event loop it was first used on, so
+    clients are keyed by `(base_url, api_key, event loop)`. Reusing them keeps
+    keep-alive connections pooled across `create()` calls instead of paying a
+    new TCP+TLS handshake every time.
+    """
+
+    def __init__(self, idle_timeout: float = DEFAULT_CLIENT_IDLE_TIMEOUT) -> None:
+        self.idle_timeout = idle_timeout
+        self._clients: Dict[ClientKey, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, *, base_url: Optional[str] = None, api_key: Optional[str] = None
+    ) -> APIClient:
+        """Return the pooled client for the running event loop, creating it on
+        first use. Must be called from inside a coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        api_key = api_key or default_api_key()
+        base_url = base_url or default_base_url()
+        key = (base_url, api_key, id(loop))
+        now = time.monotonic()
+        with self._lock:
+            stale = self._collect_stale(now)
+            entry = self._clients.get(key)
+            # id() of a collected loop may be reused by a new one.
+            if entry is not None and (
+                entry.loop() is not loop or entry.client.is_closed()
+            ):
+                entry = None
+            if entry is None:
+                entry = _Entry(APIClient(base_url=base_url, api_key=api_key), loop, now)
+                self._clients[key] = entry
+            entry.last_used = now
+        for stale_entry in stale:
+            self._schedule_close(stale_entry, loop)
+        return entry.client
+
+    def _collect_stale(self, now: float) -> List[_Entry]:
+        stale = []
+        for key, entry in list(self._clients.items()):
+            loop = entry.loop()
+            if loop is None or loop.is_closed():
+                # Nothing left to close the client on; let the sockets be
+                # reclaimed with the transport.
+                del self._clients[key]
+            elif (
+                now - entry.last_used > self.idle_timeout and entry.client.is_idle()
+            ):
+                del self._clients[key]
+                stale.append(entry)
+        return stale
+
+    def _schedule_close(
+        self, entry: _Entry, current: asyncio.AbstractEventLoop
+    ) -> None:
+        loop = entry.loop()
+        if loop is None or loop.is_closed():
+            return
+        if loop is current:
+            loop.create_task(entry.client.aclose())
+        elif loop.is_running():
+            asyncio.run_coroutine_threadsafe(entry.client.aclose(), loop)
+
+    async def aclose(self) -> None:
+        """Close every client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entries = []
+            for key, entry in list(self._clients.items()):
+                if entry.loop() is loop:
+                    entries.append(entry)
+                    del self._clients[key]
+        for entry in entries:
+            await entry.client.aclose()
+
+    def close(self) -> None:
+        """Close clients whose event loop is still open but no longer running.
+
+        Registered with `atexit` so pools opened under `asyncio.run()`-style
+        loops that were kept alive are shut down cleanly at interpreter exit.
+        """
+        with self._lock:
+            entries = list(self._clients.values())
+            self._clients.clear()
+        for entry in entries:
+            loop = entry.loop()
+            if loop is None or loop.is_closed() or loop.is_running():
+                continue
+            if not entry.client.is_closed():
+                loop.run_until_complete(entry.client.aclose())
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+registry = ClientRegistry()
+atexit.register(registry.close)
+
+
+def get_client(
+    *, base_url: Optional[str] = None, api_key: Optional[str] = None
+) -> APIClient:
+    return registry.get(base_url=base_url, api_key=api_key)
+
+
+async def close_clients() -> None:
+    """Close all pooled clients created on the running event loop.
+
+    Await this before the event loop exits (e.g. at the end of the coroutine
+    passed to `asyncio.run()`): it sends the request logs still queued with
+    `NUMEXA_PROXY` set, which are lost otherwise.
+    """
+    await registry.aclose()
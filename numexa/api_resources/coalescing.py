@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
+
+import httpx
+
+__all__ = ["SingleFlight", "StreamFanout"]
+
+
+class StreamFanout:
+    """Shares one streamed upstream response with any number of readers.
+
+    The upstream body is read once, by a background task started with the
+    first reader, and every chunk is kept so readers that join late replay
+    the stream from its start. If every reader closes before the body is
+    complete, and no reader announced with `expect()` is still to attach,
+    reading stops and the upstream connection is released; a reader
+    attaching after that gets `httpx.StreamClosed` instead of a truncated
+    stream.
+    """
+
+    def __init__(self, response: httpx.Response) -> None:
+        self.upstream = response
+        self._chunks: List[bytes] = []
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._readers = 0
+        # Readers announced by `expect()` that have not attached yet.
+        self._unattached = 0
+        self._pump: Optional["asyncio.Task[None]"] = None
+        self._changed: Optional["asyncio.Future[None]"] = None
+
+    def response(self) -> httpx.Response:
+        """A new response over the shared body, for one reader."""
+        return httpx.Response(
+            status_code=self.upstream.status_code,
+            headers=self.upstream.headers,
+            stream=_FanoutByteStream(self),
+            request=self.upstream.request,
+        )
+
+    def _notify(self) -> None:
+        if self._changed is not None and not self._changed.done():
+            self._changed.set_result(None)
+        self._changed = None
+
+    async def _run(self) -> None:
+        try:
+            async for chunk in self.upstream.aiter_raw():
+                self._chunks.append(chunk)
+                self._notify()
+        except asyncio.CancelledError:
+            self._error = httpx.StreamClosed()
+            raise
+        except Exception as err:
+            # Re-raised to each reader instead.
+            self._error = err
+        finally:
+            self._done = True
+            self._notify()
+            await self.upstream.aclose()
+
+    async def _read(self) -> AsyncIterator[bytes]:
+        if self._pump is None:
+            self._pump = asyncio.get_running_loop().create_task(self._run())
+        position = 0
+        while True:
+            while position < len(self._chunks):
+                yield self._chunks[position]
+                position += 1
+            if self._done:
+                if self._error is not None:
+                    raise self._error
+                return
+            if self._changed is None:
+                self._changed = asyncio.get_running_loop().create_future()
+            await asyncio.shield(self._changed)
+
+    def expect(self, readers: int) -> None:
+        """Keep the body flowing until `readers` more readers attach."""
+        self._unattached += readers
+
+    def detach(self) -> None:
+        """Withdraw one reader announced with `expect()` that never attached."""
+        self._unattached = max(0, self._unattached - 1)
+        self._stop_if_unread()
+
+    def _open(self) -> None:
+        self._readers += 1
+        self._unattached = max(0, self._unattached - 1)
+
+    def _close(self) -> None:
+        self._readers -= 1
+        self._stop_if_unread()
+
+    def _stop_if_unread(self) -> None:
+        if (
+            self._readers == 0
+            and self._unattached == 0
+            and self._pump is not None
+            and not self._done
+        ):
+            self._pump.cancel()
+
+
+class _FanoutByteStream(httpx.AsyncByteStream):
+    def __init__(self, fanout: StreamFanout) -> None:
+        self._fanout = fanout
+        self._closed = False
+        fanout._open()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._fanout._read():
+            yield chunk
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._fanout._close()
+
+
+Shared = Union[httpx.Response, StreamFanout]
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into a single upstream call.
+
+    The first caller of `do()` for a key runs the call; callers arriving with
+    the same key while it is in flight wait for it and get the same result,
+    or the same error. The call runs in its own task, so cancelling one
+    waiter does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, "asyncio.Task[Shared]"] = {}
+        # Callers waiting on each call, each of whom reads a shared stream.
+        self._waiting: Dict["asyncio.Task[Shared]", int] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Shared]]) -> Shared:
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        self._waiting[task] = self._waiting.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                self._waiting[task] -= 1
+            elif not task.cancelled() and task.exception() is None:
+                shared = task.result()
+                if isinstance(shared, StreamFanout):
+                    # Counted as a reader by _finished, but will not read.
+                    shared.detach()
+            raise
+
+    def _finished(self, key: str, task: "asyncio.Task[Shared]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        waiting = self._waiting.pop(task, 0)
+        if task.cancelled():
+            return
+        # Mark the error as retrieved in case every waiter went away.
+        if task.exception() is None:
+            shared = task.result()
+            if isinstance(shared, StreamFanout):
+                shared.expect(waiting)
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -1,8 +1,11 @@
 from typing import TypeVar, Union, Any
-from .streaming import Stream
+from .streaming import Stream, AsyncStream
 from .utils import ChatCompletionChunk, TextCompletionChunk, GenericResponse
 
 StreamT = TypeVar(
     "StreamT",
-    bound=Stream[Union[ChatCompletionChunk, TextCompletionChunk, GenericResponse]],
+    bound=Union[
+        Stream[Union[ChatCompletionChunk, TextCompletionChunk, GenericResponse]],
+        AsyncStream[Union[ChatCompletionChunk, TextCompletionChunk, GenericResponse]],
+    ],
 )
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+
+from .latency import LatencyTracker
+from .utils import AdaptiveConcurrencySettings
+
+__all__ = ["AdaptiveLimiter", "Overloaded", "is_overload"]
+
+
+class Overloaded(httpx.RequestError):
+    """A call shed by its target's concurrency limiter before any I/O.
+
+    Not a transport error, so it is neither retried nor held against the
+    target by its circuit breaker.
+    """
+
+
+def is_overload(err: BaseException) -> bool:
+    """Whether an error says the target is taking more than it can serve."""
+    if isinstance(err, httpx.HTTPStatusError):
+        return err.response.status_code in (429, 503)
+    return isinstance(err, httpx.TimeoutException)
+
+
+class AdaptiveLimiter:
+    """AIMD limit on the calls in flight to one llm target.
+
+    Every completed call is a sample. A timeout, 429 or 503, or a latency
+    above `latency_tolerance` times the baseline (the 10th percentile of
+    recent latencies) cuts the limit to `backoff_ratio` of itself. Any other
+    success while at least half the limit is in use raises it by one. Calls
+    over the limit wait in a FIFO queue of at most `max_queue` callers, for
+    at most `queue_timeout` seconds; beyond that they are shed.
+    """
+
+    def __init__(self, settings: Optional[AdaptiveConcurrencySettings] = None) -> None:
+        self.settings = settings or AdaptiveConcurrencySettings()
+        self.limit = float(self.settings.initial_limit)
+        self.in_flight = 0
+        self.shed = 0
+        self._latencies = LatencyTracker(self.settings.window)
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    async def acquire(self, request: httpx.Request) -> None:
+        """Take a slot, queueing for one if the target is at its limit.
+        Raises `Overloaded` when the queue is full or the wait times out.
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.settings.max_queue:
+            self.shed += 1
+            raise Overloaded("Concurrency limit reached.", request=request)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(waiter), timeout=self.settings.queue_timeout
+            )
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.shed += 1
+            raise Overloaded("Timed out waiting for a slot.", request=request) from None
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def _abandon(self, waiter: "asyncio.Future[None]") -> None:
+        if waiter.done() and not waiter.cancelled():
+            # The slot was handed over just as we gave up on it.
+            self.release()
+        else:
+            waiter.cancel()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, latency: Optional[float] = None, overload: bool = False) -> None:
+        """Give back a slot, adjusting the limit with the call's outcome.
+        Calls with neither a latency nor an overload are not sampled.
+        """
+        settings = self.settings
+        if overload:
+            self.limit = max(settings.min_limit, self.limit * settings.backoff_ratio)
+        elif latency is not None:
+            baseline = (
+                self._latencies.percentile(10)
+                if len(self._latencies) >= settings.min_samples
+                else None
+            )
+            self._latencies.record(latency)
+            if baseline and latency > baseline * settings.latency_tolerance:
+                self.limit = max(
+                    settings.min_limit, self.limit * settings.backoff_ratio
+                )
+            elif self.in_flight * 2 >= self.limit:
+                self.limit = min(settings.max_limit, self.limit + 1)
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "shed": self.shed,
+            "baseline_latency": self._latencies.percentile(10),
+        }
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Mapping, Optional
+
+import httpx
+
+from .utils import TimeoutSettings
+
+__all__ = ["Deadline", "DeadlineExceeded", "attempt_timeout"]
+
+_PHASES = ("connect", "read", "write", "pool")
+# Timers may fire a little before the deadline they were derived from.
+_SLACK = 0.01
+
+
+class DeadlineExceeded(httpx.RequestError):
+    """The time budget of a call ran out.
+
+    Not a timeout of the target itself, so it is neither retried nor held
+    against the target by its circuit breaker.
+    """
+
+
+class Deadline:
+    """Point in time by which a call, with all its attempts and retries, has
+    to be done.
+    """
+
+    def __init__(self, budget: float) -> None:
+        self.budget = budget
+        self.expires = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires - time.monotonic() <= _SLACK
+
+
+def attempt_timeout(
+    current: Mapping[str, Optional[float]],
+    settings: Optional[TimeoutSettings] = None,
+    deadline: Optional[Deadline] = None,
+) -> Dict[str, Optional[float]]:
+    """httpx timeouts of one attempt, per phase.
+
+    A phase set in `settings` is capped at the time left before `deadline`;
+    one that is not gets all of the time left, or keeps its `current` value
+    when there is no deadline.
+    """
+    remaining = None if deadline is None else deadline.remaining()
+    timeouts: Dict[str, Optional[float]] = {}
+    for phase in _PHASES:
+        value = getattr(settings, phase) if settings is not None else None
+        if value is None:
+            value = remaining if remaining is not None else current.get(phase)
+        elif remaining is not None:
+            value = min(value, remaining)
+        timeouts[phase] = value
+    return timeouts
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from .cache import CacheBackend
+from .global_constants import (
+    DEFAULT_CACHE_AGE,
+    DEFAULT_CACHE_COMPACT_INTERVAL,
+    DEFAULT_CACHE_MAX_ENTRIES,
+)
+
+__all__ = ["SQLiteCache"]
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    body BLOB NOT NULL
+) WITHOUT ROWID
+"""
+
+
+class SQLiteCache(CacheBackend):
+    """Response cache in an SQLite file, shared by every process using it.
+
+    The database runs in WAL mode, so readers never block the writer and
+    each other, and concurrent writers from other processes wait up to
+    `busy_timeout` seconds for the lock. Each thread of each process opens
+    its own connection, which keeps the cache safe across `fork()`. Queries
+    run in the event loop's default executor.
+
+    Expired entries are deleted in the background every `compact_interval`
+    seconds, after which the oldest entries are dropped if there are more
+    than `max_entries`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        compact_interval: float = DEFAULT_CACHE_COMPACT_INTERVAL,
+        busy_timeout: float = 5.0,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.compact_interval = compact_interval
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._compacting = False
+        self._compacted_at = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._connect().close()
+        del self._local.connection
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path, timeout=self.busy_timeout, isolation_level=None
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL makes commits durable at checkpoints; a lost cache entry on
+        # power failure is fine.
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(_SCHEMA)
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        # A connection inherited through fork() must not be used.
+        if connection is None or self._local.pid != os.getpid():
+            connection = self._connect()
+        return connection
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    def get_nowait(self, key: str, max_age: Optional[float] = None) -> Optional[bytes]:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT stored_at, expires_at, body FROM responses WHERE key = ?",
+                (key,),
+            )
+            .fetchone()
+        )
+        now = time.time()
+        if row is not None:
+            stored_at, expires_at, body = row
+            if now < expires_at and (max_age is None or now - stored_at <= max_age):
+                self.hits += 1
+                return bytes(body)
+        self.misses += 1
+        return None
+
+    def set_nowait(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + (DEFAULT_CACHE_AGE if ttl is None else ttl)
+        self._connection().execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+            (key, now, expires_at, value),
+        )
+
+    def compact(self) -> int:
+        """Delete expired entries and trim to `max_entries`, returning how
+        many were removed.
+        """
+        connection = self._connection()
+        removed = connection.execute(
+            "DELETE FROM responses WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+        removed_over = 0
+        (count,) = connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            removed_over = connection.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY stored_at LIMIT ?)",
+                (excess,),
+            ).rowcount
+            self.evictions += removed_over
+        return removed + removed_over
+
+    def _maybe_compact(self) -> None:
+        if self._compacting or time.time() - self._compacted_at < self.compact_interval:
+            return
+        self._compacting = True
+
+        def run() -> None:
+            try:
+                self.compact()
+            finally:
+                self._compacted_at = time.time()
+                self._compacting = False
+
+        asyncio.get_running_loop().run_in_executor(None, run)
+
+    async def get(self, key: str, max_age: Optional[float] = None) -> Optional[bytes]:
+        return await self._run(self.get_nowait, key, max_age)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        await self._run(self.set_nowait, key, value, ttl)
+        self._maybe_compact()
+
+    async def delete(self, key: str) -> None:
+        await self._run(self._delete, key)
+
+    def _delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, int]:
+        connection = self._connection()
+        (entries, size) = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses"
+        ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
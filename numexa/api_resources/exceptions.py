@@ -1,3 +1,5 @@
+from typing import List
+
 from typing_extensions import Literal
 
 from httpx import Request, Response
@@ -134,3 +136,22 @@ class APIConnectionError(APIError):
 class APITimeoutError(APIConnectionError):
     def __init__(self, request: Request) -> None:
         super().__init__(request, "Request timed out.")
+
+
+class CircuitOpenError(APIConnectionError):
+    """Raised without any I/O when the circuit of every target is open."""
+
+    def __init__(self, request: Request, targets: List[str]) -> None:
+        super().__init__(
+            request, f"Circuit open for every target: {', '.join(targets)}."
+        )
+        self.targets = targets
+
+
+class ConcurrencyLimitError(APIConnectionError):
+    """Raised when a call is shed because its targets are at their adaptive
+    concurrency limit and the wait queue is full or timed out.
+    """
+
+    def __init__(self, request: Request) -> None:
+        super().__init__(request, "Concurrency limit reached.")
@@ -33,5 +33,47 @@ NUMEXA_DIRECT_URL = "https://api.openai.com/v1"
 NUMEXA_API_KEY = "NUMEXA_API_KEY"
 NUMEXA_PROXY_URL = "https://app.numexa.io/proxy/v1/openai"
 NUMEXA_PROXY = "NUMEXA_PROXY"
+NUMEXA_JSON = "NUMEXA_JSON"
 OPEN_API_KEY = "OPEN_API_KEY"
 NUMEXA_INGEST_LOGS = "https://app.numexa.io/proxy/v1/logs"
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_CLIENT_IDLE_TIMEOUT = 300.0
+DEFAULT_LOG_QUEUE_SIZE = 10000
+DEFAULT_LOG_BATCH_SIZE = 100
+DEFAULT_LOG_FLUSH_INTERVAL = 1.0
+DEFAULT_HEDGE_DELAY = 1.0
+DEFAULT_MAX_ROUTERS = 256
+DEFAULT_RETRY_STATUS_CODES = [408, 429, 500, 502, 503, 504]
+DEFAULT_RETRY_BASE_DELAY = 0.5
+DEFAULT_RETRY_MAX_DELAY = 8.0
+DEFAULT_RETRY_BUDGET_RATIO = 0.2
+DEFAULT_RETRY_BUDGET_MIN_PER_SECOND = 1.0
+DEFAULT_RETRY_BUDGET_WINDOW = 10.0
+DEFAULT_CACHE_AGE = 3600
+DEFAULT_CACHE_MAX_ENTRIES = 10000
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_CACHE_COMPACT_INTERVAL = 300
+DEFAULT_CACHE_COMPRESS_MIN_BYTES = 1024
+DEFAULT_CACHE_NEGATIVE_TTL = 1.0
+DEFAULT_REDIS_KEY_PREFIX = "numexa:cache:"
+DEFAULT_REDIS_TIMEOUT = 0.5
+DEFAULT_REDIS_RECONNECT_DELAY = 1.0
+DEFAULT_SEMANTIC_CACHE_THRESHOLD = 0.9
+DEFAULT_SEMANTIC_CACHE_DIM = 1024
+DEFAULT_SEMANTIC_CACHE_MAX_ENTRIES = 4096
+DEFAULT_SEMANTIC_CACHE_CANDIDATES = 32
+DEFAULT_BATCH_CONCURRENCY = 16
+DEFAULT_CHECKPOINT_EVERY = 100
+DEFAULT_CIRCUIT_FAILURE_RATE = 0.5
+DEFAULT_CIRCUIT_WINDOW = 60.0
+DEFAULT_CIRCUIT_MIN_REQUESTS = 10
+DEFAULT_CIRCUIT_COOLDOWN = 30.0
+DEFAULT_RATE_LIMIT_BURST = 1.0
+DEFAULT_COMPLETION_TOKENS_ESTIMATE = 256
+DEFAULT_CONCURRENCY_INITIAL_LIMIT = 20
+DEFAULT_CONCURRENCY_MAX_LIMIT = 200
+DEFAULT_CONCURRENCY_BACKOFF_RATIO = 0.9
+DEFAULT_CONCURRENCY_LATENCY_TOLERANCE = 2.0
+DEFAULT_CONCURRENCY_MAX_QUEUE = 1000
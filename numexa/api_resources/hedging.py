@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+from .global_constants import DEFAULT_HEDGE_DELAY
+from .latency import LatencyTracker
+from .utils import HedgingSettings
+
+__all__ = ["hedge_delay", "send_hedged"]
+
+Attempt = Callable[[], Awaitable[httpx.Response]]
+
+
+def hedge_delay(
+    settings: HedgingSettings, tracker: Optional[LatencyTracker] = None
+) -> float:
+    """How long to wait on a target before firing the next one.
+
+    With `percentile` set, the delay follows the target's recent latency once
+    `min_samples` have been seen; until then, or without it, `delay` is used.
+    """
+    delay = settings.delay if settings.delay is not None else DEFAULT_HEDGE_DELAY
+    if (
+        settings.percentile is not None
+        and tracker is not None
+        and len(tracker) >= settings.min_samples
+    ):
+        delay = tracker.percentile(settings.percentile) or delay
+    delay = max(delay, settings.min_delay)
+    if settings.max_delay is not None:
+        delay = min(delay, settings.max_delay)
+    return delay
+
+
+async def _discard(tasks: Sequence["asyncio.Task[httpx.Response]"]) -> None:
+    for task in tasks:
+        task.cancel()
+    for result in await asyncio.gather(*tasks, return_exceptions=True):
+        # A loser may have completed before it could be cancelled; close it
+        # so its connection goes back to the pool.
+        if isinstance(result, httpx.Response):
+            await result.aclose()
+
+
+async def send_hedged(
+    attempts: List[Attempt], delays: Callable[[int], float]
+) -> httpx.Response:
+    """Run `attempts` in order, starting the next one early when the latest has
+    not finished within `delays(index)` seconds, or straight away when an
+    attempt fails. The first successful response wins and every other attempt
+    still running is cancelled. Raises the last error if all attempts fail.
+    """
+    if not attempts:
+        raise ValueError("send_hedged() requires at least one attempt")
+    pending: Dict["asyncio.Task[httpx.Response]", int] = {}
+    launched = 0
+    last_error: Optional[BaseException] = None
+
+    def launch() -> None:
+        nonlocal launched
+        task = asyncio.ensure_future(attempts[launched]())
+        pending[task] = launched
+        launched += 1
+
+    launch()
+    try:
+        while pending:
+            timeout = delays(launched - 1) if launched < len(attempts) else None
+            done, _ = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                launch()
+                continue
+            failed = False
+            winner: Optional[httpx.Response] = None
+            for task in done:
+                del pending[task]
+                if task.exception() is None:
+                    if winner is None:
+                        winner = task.result()
+                    else:
+                        await task.result().aclose()
+                else:
+                    last_error = task.exception()
+                    failed = True
+            if winner is not None:
+                return winner
+            if failed and launched < len(attempts):
+                launch()
+    finally:
+        if pending:
+            await _discard(list(pending))
+    assert last_error is not None
+    raise last_error
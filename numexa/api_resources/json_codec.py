@@ -0,0 +1,120 @@
+"""JSON encoding and decoding for request bodies, responses, streamed events
+and logs.
+
+The backend is chosen once, at import: orjson if it is installed, then
+msgspec, then the standard library. Set `NUMEXA_JSON` to `orjson`, `msgspec`
+or `json` to pick one. Every backend returns the same Python values; only
+the whitespace of encoded output may differ.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Callable, Optional, Tuple, Union
+
+from .global_constants import NUMEXA_JSON
+
+__all__ = ["backend", "dumps", "ascii_dumps", "loads", "pretty"]
+
+Default = Optional[Callable[[Any], Any]]
+
+
+def _stdlib_dumps(obj: Any, default: Default = None) -> bytes:
+    return json.dumps(
+        obj, default=default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _stdlib_loads(data: Union[bytes, bytearray, str]) -> Any:
+    if isinstance(data, (bytes, bytearray)):
+        # Decoding first skips json.loads' encoding detection for bytes.
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+def _orjson() -> Tuple[Callable[..., bytes], Callable[[Any], Any]]:
+    import orjson
+
+    options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any, default: Default = None) -> bytes:
+        try:
+            return orjson.dumps(obj, default=default, option=options)
+        except TypeError:
+            # e.g. integers wider than 64 bits
+            return _stdlib_dumps(obj, default)
+
+    return dumps, orjson.loads
+
+
+def _msgspec() -> Tuple[Callable[..., bytes], Callable[[Any], Any]]:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decode = msgspec.json.decode
+
+    def dumps(obj: Any, default: Default = None) -> bytes:
+        try:
+            if default is None:
+                return encoder.encode(obj)
+            return msgspec.json.encode(obj, enc_hook=default)
+        except (TypeError, msgspec.EncodeError):
+            return _stdlib_dumps(obj, default)
+
+    def loads(data: Union[bytes, bytearray, str]) -> Any:
+        try:
+            return decode(data)
+        except msgspec.DecodeError as err:
+            # Callers handle malformed JSON as ValueError, as with json.
+            raise ValueError(str(err)) from err
+
+    return dumps, loads
+
+
+_BACKENDS = {"orjson": _orjson, "msgspec": _msgspec}
+
+
+def _select(
+    name: Optional[str],
+) -> Tuple[str, Callable[..., bytes], Callable[[Any], Any]]:
+    if name == "json":
+        return "json", _stdlib_dumps, _stdlib_loads
+    for candidate in [name] if name else list(_BACKENDS):
+        if candidate not in _BACKENDS:
+            raise ValueError(f"Unknown {NUMEXA_JSON} backend: {candidate!r}")
+        try:
+            dumps, loads = _BACKENDS[candidate]()
+        except ImportError:
+            if name:
+                raise
+            continue
+        return candidate, dumps, loads
+    return "json", _stdlib_dumps, _stdlib_loads
+
+
+backend, _dumps, _loads = _select(os.environ.get(NUMEXA_JSON) or None)
+
+
+def dumps(obj: Any, default: Default = None) -> bytes:
+    """Compact UTF-8 JSON of `obj`; `default` converts what the backend
+    cannot encode itself.
+    """
+    return _dumps(obj, default)
+
+
+def ascii_dumps(obj: Any) -> str:
+    """JSON of `obj` with only ASCII characters, as HTTP header values need."""
+    text = _dumps(obj, None).decode("utf-8")
+    return text if text.isascii() else json.dumps(obj, separators=(",", ":"))
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """Value of a JSON document. Malformed input raises ValueError."""
+    return _loads(data)
+
+
+def pretty(obj: Any) -> str:
+    """Indented JSON of `obj` for display. Always rendered by the standard
+    library, so the text is the same whichever backend is active.
+    """
+    return json.dumps(obj, indent=4)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Deque, Optional, Sequence
+
+__all__ = ["percentile", "LatencyTracker"]
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of `values`, `q` in [0, 100]."""
+    if not values:
+        raise ValueError("percentile() of an empty sequence")
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class LatencyTracker:
+    """Rolling window of the most recent latencies of one target, in seconds."""
+
+    def __init__(self, window: int = 100) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        return percentile(self._samples, q)
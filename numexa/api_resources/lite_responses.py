@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from typing import Any, ClassVar, Dict, Mapping, Optional, Type, TypeVar
+
+from .json_codec import dumps, pretty
+from .utils import (
+    ChatCompletion,
+    ChatCompletionChunk,
+    TextCompletion,
+    TextCompletionChunk,
+)
+
+__all__ = [
+    "LiteResponse",
+    "LiteChatCompletion",
+    "LiteChatCompletionChunk",
+    "LiteTextCompletion",
+    "LiteTextCompletionChunk",
+    "lite_type",
+]
+
+LiteT = TypeVar("LiteT", bound="LiteResponse")
+
+_MISSING = object()
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, LiteResponse):
+        return value.dict()
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _field(
+    name: str,
+    default: Any,
+    lists: Mapping[str, Type["LiteResponse"]],
+    objects: Mapping[str, Type["LiteResponse"]],
+) -> property:
+    list_view = lists.get(name)
+    object_view = objects.get(name)
+    if isinstance(default, dict):
+        # Mutable defaults are copied, as pydantic does.
+        default_factory: Any = dict
+    else:
+        default_factory = None
+
+    if list_view is None and object_view is None:
+        if default_factory is None:
+
+            def read(self: "LiteResponse") -> Any:
+                return self._data.get(name, default)
+
+        else:
+
+            def read(self: "LiteResponse") -> Any:
+                value = self._data.get(name, _MISSING)
+                return default_factory() if value is _MISSING else value
+
+        return property(read)
+
+    def read_nested(self: "LiteResponse") -> Any:
+        views = self._views
+        if views is not None and name in views:
+            return views[name]
+        value = self._data.get(name, _MISSING)
+        if value is _MISSING:
+            return default if default_factory is None else default_factory()
+        if list_view is not None and isinstance(value, list):
+            view = list_view.from_dict
+            value = [view(v) if isinstance(v, dict) else v for v in value]
+        elif object_view is not None and isinstance(value, dict):
+            value = object_view.from_dict(value)
+        else:
+            return value
+        if views is None:
+            views = self._views = {}
+        views[name] = value
+        return value
+
+    return property(read_nested)
+
+
+class LiteResponse:
+    """Read-only view over a parsed response dict, without validation.
+
+    Fields have the same names and defaults as on the pydantic models and
+    support the same attribute, `[]` and `get()` access, but values are
+    returned as they were parsed. Nested objects are only wrapped in views
+    when first accessed.
+    """
+
+    __slots__ = ("_data", "_views")
+
+    # field -> default
+    _fields: ClassVar[Dict[str, Any]] = {}
+    # field -> view class of each dict in a list value
+    _lists: ClassVar[Dict[str, Type["LiteResponse"]]] = {}
+    # field -> view class of a dict value
+    _objects: ClassVar[Dict[str, Type["LiteResponse"]]] = {}
+
+    def __init__(self, **data: Any) -> None:
+        self._data: Mapping[str, Any] = data
+        self._views: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls: Type[LiteT], data: Mapping[str, Any]) -> LiteT:
+        view = cls.__new__(cls)
+        view._data = data
+        view._views = None
+        return view
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # One property per field: a read is a single descriptor call.
+        for name, default in cls._fields.items():
+            setattr(cls, name, _field(name, default, cls._lists, cls._objects))
+
+    def __getitem__(self, key: str) -> Any:
+        return getattr(self, key, None)
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        return getattr(self, key, None) or default
+
+    def dict(self) -> Dict[str, Any]:
+        return {name: _plain(getattr(self, name)) for name in self._fields}
+
+    def json(self) -> str:
+        return dumps(self.dict()).decode("utf-8")
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LiteResponse):
+            return type(self) is type(other) and self.dict() == other.dict()
+        return NotImplemented
+
+    def __str__(self) -> str:
+        return pretty(self.dict())
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.dict().items())
+        return f"{type(self).__name__}({fields})"
+
+
+class LiteDelta(LiteResponse):
+    __slots__ = ()
+    _fields = {"role": None, "content": ""}
+
+
+class LiteUsage(LiteResponse):
+    __slots__ = ()
+    _fields = {"prompt_tokens": None, "completion_tokens": None, "total_tokens": None}
+
+
+class LiteStreamChoice(LiteResponse):
+    __slots__ = ()
+    _fields = {"index": None, "delta": {}, "finish_reason": None}
+    _objects = {"delta": LiteDelta}
+
+
+class LiteChatChoice(LiteResponse):
+    __slots__ = ()
+    _fields = {"index": None, "message": None, "finish_reason": None}
+
+
+class LiteTextChoice(LiteResponse):
+    __slots__ = ()
+    _fields = {"index": None, "text": None, "logprobs": None, "finish_reason": None}
+
+
+class LiteChatCompletionChunk(LiteResponse):
+    __slots__ = ()
+    _fields = {"id": None, "object": None, "created": None, "model": None, "choices": {}}
+    _lists = {"choices": LiteStreamChoice}
+
+
+class LiteChatCompletion(LiteResponse):
+    __slots__ = ()
+    _fields = {
+        "id": None,
+        "object": None,
+        "created": None,
+        "model": None,
+        "choices": {},
+        "usage": None,
+    }
+    _lists = {"choices": LiteChatChoice}
+    _objects = {"usage": LiteUsage}
+
+
+class LiteTextCompletionChunk(LiteResponse):
+    __slots__ = ()
+    _fields = {"id": None, "object": None, "created": None, "model": None, "choices": {}}
+    _lists = {"choices": LiteTextChoice}
+
+
+class LiteTextCompletion(LiteResponse):
+    __slots__ = ()
+    _fields = LiteChatCompletion._fields
+    _lists = {"choices": LiteTextChoice}
+    _objects = {"usage": LiteUsage}
+
+
+_LITE_TYPES: Dict[type, type] = {
+    ChatCompletion: LiteChatCompletion,
+    ChatCompletionChunk: LiteChatCompletionChunk,
+    TextCompletion: LiteTextCompletion,
+    TextCompletionChunk: LiteTextCompletionChunk,
+}
+
+
+def lite_type(cast_to: type) -> type:
+    """Lite counterpart of a response model, or the model itself if it has
+    none.
+    """
+    return _LITE_TYPES.get(cast_to, cast_to)
+
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from .global_constants import (
+    NUMEXA_HEADER_PREFIX,
+    NUMEXA_INGEST_LOGS,
+    DEFAULT_LOG_QUEUE_SIZE,
+    DEFAULT_LOG_BATCH_SIZE,
+    DEFAULT_LOG_FLUSH_INTERVAL,
+)
+from .json_codec import dumps, loads
+
+__all__ = ["LogShipper", "log_timestamp", "source_ip"]
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def log_timestamp() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+@lru_cache(maxsize=None)
+def source_ip() -> str:
+    # Resolved once per process; gethostbyname may hit DNS.
+    return socket.gethostbyname(socket.gethostname())
+
+
+def _decode_body(body: Union[bytes, Any]) -> Any:
+    if not isinstance(body, (bytes, bytearray)):
+        return body
+    try:
+        return loads(body)
+    except ValueError:
+        return body.decode("utf-8", errors="replace")
+
+
+class LogShipper:
+    """Ships request/response logs to Numexa (monger) off the request path.
+
+    Records are put on a bounded queue and a background task sends them, so
+    logging never delays a call. The ingestion endpoint takes one record per
+    request, so every record is still its own POST; the task only groups up
+    to `max_batch_size` of them, or what arrived within `flush_interval`
+    seconds, to send concurrently. When the queue is full new records are
+    dropped rather than slowing down the caller.
+
+    Records still queued when the event loop exits are lost: await
+    `aclose()` (or `numexa.close_clients()`) before `asyncio.run()` returns.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        *,
+        api_key: Optional[str] = None,
+        url: str = NUMEXA_INGEST_LOGS,
+        max_queue_size: int = DEFAULT_LOG_QUEUE_SIZE,
+        max_batch_size: int = DEFAULT_LOG_BATCH_SIZE,
+        flush_interval: float = DEFAULT_LOG_FLUSH_INTERVAL,
+    ) -> None:
+        self._client = client
+        self.api_key = api_key
+        self.url = url
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.shipped = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def submit(self, log_type: str, record: Dict[str, Any]) -> bool:
+        """Queue a record without waiting. Returns False if it was dropped."""
+        if self._closed:
+            self.dropped += 1
+            return False
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        try:
+            self._queue.put_nowait((log_type, record))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            stop = False
+            while len(batch) < self.max_batch_size:
+                if queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = queue.get_nowait()
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            await self._ship(batch)
+            if stop:
+                return
+
+    async def _ship(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        results = await asyncio.gather(
+            *(self._post(log_type, record) for log_type, record in batch)
+        )
+        self.shipped += sum(results)
+        self.failed += len(results) - sum(results)
+        self.flushes += 1
+
+    async def _post(self, log_type: str, record: Dict[str, Any]) -> bool:
+        for field in ("request_body", "response_body"):
+            if field in record:
+                record[field] = _decode_body(record[field])
+        headers = {
+            "Content-Type": "application/json",
+            f"{NUMEXA_HEADER_PREFIX}Log-Type": log_type,
+        }
+        if self.api_key:
+            headers[f"{NUMEXA_HEADER_PREFIX}Api-Key"] = self.api_key
+        try:
+            res = await self._client.post(
+                self.url,
+                headers=headers,
+                content=dumps(record, default=str),
+            )
+            res.raise_for_status()
+        except Exception as err:  # logging must never break the caller
+            logger.warning("Dropped a Numexa %s log record: %s", log_type, err)
+            return False
+        return True
+
+    async def aclose(self) -> None:
+        """Stop accepting records and flush the ones already queued."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._queue is None or self._task is None or self._task.done():
+            return
+        await self._queue.put(_STOP)
+        await self._task
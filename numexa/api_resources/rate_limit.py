@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from .global_constants import (
+    DEFAULT_RATE_LIMIT_BURST,
+    DEFAULT_COMPLETION_TOKENS_ESTIMATE,
+)
+
+__all__ = ["TokenBucket", "RateLimiter", "estimate_tokens", "usage_tokens"]
+
+
+def estimate_tokens(params: Optional[Mapping[str, Any]]) -> int:
+    """Rough upper bound of the tokens a request will be billed for.
+
+    Prompt tokens are taken as one per four characters of message content
+    plus a few per message for the chat framing; completion tokens as
+    `max_tokens` (or `DEFAULT_COMPLETION_TOKENS_ESTIMATE`) per choice.
+    """
+    params = params or {}
+    chars = len(params.get("prompt") or "")
+    messages = params.get("messages") or []
+    for message in messages:
+        content = message.get("content") if isinstance(message, Mapping) else None
+        chars += len(content) if isinstance(content, str) else 0
+    prompt = chars // 4 + 4 * len(messages)
+    completion = params.get("max_tokens") or DEFAULT_COMPLETION_TOKENS_ESTIMATE
+    return prompt + completion * (params.get("n") or 1)
+
+
+def usage_tokens(body: bytes) -> Optional[int]:
+    """`usage.total_tokens` of a completion body, or None if it has none.
+
+    Providers put `usage` at the end of the body, so it is decoded on its own
+    rather than parsing the whole response a second time.
+    """
+    start = body.rfind(b'"usage"')
+    if start < 0:
+        return None
+    text = body[start + len(b'"usage"') :].decode("utf-8", "replace").lstrip()
+    if not text.startswith(":"):
+        return None
+    # Stays on the standard library: json_codec backends only decode whole
+    # documents, and raw_decode stops at the end of the usage object.
+    try:
+        usage, _ = json.JSONDecoder().raw_decode(text[1:].lstrip())
+    except ValueError:
+        return None
+    total = usage.get("total_tokens") if isinstance(usage, dict) else None
+    return total if isinstance(total, int) else None
+
+
+class TokenBucket:
+    """Refills at `rate` per second up to `capacity`.
+
+    A cost larger than the capacity is let through once the bucket is full
+    and leaves it in debt, so big requests are paced instead of blocked.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, cost: float) -> float:
+        """Seconds until `cost` can be taken."""
+        self._refill()
+        needed = min(cost, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def take(self, cost: float) -> None:
+        self._refill()
+        self.tokens -= cost
+
+    def give(self, amount: float) -> None:
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets of one llm target.
+
+    Each budget is a token bucket holding `burst` seconds worth of it, so
+    requests are paced evenly over the minute rather than sent in a burst
+    that the provider answers with 429s. Callers wait in arrival order.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        burst: float = DEFAULT_RATE_LIMIT_BURST,
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.requests = self._bucket(requests_per_minute, burst)
+        self.tokens = self._bucket(tokens_per_minute, burst)
+        self._queue: Optional[asyncio.Lock] = None
+        self.waiting = 0
+        self.delayed = 0
+
+    @staticmethod
+    def _bucket(per_minute: Optional[int], burst: float) -> Optional[TokenBucket]:
+        if not per_minute:
+            return None
+        rate = per_minute / 60
+        return TokenBucket(rate, max(1.0, rate * burst))
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Wait until one request of `tokens` estimated tokens fits both
+        budgets, then take it from them.
+        """
+        if self._queue is None:
+            self._queue = asyncio.Lock()
+        self.waiting += 1
+        try:
+            async with self._queue:
+                delayed = False
+                while True:
+                    delay = max(
+                        self.requests.wait_time(1) if self.requests else 0.0,
+                        self.tokens.wait_time(tokens) if self.tokens else 0.0,
+                    )
+                    if delay <= 0:
+                        break
+                    delayed = True
+                    await asyncio.sleep(delay)
+                self.delayed += delayed
+                if self.requests:
+                    self.requests.take(1)
+                if self.tokens:
+                    self.tokens.take(tokens)
+        finally:
+            self.waiting -= 1
+
+    def reconcile(self, estimated: int, actual: Optional[int]) -> None:
+        """Correct the token budget once the billed usage is known. An
+        `actual` of None refunds the whole estimate.
+        """
+        if self.tokens is not None:
+            self.tokens.give(estimated - (actual or 0))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "waiting": self.waiting,
+            "delayed": self.delayed,
+        }
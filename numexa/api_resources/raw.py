@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import Any
+
+import httpx
+
+from .json_codec import loads
+from .streaming import AsyncStream, ServerSentEvent
+
+__all__ = ["RawResponse", "RawStream"]
+
+
+class RawResponse:
+    """Upstream response of a `raw=True` call, never parsed into a model.
+
+    `content` is the body after any `Content-Encoding` has been undone, so
+    drop that header and `Content-Length` when forwarding `headers`.
+    """
+
+    __slots__ = ("status_code", "headers", "content")
+
+    def __init__(self, status_code: int, headers: httpx.Headers, content: bytes) -> None:
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "RawResponse":
+        return cls(response.status_code, response.headers, response.content)
+
+    @classmethod
+    def from_cache(cls, content: bytes) -> "RawResponse":
+        """A body served by the response cache, with no upstream headers."""
+        return cls(200, httpx.Headers({"content-type": "application/json"}), content)
+
+    def json(self) -> Any:
+        return loads(self.content)
+
+    def __repr__(self) -> str:
+        return f"RawResponse(status_code={self.status_code}, content={len(self.content)} bytes)"
+
+
+class RawStream(AsyncStream[Any]):
+    """Stream of a `raw=True` call, yielding the `data` payload of each event
+    as bytes, including the closing `[DONE]`. Status and headers are on
+    `response`.
+    """
+
+    def _item(self, sse: ServerSentEvent) -> Any:
+        return sse.raw_data
+
+    def _record(self, item: Any) -> None:
+        # Payloads are only decoded here, to keep the text a resumed stream
+        # continues from.
+        try:
+            choice = loads(item)["choices"][0]
+            text = (choice.get("delta") or {}).get("content") or choice.get("text")
+        except (ValueError, LookupError, TypeError, AttributeError):
+            return
+        if text:
+            self._content.append(text)
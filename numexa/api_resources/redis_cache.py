@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+from urllib.parse import unquote, urlparse
+
+from .cache import CacheBackend
+from .global_constants import (
+    DEFAULT_CACHE_AGE,
+    DEFAULT_CACHE_COMPRESS_MIN_BYTES,
+    DEFAULT_CACHE_MAX_ENTRIES,
+    DEFAULT_CACHE_NEGATIVE_TTL,
+    DEFAULT_REDIS_KEY_PREFIX,
+    DEFAULT_REDIS_RECONNECT_DELAY,
+    DEFAULT_REDIS_TIMEOUT,
+)
+
+__all__ = ["RedisError", "RedisCache"]
+
+# Stored values are a flag byte (compressed or not), the wall-clock time they
+# were stored at and the body.
+_HEADER = struct.Struct(">Bd")
+_RAW = 0
+_ZLIB = 1
+
+Reply = Union[None, int, bytes, "RedisError", List[Any]]
+
+
+class RedisError(Exception):
+    """Error reply of the Redis server."""
+
+
+def _encode(args: Tuple[Union[str, bytes, int, float], ...]) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Reply:
+    line = await reader.readuntil(b"\r\n")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest
+    if kind == b"-":
+        return RedisError(rest.decode("utf-8", "replace"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        size = int(rest)
+        if size < 0:
+            return None
+        return (await reader.readexactly(size + 2))[:-2]
+    if kind == b"*":
+        size = int(rest)
+        if size < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(size)]
+    raise ConnectionError(f"Unexpected Redis reply {line!r}")
+
+
+class _Connection:
+    """Redis connection pipelining every command sent in the same event loop
+    iteration into one write. Replies are matched to commands in order.
+    """
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.loop = asyncio.get_running_loop()
+        self._reader = reader
+        self._writer = writer
+        self._pending: Deque["asyncio.Future[Reply]"] = deque()
+        self._buffer: List[bytes] = []
+        self._flush_scheduled = False
+        self.closed = False
+        self._reader_task = self.loop.create_task(self._read_replies())
+
+    def send(self, *args: Union[str, bytes, int, float]) -> "asyncio.Future[Reply]":
+        if self.closed:
+            raise ConnectionError("Redis connection is closed.")
+        future: "asyncio.Future[Reply]" = self.loop.create_future()
+        self._pending.append(future)
+        self._buffer.append(_encode(args))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.loop.call_soon(self._flush)
+        return future
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        if self._buffer and not self.closed:
+            self._writer.write(b"".join(self._buffer))
+            self._buffer.clear()
+
+    async def _read_replies(self) -> None:
+        try:
+            while True:
+                reply = await _read_reply(self._reader)
+                future = self._pending.popleft()
+                # Callers that timed out have cancelled their future already.
+                if future.done():
+                    continue
+                if isinstance(reply, RedisError):
+                    future.set_exception(reply)
+                else:
+                    future.set_result(reply)
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            # Includes a reply with no command waiting for it: the stream is
+            # out of step and cannot be trusted any more.
+            self._fail(ConnectionError(f"Redis connection lost: {err!r}"))
+
+    def _fail(self, err: Exception) -> None:
+        self.closed = True
+        self._writer.close()
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(err)
+
+    def discard(self) -> None:
+        """Close a connection from outside its event loop."""
+        if self.closed:
+            return
+        if self.loop.is_closed():
+            # Nothing can run on a closed loop; the socket is closed when
+            # the transport holding it is collected.
+            self.closed = True
+        else:
+            self.loop.call_soon_threadsafe(
+                self._fail, ConnectionError("Redis connection is closed.")
+            )
+
+    async def close(self) -> None:
+        self._fail(ConnectionError("Redis connection is closed."))
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+
+
+class RedisCache(CacheBackend):
+    """Response cache on a Redis server, shared by every process and node
+    pointed at it.
+
+    Commands issued concurrently are pipelined on one connection per event
+    loop. Bodies of `compress_min_bytes` or more are stored zlib-compressed.
+    A key found missing is not asked for again for `negative_ttl` seconds,
+    so a cold key costs one round trip per window instead of one per call.
+    The cache fails open: when Redis is unreachable or slower than `timeout`
+    every lookup is a miss and nothing is stored.
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = DEFAULT_REDIS_KEY_PREFIX,
+        compress_min_bytes: int = DEFAULT_CACHE_COMPRESS_MIN_BYTES,
+        negative_ttl: float = DEFAULT_CACHE_NEGATIVE_TTL,
+        timeout: float = DEFAULT_REDIS_TIMEOUT,
+    ) -> None:
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", "rediss"):
+            raise ValueError(f"Unsupported Redis URL scheme: {parsed.scheme!r}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.ssl = parsed.scheme == "rediss"
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self.compress_min_bytes = compress_min_bytes
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self._connection: Optional[_Connection] = None
+        self._connect_lock: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Lock]] = None
+        self._pid = os.getpid()
+        self._down_until = 0.0
+        # key -> time until which it is known to be missing
+        self._missing: "OrderedDict[str, float]" = OrderedDict()
+        self._missing_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.errors = 0
+
+    def _lock(self, loop: asyncio.AbstractEventLoop) -> asyncio.Lock:
+        if self._connect_lock is None or self._connect_lock[0] is not loop:
+            self._connect_lock = (loop, asyncio.Lock())
+        return self._connect_lock[1]
+
+    def _usable(self, loop: asyncio.AbstractEventLoop) -> Optional[_Connection]:
+        connection = self._connection
+        if (
+            connection is None
+            or connection.closed
+            or connection.loop is not loop
+            # A connection inherited through fork() must not be used.
+            or self._pid != os.getpid()
+        ):
+            return None
+        return connection
+
+    async def _connect(self) -> _Connection:
+        loop = asyncio.get_running_loop()
+        connection = self._usable(loop)
+        if connection is not None:
+            return connection
+        async with self._lock(loop):
+            connection = self._usable(loop)
+            if connection is not None:
+                return connection
+            if time.monotonic() < self._down_until:
+                raise ConnectionError("Redis is unavailable.")
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(
+                        self.host, self.port, ssl=self.ssl or None
+                    ),
+                    self.timeout,
+                )
+            except (OSError, asyncio.TimeoutError):
+                # Do not make every call wait on a server that is down.
+                self._down_until = time.monotonic() + DEFAULT_REDIS_RECONNECT_DELAY
+                raise
+            connection = _Connection(reader, writer)
+            setup = []
+            if self.password is not None:
+                credentials = [self.password]
+                if self.username is not None:
+                    credentials.insert(0, self.username)
+                setup.append(connection.send("AUTH", *credentials))
+            if self.db:
+                setup.append(connection.send("SELECT", self.db))
+            try:
+                await asyncio.wait_for(asyncio.gather(*setup), self.timeout)
+            except BaseException:
+                await connection.close()
+                raise
+            previous = self._connection
+            if previous is not None and self._pid == os.getpid():
+                # Left behind by another event loop. One inherited through
+                # fork() is the parent's and is not closed here.
+                previous.discard()
+            self._connection = connection
+            self._pid = os.getpid()
+            return connection
+
+    async def _execute(self, *args: Union[str, bytes, int, float]) -> Reply:
+        connection = await self._connect()
+        return await asyncio.wait_for(connection.send(*args), self.timeout)
+
+    def _known_missing(self, key: str) -> bool:
+        with self._missing_lock:
+            until = self._missing.get(key)
+            if until is None:
+                return False
+            if time.monotonic() < until:
+                return True
+            del self._missing[key]
+            return False
+
+    def _mark_missing(self, key: str) -> None:
+        if self.negative_ttl <= 0:
+            return
+        with self._missing_lock:
+            self._missing[key] = time.monotonic() + self.negative_ttl
+            self._missing.move_to_end(key)
+            while len(self._missing) > DEFAULT_CACHE_MAX_ENTRIES:
+                self._missing.popitem(last=False)
+
+    def _pack(self, value: bytes) -> bytes:
+        if len(value) >= self.compress_min_bytes:
+            return _HEADER.pack(_ZLIB, time.time()) + zlib.compress(value)
+        return _HEADER.pack(_RAW, time.time()) + value
+
+    @staticmethod
+    def _unpack(data: bytes) -> Tuple[float, bytes]:
+        flag, stored_at = _HEADER.unpack_from(data)
+        body = data[_HEADER.size :]
+        return stored_at, zlib.decompress(body) if flag == _ZLIB else body
+
+    async def get(self, key: str, max_age: Optional[float] = None) -> Optional[bytes]:
+        if self._known_missing(key):
+            self.negative_hits += 1
+            self.misses += 1
+            return None
+        try:
+            data = await self._execute("GET", self.prefix + key)
+            if not isinstance(data, bytes):
+                self._mark_missing(key)
+                self.misses += 1
+                return None
+            stored_at, body = self._unpack(data)
+        except (OSError, asyncio.TimeoutError, RedisError, struct.error, zlib.error):
+            self.errors += 1
+            self.misses += 1
+            return None
+        if max_age is not None and time.time() - stored_at > max_age:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return body
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        ttl = DEFAULT_CACHE_AGE if ttl is None else ttl
+        with self._missing_lock:
+            self._missing.pop(key, None)
+        if ttl <= 0:
+            return
+        try:
+            await self._execute(
+                "SET", self.prefix + key, self._pack(value), "PX", int(ttl * 1000)
+            )
+        except (OSError, asyncio.TimeoutError, RedisError):
+            self.errors += 1
+
+    async def delete(self, key: str) -> None:
+        with self._missing_lock:
+            self._missing.pop(key, None)
+        try:
+            await self._execute("DEL", self.prefix + key)
+        except (OSError, asyncio.TimeoutError, RedisError):
+            self.errors += 1
+
+    async def aclose(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None or connection.closed:
+            return
+        if connection.loop is asyncio.get_running_loop():
+            await connection.close()
+        else:
+            connection.discard()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "errors": self.errors,
+        }
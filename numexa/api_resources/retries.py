@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, List, Mapping, Optional
+
+import httpx
+
+from .global_constants import (
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_RETRY_STATUS_CODES,
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_MAX_DELAY,
+    DEFAULT_RETRY_BUDGET_RATIO,
+    DEFAULT_RETRY_BUDGET_MIN_PER_SECOND,
+    DEFAULT_RETRY_BUDGET_WINDOW,
+)
+from .stream_timeouts import StreamStalled
+
+__all__ = ["RetryPolicy", "RetryBudget", "retry_after"]
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse `x-ratelimit-reset-*` values such as `20ms`, `1s` or `6m0s`."""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION.findall(value)
+    if not parts or "".join(n + u for n, u in parts) != value:
+        return None
+    return sum(float(n) * _UNIT_SECONDS[u] for n, u in parts)
+
+
+def retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds the server asked us to wait before retrying, if it said so.
+
+    `retry-after-ms` and `retry-after` (seconds or an HTTP date) win; else
+    the latest of the `x-ratelimit-reset-requests/tokens` resets is used.
+    """
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is not None:
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                date = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                date = None
+            if date is not None:
+                if date.tzinfo is None:
+                    date = date.replace(tzinfo=timezone.utc)
+                return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+    resets: List[float] = []
+    for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        value = headers.get(name)
+        if value is not None:
+            seconds = _parse_duration(value)
+            if seconds is not None:
+                resets.append(seconds)
+    return max(resets) if resets else None
+
+
+class RetryPolicy:
+    """How often, and on which failures, one llm target is retried.
+
+    Built from the llm's `retry` (or `retry_settings`) `RetrySettings`, else
+    the request's `retry_settings`, else `DEFAULT_MAX_RETRIES`. Connection
+    errors and timeouts are always retryable, except stalled streams;
+    responses only when their status code is in `on_status_codes`.
+    """
+
+    def __init__(
+        self,
+        attempts: int = DEFAULT_MAX_RETRIES,
+        on_status_codes: Optional[List[int]] = None,
+        base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+        max_delay: float = DEFAULT_RETRY_MAX_DELAY,
+    ) -> None:
+        self.attempts = max(0, attempts)
+        self.on_status_codes = set(
+            DEFAULT_RETRY_STATUS_CODES if on_status_codes is None else on_status_codes
+        )
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_settings(cls, *settings: Optional[Mapping[str, Any]]) -> "RetryPolicy":
+        """Policy from the first `RetrySettings` that is set."""
+        for item in settings:
+            if item:
+                attempts = item.get("attempts")
+                return cls(
+                    attempts=DEFAULT_MAX_RETRIES if attempts is None else attempts,
+                    on_status_codes=item.get("on_status_codes"),
+                )
+        return cls()
+
+    def is_retryable(self, err: Exception) -> bool:
+        if isinstance(err, StreamStalled):
+            # A stalled stream is left for the next target instead.
+            return False
+        if isinstance(err, httpx.HTTPStatusError):
+            return err.response.status_code in self.on_status_codes
+        return isinstance(err, (httpx.TimeoutException, httpx.TransportError))
+
+    def backoff(
+        self, retry: int, response: Optional[httpx.Response] = None
+    ) -> Optional[float]:
+        """Delay before retry number `retry` (0-based), or None when the server
+        asked for a longer wait than `max_delay`.
+        """
+        hint = retry_after(response.headers) if response is not None else None
+        if hint is not None:
+            if hint > self.max_delay:
+                return None
+            return hint
+        # Exponential backoff with full jitter.
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+
+class RetryBudget:
+    """Limits retries to a fraction of recent traffic.
+
+    Over a sliding `window` of seconds, retries may not exceed `ratio` times
+    the number of requests plus a floor of `min_per_second` per second, so a
+    provider outage cannot turn into a retry storm.
+    """
+
+    def __init__(
+        self,
+        ratio: float = DEFAULT_RETRY_BUDGET_RATIO,
+        min_per_second: float = DEFAULT_RETRY_BUDGET_MIN_PER_SECOND,
+        window: float = DEFAULT_RETRY_BUDGET_WINDOW,
+    ) -> None:
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        # [second, requests, retries]
+        self._buckets: Deque[List[int]] = deque()
+        self._lock = threading.Lock()
+
+    def _current(self) -> List[int]:
+        now = int(time.monotonic())
+        buckets = self._buckets
+        while buckets and buckets[0][0] <= now - self.window:
+            buckets.popleft()
+        if not buckets or buckets[-1][0] != now:
+            buckets.append([now, 0, 0])
+        return buckets[-1]
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._current()[1] += 1
+
+    def try_acquire(self) -> bool:
+        """Take a retry from the budget, returning False if it is spent."""
+        with self._lock:
+            bucket = self._current()
+            requests = sum(b[1] for b in self._buckets)
+            retries = sum(b[2] for b in self._buckets)
+            if retries >= self.min_per_second * self.window + self.ratio * requests:
+                return False
+            bucket[2] += 1
+            return True
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Sequence
+
+__all__ = ["WeightedRouter"]
+
+
+class WeightedRouter:
+    """Smooth weighted round-robin over a fixed list of targets.
+
+    Each selection adds every target's weight to its running score, picks
+    the highest score and subtracts the total weight from it (the nginx
+    algorithm). Over any window of `sum(weights)` selections the split is
+    exact, and picks of the same target are spread out rather than bunched.
+    A target with weight 0 is never selected.
+    """
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        self.weights = self._validate(weights)
+        self._total = sum(self.weights)
+        self._current = [0.0] * len(self.weights)
+        self.counts = [0] * len(self.weights)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _validate(weights: Sequence[float]) -> List[float]:
+        if not weights:
+            raise ValueError("At least one weight is required.")
+        values = [float(w) for w in weights]
+        if any(w < 0 for w in values):
+            raise ValueError(f"Weights must not be negative, got {values}.")
+        if not any(values):
+            raise ValueError("At least one weight must be greater than zero.")
+        return values
+
+    def select(self) -> int:
+        """Return the index of the next target."""
+        with self._lock:
+            current = self._current
+            best = 0
+            for i, weight in enumerate(self.weights):
+                current[i] += weight
+                if current[i] > current[best]:
+                    best = i
+            current[best] -= self._total
+            self.counts[best] += 1
+            return best
+
+    def stats(self) -> Dict[int, int]:
+        """Number of selections that went to each target so far, by index,
+        so targets sharing a label are counted apart.
+        """
+        return dict(enumerate(self.counts))
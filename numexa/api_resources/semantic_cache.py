@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Tuple, cast
+
+import numexa
+
+from .cache import request_cache_key
+from .global_constants import (
+    DEFAULT_CACHE_AGE,
+    DEFAULT_CACHE_MAX_BYTES,
+    DEFAULT_SEMANTIC_CACHE_CANDIDATES,
+    DEFAULT_SEMANTIC_CACHE_DIM,
+    DEFAULT_SEMANTIC_CACHE_MAX_ENTRIES,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+__all__ = [
+    "embed",
+    "semantic_query",
+    "SemanticCache",
+    "semantic_cache",
+    "active_semantic_cache",
+]
+
+_WORD = re.compile(r"\w+")
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "The semantic cache needs NumPy: pip install 'numexa[semantic]'"
+        )
+
+
+# Changing a number usually changes the question, so such words weigh more.
+_NUMBER_WEIGHT = 4.0
+
+
+def _features(text: str) -> Tuple[List[str], List[float]]:
+    words = _WORD.findall(text.lower())
+    features = list(words)
+    weights = [_NUMBER_WEIGHT if any(c.isdigit() for c in w) else 1.0 for w in words]
+    features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f" {word} "
+        features += [padded[i : i + 3] for i in range(len(padded) - 2)]
+    weights += [1.0] * (len(features) - len(weights))
+    return features, weights
+
+
+def embed(text: str, dim: int = DEFAULT_SEMANTIC_CACHE_DIM) -> "np.ndarray":
+    """Unit-length float32 vector of the words, word bigrams and character
+    trigrams of `text`, hashed into `dim` signed buckets.
+    """
+    _require_numpy()
+    features, weights = _features(text)
+    vector = np.zeros(dim, dtype=np.float32)
+    hashes = np.array(
+        [zlib.crc32(f.encode("utf-8")) for f in features], dtype=np.uint32
+    )
+    if hashes.size:
+        signed = np.where(hashes & 0x80000000, -1.0, 1.0) * np.array(weights)
+        np.add.at(vector, (hashes % dim).astype(np.intp), signed.astype(np.float32))
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            part.get("text", "") for part in content if isinstance(part, dict)
+        )
+    return ""
+
+
+def semantic_query(
+    url: str, target: Optional[str], params: Mapping[str, Any]
+) -> Optional[Tuple[str, str]]:
+    """Scope and text a request is matched by: the text is the last message
+    (or the prompt), the scope is the hash of everything else, which has to
+    be identical for a cached answer to be reused. None without any text.
+    """
+    messages = params.get("messages")
+    if messages:
+        text = _content_text(messages[-1].get("content"))
+        rest = {**params, "messages": list(messages[:-1])}
+    else:
+        text = params.get("prompt") or ""
+        rest = {**params, "prompt": None}
+    if not text.strip():
+        return None
+    return request_cache_key(url, target, rest), text
+
+
+class _Entry:
+    __slots__ = ("slot", "stored_at", "expires_at", "body")
+
+    def __init__(self, slot: int, stored_at: float, expires_at: float, body: bytes) -> None:
+        self.slot = slot
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.body = body
+
+
+class SemanticCache:
+    """Process-local cache returning the answer to a similar earlier request.
+
+    Prompts are embedded with `embed` into rows of one preallocated float32
+    matrix of `max_entries` rows; a lookup returns the body of the most
+    cosine-similar prompt within the same scope, if the similarity reaches
+    the threshold. The least recently used entries are evicted once either
+    `max_entries` or `max_bytes` of stored bodies is exceeded.
+
+    With `quantize=True` an int8 copy of the matrix is scanned first and only
+    its best `candidates` rows are scored exactly, which cuts the memory read
+    per lookup by four.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_SEMANTIC_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        dim: int = DEFAULT_SEMANTIC_CACHE_DIM,
+        quantize: bool = False,
+        candidates: int = DEFAULT_SEMANTIC_CACHE_CANDIDATES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.dim = dim
+        self.quantize = quantize
+        self.candidates = candidates
+        # (scope, text) -> entry, least recently used first.
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._keys: List[Optional[Tuple[str, str]]] = [None] * max_entries
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._size = 0
+        self._lock = threading.Lock()
+        # Allocated on first use, so NumPy is only needed once it is.
+        self._vectors: Optional["np.ndarray"] = None
+        self._codes: Optional["np.ndarray"] = None
+        self._scales: Optional["np.ndarray"] = None
+        self._scopes: Optional["np.ndarray"] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _allocate(self) -> None:
+        _require_numpy()
+        self._vectors = np.zeros((self.max_entries, self.dim), dtype=np.float32)
+        self._scopes = np.full(self.max_entries, -1, dtype=np.int64)
+        if self.quantize:
+            self._codes = np.zeros((self.max_entries, self.dim), dtype=np.int8)
+            self._scales = np.zeros(self.max_entries, dtype=np.float32)
+
+    @staticmethod
+    def _scope_id(scope: str) -> int:
+        return int(scope[:15], 16)
+
+    @staticmethod
+    def _quantized(vector: "np.ndarray") -> Tuple["np.ndarray", float]:
+        scale = float(np.abs(vector).max()) / 127 or 1.0
+        return np.round(vector / scale).astype(np.int8), scale
+
+    def _best(self, scope_id: int, vector: "np.ndarray") -> Tuple[int, float]:
+        assert self._vectors is not None and self._scopes is not None
+        rows = np.flatnonzero(self._scopes == scope_id)
+        if not rows.size:
+            return -1, 0.0
+        if self._codes is not None and rows.size > self.candidates:
+            assert self._scales is not None
+            query, _ = self._quantized(vector)
+            approx = (self._codes[rows].astype(np.int32) @ query.astype(np.int32)) * (
+                self._scales[rows]
+            )
+            top = np.argpartition(approx, -self.candidates)[-self.candidates :]
+            rows = rows[top]
+        scores = self._vectors[rows] @ vector
+        best = int(np.argmax(scores))
+        return int(rows[best]), float(scores[best])
+
+    def get(
+        self,
+        scope: str,
+        text: str,
+        threshold: float,
+        max_age: Optional[float] = None,
+    ) -> Optional[bytes]:
+        """Body stored for the prompt in `scope` most similar to `text`, if
+        its cosine similarity is at least `threshold`.
+        """
+        now = time.monotonic()
+        key = (scope, text)
+        vector = None if self._vectors is None else embed(text, self.dim)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and vector is not None:
+                slot, score = self._best(self._scope_id(scope), vector)
+                if slot >= 0 and score >= threshold:
+                    key = cast(Tuple[str, str], self._keys[slot])
+                    entry = self._entries[key]
+            if entry is not None:
+                if now >= entry.expires_at:
+                    self._remove(key)
+                elif max_age is None or now - entry.stored_at <= max_age:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.body
+            self.misses += 1
+            return None
+
+    def set(self, scope: str, text: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if len(value) > self.max_bytes or self.max_entries < 1:
+            return
+        now = time.monotonic()
+        expires_at = now + (DEFAULT_CACHE_AGE if ttl is None else ttl)
+        key = (scope, text)
+        vector = embed(text, self.dim)
+        with self._lock:
+            if self._vectors is None:
+                self._allocate()
+            assert self._vectors is not None and self._scopes is not None
+            if key in self._entries:
+                self._remove(key)
+            while len(self._entries) >= self.max_entries or (
+                self._entries and self._size + len(value) > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            slot = self._free.pop()
+            self._vectors[slot] = vector
+            self._scopes[slot] = self._scope_id(scope)
+            if self._codes is not None and self._scales is not None:
+                self._codes[slot], self._scales[slot] = self._quantized(vector)
+            self._keys[slot] = key
+            self._entries[key] = _Entry(slot, now, expires_at, value)
+            self._size += len(value)
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        assert self._scopes is not None
+        entry = self._entries.pop(key)
+        self._scopes[entry.slot] = -1
+        self._keys[entry.slot] = None
+        self._free.append(entry.slot)
+        self._size -= len(entry.body)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._size,
+        }
+
+
+semantic_cache = SemanticCache()
+
+
+def active_semantic_cache() -> SemanticCache:
+    """Cache set as `numexa.semantic_cache_backend`, or the default
+    `semantic_cache` when there is none.
+    """
+    return numexa.semantic_cache_backend or semantic_cache
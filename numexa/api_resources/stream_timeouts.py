@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, List, Optional
+
+import httpx
+
+__all__ = ["StreamStalled", "guard_stream"]
+
+
+class StreamStalled(httpx.ReadTimeout):
+    """A streamed response sent no event within its first token or idle
+    timeout. Not retried on the same target; fallback moves on instead.
+    """
+
+
+def _has_event(chunks: List[bytes], encoded: bool) -> bool:
+    # Compressed bodies cannot be inspected, so any data counts there.
+    if encoded:
+        return any(chunks)
+    return any(
+        line.strip() and not line.startswith(b":")
+        for line in b"".join(chunks).splitlines()
+    )
+
+
+class _GuardedByteStream(httpx.AsyncByteStream):
+    def __init__(
+        self,
+        response: httpx.Response,
+        iterator: AsyncIterator[bytes],
+        prefetched: List[bytes],
+        idle_timeout: Optional[float],
+    ) -> None:
+        self._response = response
+        self._iterator = iterator
+        self._prefetched = prefetched
+        self._idle_timeout = idle_timeout
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        prefetched, self._prefetched = self._prefetched, []
+        for chunk in prefetched:
+            yield chunk
+        while True:
+            try:
+                chunk = await asyncio.wait_for(
+                    self._iterator.__anext__(), self._idle_timeout
+                )
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                await self._response.aclose()
+                raise StreamStalled(
+                    f"No data received for {self._idle_timeout}s.",
+                    request=self._response.request,
+                ) from None
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._response.aclose()
+
+
+async def guard_stream(
+    response: httpx.Response,
+    first_token_timeout: Optional[float] = None,
+    idle_timeout: Optional[float] = None,
+) -> httpx.Response:
+    """Wait at most `first_token_timeout` seconds for the first event of a
+    streamed response and return a response over the same body whose reads
+    fail after `idle_timeout` seconds without data.
+
+    Raises `StreamStalled`, after closing the response, when the first event
+    does not arrive in time.
+    """
+    if response.is_stream_consumed:
+        # The body is already in memory; there is nothing left to wait for.
+        return response
+    iterator = response.aiter_raw()
+    prefetched: List[bytes] = []
+    if first_token_timeout is not None:
+        encoded = response.headers.get("content-encoding", "identity") != "identity"
+
+        async def first_event() -> None:
+            async for chunk in iterator:
+                prefetched.append(chunk)
+                if _has_event(prefetched, encoded):
+                    return
+
+        try:
+            await asyncio.wait_for(first_event(), first_token_timeout)
+        except asyncio.TimeoutError:
+            await response.aclose()
+            raise StreamStalled(
+                f"No first token within {first_token_timeout}s.",
+                request=response.request,
+            ) from None
+    return httpx.Response(
+        status_code=response.status_code,
+        headers=response.headers,
+        stream=_GuardedByteStream(response, iterator, prefetched, idle_timeout),
+        request=response.request,
+    )
@@ -1,10 +1,22 @@
 from __future__ import annotations
 
-import json
-from typing import Any, Iterator, Generic, cast, Union, Type
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    Generic,
+    List,
+    Optional,
+    cast,
+    Union,
+    Type,
+)
 
 import httpx
 
+from .json_codec import loads
 from .utils import (
     ChatCompletionChunk,
     ResponseT,
@@ -15,11 +27,13 @@ from .utils import (
 
 
 class ServerSentEvent:
+    __slots__ = ("_id", "_data", "_event", "_retry")
+
     def __init__(
         self,
         *,
         event: Union[str, None] = None,
-        data: Union[str, None] = None,
+        data: Union[str, bytes, None] = None,
         id: Union[str, None] = None,
         retry: Union[int, None] = None,
     ) -> None:
@@ -27,6 +41,8 @@ class ServerSentEvent:
             data = ""
 
         self._id = id
+        # Events from SSEBytesDecoder carry the raw payload; it is only
+        # decoded to text if `data` is asked for.
         self._data = data
         self._event = event or None
         self._retry = retry
@@ -45,14 +61,21 @@ class ServerSentEvent:
 
     @property
     def data(self) -> str:
+        if isinstance(self._data, bytes):
+            self._data = self._data.decode("utf-8")
+        return self._data
+
+    @property
+    def raw_data(self) -> bytes:
+        if isinstance(self._data, str):
+            return self._data.encode("utf-8")
         return self._data
 
     def json(self) -> Any:
-        return (
-            {"model": "", "choices": [{}]}
-            if self.data == "[DONE]"
-            else json.loads(self.data)
-        )
+        data = self._data
+        if data == "[DONE]" or data == b"[DONE]":
+            return {"model": "", "choices": [{}]}
+        return loads(data)
 
     def __repr__(self) -> str:
         return f"ServerSentEvent(event={self.event}, data={self.data}, id={self.id},\
@@ -135,6 +158,135 @@ class SSEDecoder:
         return None
 
 
+class SSEBytesDecoder:
+    """Incremental server-sent events decoder working on raw byte chunks.
+
+    Chunks are appended to one reusable buffer and scanned for line ends with
+    `bytearray.find`; `data` payloads are sliced out as bytes and never go
+    through `str`. Line ends may be `\n`, `\r\n` or `\r`, including a `\r\n`
+    split across two chunks, and multi-byte characters may be split anywhere
+    since nothing is decoded here.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._pending_cr = False
+        self._event: Union[str, None] = None
+        self._data: List[bytes] = []
+        self._last_event_id: Union[str, None] = None
+        self._retry: Union[int, None] = None
+
+    async def aiter(
+        self, iterator: AsyncIterator[bytes]
+    ) -> AsyncIterator[ServerSentEvent]:
+        """Given an async iterator that yields byte chunks, iterate over it &
+        yield every event encountered
+        """
+        async for chunk in iterator:
+            for sse in self.feed(chunk):
+                yield sse
+        for sse in self.flush():
+            yield sse
+
+    def flush(self) -> List[ServerSentEvent]:
+        """Finish a trailing `\r` line end once the stream is over."""
+        if not self._pending_cr:
+            return []
+        return self.feed(b"")
+
+    def feed(self, chunk: bytes) -> List[ServerSentEvent]:
+        """Add a chunk and return the events it completed."""
+        if self._pending_cr:
+            self._pending_cr = False
+            chunk = b"\n" + (chunk[1:] if chunk[:1] == b"\n" else chunk)
+        if b"\r" in chunk:
+            if chunk.endswith(b"\r"):
+                # Could be the first half of a `\r\n`.
+                self._pending_cr = True
+                chunk = chunk[:-1]
+            chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+        buffer = self._buffer
+        buffer += chunk
+        events: List[ServerSentEvent] = []
+        new_event = object.__new__
+        find = buffer.find
+        startswith = buffer.startswith
+        pos = 0
+        while True:
+            end = find(b"\n", pos)
+            if end < 0:
+                break
+            if end == pos:
+                sse = self._dispatch()
+                if sse is not None:
+                    events.append(sse)
+            elif startswith(b"data:", pos):
+                start = pos + 5
+                if start < end and buffer[start] == 0x20:
+                    start += 1
+                if (
+                    end + 1 < len(buffer)
+                    and buffer[end + 1] == 0x0A
+                    and not self._data
+                    and self._event is None
+                    and self._retry is None
+                ):
+                    # Fast path for the common single-line `data:` event.
+                    sse = new_event(ServerSentEvent)
+                    sse._data = bytes(buffer[start:end])
+                    sse._id = self._last_event_id
+                    sse._event = sse._retry = None
+                    events.append(sse)
+                    pos = end + 2
+                    continue
+                self._data.append(bytes(buffer[start:end]))
+            elif buffer[pos] != 0x3A:  # ":" starts a comment
+                self._field(bytes(buffer[pos:end]))
+            pos = end + 1
+        if pos:
+            del buffer[:pos]
+        return events
+
+    def _field(self, line: bytes) -> None:
+        fieldname, _, value = line.decode("utf-8", errors="replace").partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if fieldname == "event":
+            self._event = value
+        elif fieldname == "id":
+            if "\0" not in value:
+                self._last_event_id = value
+        elif fieldname == "retry":
+            try:
+                self._retry = int(value)
+            except (TypeError, ValueError):
+                pass
+        elif fieldname == "data":  # "data" without a colon
+            self._data.append(value.encode("utf-8"))
+
+    def _dispatch(self) -> Union[ServerSentEvent, None]:
+        data = self._data
+        if (
+            not self._event
+            and not data
+            and not self._last_event_id
+            and self._retry is None
+        ):
+            return None
+        sse = ServerSentEvent(
+            event=self._event,
+            data=data[0] if len(data) == 1 else b"\n".join(data),
+            id=self._last_event_id,
+            retry=self._retry,
+        )
+        # NOTE: as per the SSE spec, do not reset last_event_id.
+        self._event = None
+        self._data = []
+        self._retry = None
+        return sse
+
+
 class Stream(Generic[ResponseT]):
     """Provides the core interface to iterate over a synchronous stream response."""
 
@@ -180,3 +332,131 @@ class Stream(Generic[ResponseT]):
                     response=self.response,
                     request=self.response.request,
                 )
+
+
+Resume = Callable[[httpx.Response, str], Awaitable[Optional[httpx.Response]]]
+
+
+class AsyncStream(Generic[ResponseT]):
+    """Provides the core interface to iterate over an asynchronous stream response.
+
+    Use it with `async for`, or as an async context manager to make sure the
+    connection is released when the caller stops reading early.
+
+    With `resume` set, the text streamed so far is kept. If the connection
+    drops mid-stream, `resume(response, text)` is asked for a response that
+    continues it, and iteration goes on over that one; when it returns None
+    the error is raised.
+    """
+
+    response: httpx.Response
+
+    def __init__(
+        self,
+        *,
+        response: httpx.Response,
+        cast_to: Type[ResponseT],
+        on_close: Optional[Callable[[], None]] = None,
+        resume: Optional[Resume] = None,
+    ) -> None:
+        self._cast_to = cast_to
+        self.response = response
+        self._decoder = SSEBytesDecoder()
+        self._on_close = on_close
+        self._resume = resume
+        self._content: List[str] = []
+        self._iterator = self.__stream__()
+
+    async def __anext__(self) -> ResponseT:
+        return await self._iterator.__anext__()
+
+    async def __aiter__(self) -> AsyncIterator[ResponseT]:
+        async for item in self._iterator:
+            yield item
+
+    async def __aenter__(self) -> "AsyncStream[ResponseT]":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop iterating and release the connection back to the pool."""
+        await self._iterator.aclose()
+        await self._release()
+
+    async def _release(self) -> None:
+        await self.response.aclose()
+        if self._on_close is not None:
+            on_close, self._on_close = self._on_close, None
+            on_close()
+
+    async def _iter_events(self) -> AsyncIterator[ServerSentEvent]:
+        async for sse in self._decoder.aiter(self.response.aiter_bytes()):
+            yield sse
+
+    def _item(self, sse: ServerSentEvent) -> Any:
+        return self._cast_to(**sse.json())
+
+    def _record(self, item: Any) -> None:
+        choices = getattr(item, "choices", None)
+        if not choices or not isinstance(choices, list):
+            return
+        delta = getattr(choices[0], "delta", None)
+        if delta is not None:
+            text = delta.get("content")
+        else:
+            text = getattr(choices[0], "text", None)
+        if text:
+            self._content.append(text)
+
+    async def _resumed(self) -> bool:
+        """Swap in a response continuing the stream, if `resume` has one."""
+        if self._resume is None:
+            return False
+        replacement = await self._resume(self.response, "".join(self._content))
+        if replacement is None:
+            return False
+        await self.response.aclose()
+        self.response = replacement
+        self._decoder = SSEBytesDecoder()
+        return True
+
+    async def __stream__(self) -> AsyncIterator[ResponseT]:
+        try:
+            while True:
+                try:
+                    async for sse in self._iter_events():
+                        if sse.event is None:
+                            item = self._item(sse)
+                            if self._resume is not None:
+                                self._record(item)
+                            yield cast(ResponseT, item)
+
+                        if sse.event == "ping":
+                            continue
+
+                        if sse.event == "error":
+                            body = sse.data
+
+                            try:
+                                body = sse.json()
+                                err_msg = f"{body}"
+                            except Exception:
+                                err_msg = (
+                                    sse.data
+                                    or f"Error code: {self.response.status_code}"
+                                )
+
+                            raise make_status_error(
+                                err_msg,
+                                body=body,
+                                response=self.response,
+                                request=self.response.request,
+                            )
+                    return
+                except (httpx.TransportError, httpx.TimeoutException):
+                    if not await self._resumed():
+                        raise
+        finally:
+            await self._release()
@@ -1,11 +1,12 @@
 import os
-import json
+import hashlib
 from typing import List, Dict, Any, Optional, Union, Mapping, Literal, TypeVar, cast
 from enum import Enum, EnumMeta
 from typing_extensions import TypedDict
 import httpx
 import numexa
 from pydantic import BaseModel, validator
+from .json_codec import pretty
 from .exceptions import (
     APIStatusError,
     BadRequestError,
@@ -26,6 +27,15 @@ from .global_constants import (
     NUMEXA_DIRECT_URL,
     NUMEXA_API_KEY,
     NUMEXA_PROXY_URL,
+    DEFAULT_CIRCUIT_FAILURE_RATE,
+    DEFAULT_CIRCUIT_WINDOW,
+    DEFAULT_CIRCUIT_MIN_REQUESTS,
+    DEFAULT_CIRCUIT_COOLDOWN,
+    DEFAULT_CONCURRENCY_INITIAL_LIMIT,
+    DEFAULT_CONCURRENCY_MAX_LIMIT,
+    DEFAULT_CONCURRENCY_BACKOFF_RATIO,
+    DEFAULT_CONCURRENCY_LATENCY_TOLERANCE,
+    DEFAULT_CONCURRENCY_MAX_QUEUE,
 )
 
 
@@ -108,11 +118,18 @@ class Options(BaseModel):
     params: Optional[Mapping[str, str]] = None
     headers: Optional[Mapping[str, str]] = None
     max_retries: Optional[int] = None
+    retry_settings: Optional[Mapping[str, Any]] = None
     timeout: Optional[float] = None
     # stringified json
     data: Optional[Mapping[str, Any]] = None
     # json structure
     json_body: Optional[Mapping[str, Any]] = None
+    mode: Optional[str] = None
+    # llm targets, in the order they are attempted
+    llms: Optional[List[Any]] = None
+    config: Optional[Any] = None
+    # request params (messages, prompt, sampling params) before serialization
+    request_params: Optional[Mapping[str, Any]] = None
 
 
 class Message(TypedDict):
@@ -131,6 +148,131 @@ class RetrySettings(TypedDict):
     on_status_codes: list
 
 
+class RateLimitSettings(TypedDict, total=False):
+    requests_per_minute: int
+    tokens_per_minute: int
+
+
+class HedgingSettings(BaseModel):
+    """Opt-in request hedging for fallback mode.
+
+    When a target has not answered within the hedge delay, the next llm is
+    called in parallel and the first successful response wins. The delay is
+    `delay` seconds, or the `percentile` of the target's recent latencies
+    once `min_samples` of them have been recorded.
+    """
+
+    delay: Optional[float] = None
+    percentile: Optional[float] = None
+    min_samples: int = 20
+    min_delay: float = 0.0
+    max_delay: Optional[float] = None
+
+    @validator("percentile")
+    @classmethod
+    def check_percentile(cls, percentile):
+        if percentile is not None and not 0 < percentile <= 100:
+            raise ValueError("percentile must be in (0, 100]")
+        return percentile
+
+
+class CircuitBreakerSettings(BaseModel):
+    """Per-target circuit breaking for the llms of a config.
+
+    A target whose share of failed calls over the last `window` seconds
+    reaches `failure_rate`, once `min_requests` calls have been seen, is
+    skipped without any I/O for `cooldown` seconds. After that up to
+    `half_open_requests` probe calls are let through to decide whether it is
+    used again.
+    """
+
+    failure_rate: float = DEFAULT_CIRCUIT_FAILURE_RATE
+    window: float = DEFAULT_CIRCUIT_WINDOW
+    min_requests: int = DEFAULT_CIRCUIT_MIN_REQUESTS
+    cooldown: float = DEFAULT_CIRCUIT_COOLDOWN
+    half_open_requests: int = 1
+
+    @validator("failure_rate")
+    @classmethod
+    def check_failure_rate(cls, failure_rate):
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+        return failure_rate
+
+    @validator("min_requests", "half_open_requests")
+    @classmethod
+    def check_positive(cls, value):
+        if value < 1:
+            raise ValueError("must be at least 1")
+        return value
+
+
+class TimeoutSettings(BaseModel):
+    """Per-attempt httpx timeouts, in seconds, for each phase of a request.
+
+    With a `timeout` budget on the call, every phase is capped at the time
+    left in it and a phase left unset gets all of that time.
+    """
+
+    connect: Optional[float] = None
+    read: Optional[float] = None
+    write: Optional[float] = None
+    pool: Optional[float] = None
+
+
+class StreamSettings(BaseModel):
+    """Timeouts and failover for streamed responses.
+
+    A target that sends no event within `first_token_timeout` seconds of its
+    response headers is dropped and the next llm is tried. Once streaming,
+    a read fails when no data arrives for `idle_timeout` seconds. With
+    `resume`, a stream whose connection breaks is continued on the next llm,
+    which is sent the text streamed so far as a partial assistant message.
+    """
+
+    first_token_timeout: Optional[float] = None
+    idle_timeout: Optional[float] = None
+    resume: bool = False
+
+
+class AdaptiveConcurrencySettings(BaseModel):
+    """Adaptive limit on the calls in flight to each llm of a config.
+
+    The limit starts at `initial_limit` and moves between `min_limit` and
+    `max_limit`: up by one per success while it is in use, down to
+    `backoff_ratio` of itself on timeouts, 429s, 503s or latency above
+    `latency_tolerance` times the target's baseline. Callers over the limit
+    queue, up to `max_queue` of them for at most `queue_timeout` seconds; the
+    rest fail fast. `max_queue=0` sheds load instead of queueing at all.
+    """
+
+    initial_limit: int = DEFAULT_CONCURRENCY_INITIAL_LIMIT
+    min_limit: int = 1
+    max_limit: int = DEFAULT_CONCURRENCY_MAX_LIMIT
+    backoff_ratio: float = DEFAULT_CONCURRENCY_BACKOFF_RATIO
+    latency_tolerance: float = DEFAULT_CONCURRENCY_LATENCY_TOLERANCE
+    min_samples: int = 10
+    window: int = 100
+    max_queue: int = DEFAULT_CONCURRENCY_MAX_QUEUE
+    queue_timeout: Optional[float] = None
+
+    @validator("backoff_ratio")
+    @classmethod
+    def check_backoff_ratio(cls, backoff_ratio):
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be in (0, 1)")
+        return backoff_ratio
+
+    @validator("max_limit")
+    @classmethod
+    def check_limits(cls, max_limit, values):
+        min_limit = values.get("min_limit", 1)
+        initial_limit = values.get("initial_limit", min_limit)
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("expected 1 <= min_limit <= initial_limit <= max_limit")
+        return max_limit
+
+
 class ConversationInput(BaseModel):
     prompt: Optional[str] = None
     messages: Optional[List[Message]] = None
@@ -195,10 +337,12 @@ class Constructs(BaseModel):
     cache_age: Optional[int] = None
     cache_status: Optional[Union[CacheType, CacheLiteral]] = None
     cache_force_refresh: Optional[bool] = None
+    cache_threshold: Optional[float] = None
     trace_id: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
     weight: Optional[float] = None
     retry: Optional[RetrySettings] = None
+    rate_limit: Optional[RateLimitSettings] = None
     deployment_id: Optional[str] = None
     resource_name: Optional[str] = None
     api_version: Optional[str] = None
@@ -250,7 +394,7 @@ class PortkeyResponse(BaseModel):
     raw_body: Dict[str, Any]
 
     def __str__(self):
-        return json.dumps(self.dict(), indent=4)
+        return pretty(self.dict())
 
 
 # Models for Chat Stream
@@ -259,7 +403,7 @@ class Delta(BaseModel):
     content: Optional[str] = ""
 
     def __str__(self):
-        return json.dumps(self.dict(), indent=4)
+        return pretty(self.dict())
 
     def __getitem__(self, key):
         return getattr(self, key, None)
@@ -274,7 +418,7 @@ class StreamChoice(BaseModel):
     finish_reason: Optional[str] = None
 
     def __str__(self):
-        return json.dumps(self.dict(), indent=4)
+        return pretty(self.dict())
 
     def get(self, key: str, default: Optional[Any] = None):
         return getattr(self, key, None) or default
@@ -291,7 +435,7 @@ class ChatCompletionChunk(BaseModel):
     choices: Union[List[StreamChoice], Dict[Any, Any]] = {}
 
     def __str__(self):
-        return json.dumps(self.dict(), indent=4)
+        return pretty(self.dict())
 
     def __getitem__(self, key):
         return getattr(self, key, None)
@@ -307,7 +451,7 @@ class ChatChoice(BaseModel):
     finish_reason: Optional[str] = None
 
     def __str__(self):
-        return json.dumps(self.dict(), indent=4)
+        return pretty(self.dict())
 
     def __getitem__(self, key):
         return getattr(self, key, None)
@@ -322,7 +466,7 @@ class Usage(BaseModel):
     total_tokens: Optional[int] = None
 
     def __str__(self):
-        return json.dumps(self.dict(), indent=4)
+        return pretty(self.dict())
 
     def __getitem__(self, key):
         return getattr(self, key, None)
@@ -340,7 +484,7 @@ class ChatCompletion(BaseModel):
     usage: Optional[Usage] = None
 
     def __str__(self):
-        return json.dumps(self.dict(), indent=4)
+        return pretty(self.dict())
 
     def __getitem__(self, key):
         return getattr(self, key, None)
@@ -357,7 +501,7 @@ class TextChoice(BaseModel):
     finish_reason: Optional[str] = None
 
     def __str__(self):
-        return json.dumps(self.dict(), indent=4)
+        return pretty(self.dict())
 
     def __getitem__(self, key):
         return getattr(self, key, None)
@@ -375,7 +519,7 @@ class TextCompletion(BaseModel):
     usage: Optional[Usage] = None
 
     def __str__(self):
-        return json.dumps(self.dict(), indent=4)
+        return pretty(self.dict())
 
     def __getitem__(self, key):
         return getattr(self, key, None)
@@ -393,7 +537,7 @@ class TextCompletionChunk(BaseModel):
     choices: Union[List[TextChoice], Dict[Any, Any]] = {}
 
     def __str__(self):
-        return json.dumps(self.dict(), indent=4)
+        return pretty(self.dict())
 
     def __getitem__(self, key):
         return getattr(self, key, None)
@@ -421,6 +565,21 @@ def apikey_from_env(provider: Union[ProviderTypes, ProviderTypesLiteral, str]) -
     )
 
 
+def target_id(llm: Any) -> str:
+    """Label identifying an llm target in routing and metrics.
+
+    Targets sharing a provider and model are told apart by their virtual key,
+    or by a short digest of their api key so the key itself is never exposed.
+    """
+    provider = getattr(llm.provider, "value", llm.provider)
+    label = f"{provider}:{llm.model}"
+    if llm.virtual_key:
+        label += f"#{llm.virtual_key}"
+    elif llm.api_key:
+        label += "#" + hashlib.sha256(llm.api_key.encode("utf-8")).hexdigest()[:8]
+    return label
+
+
 def make_status_error(
     err_msg: str,
     *,
@@ -460,6 +619,17 @@ class Config(BaseModel):
     base_url: Optional[str] = None
     mode: Optional[Union[Modes, ModesLiteral, str]] = None
     llms: Optional[Union[List[LLMOptions], LLMOptions]] = None
+    hedging: Optional[HedgingSettings] = None
+    circuit_breaker: Optional[CircuitBreakerSettings] = None
+    adaptive_concurrency: Optional[AdaptiveConcurrencySettings] = None
+    timeouts: Optional[TimeoutSettings] = None
+    streaming: Optional[StreamSettings] = None
+    # Share one upstream call between concurrent identical requests. Every
+    # caller gets the same answer, so use it for deterministic requests.
+    coalesce: bool = False
+    # Return unvalidated, read-only views of responses and streamed chunks
+    # instead of pydantic models.
+    lite_responses: bool = False
 
     @validator("mode", always=True)
     @classmethod
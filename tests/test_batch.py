@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+
+import pytest
+
+from numexa.api_resources.batch import BatchProgress, run_batch
+
+
+class Interrupted(BaseException):
+    pass
+
+
+def write_input(path, n: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({"messages": [{"role": "user", "content": str(i)}]}) + "\n")
+
+
+def read_output(path) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestBatchProgress:
+    def test_watermark_only_keeps_out_of_order_indices(self) -> None:
+        progress = BatchProgress()
+        for index in (2, 1, 4):
+            progress.mark(index)
+        assert progress.watermark == 0 and progress.done == {1, 2, 4}
+        progress.mark(0)
+        assert progress.watermark == 3 and progress.done == {4}
+        assert progress.is_done(1) and progress.is_done(4) and not progress.is_done(3)
+
+
+class TestRunBatch:
+    def test_runs_every_line_with_bounded_concurrency(self, tmp_path) -> None:
+        input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        write_input(input_path, 50)
+        in_flight, peak = 0, 0
+
+        async def create(config=None, messages=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(random.random() / 100)
+            in_flight -= 1
+            if messages[0]["content"] == "7":
+                raise ValueError("bad line")
+            return {"content": messages[0]["content"]}
+
+        summary = asyncio.run(
+            run_batch(str(input_path), str(output_path), concurrency=4, create=create)
+        )
+        assert summary["succeeded"] == 49 and summary["failed"] == 1
+        assert peak <= 4
+        records = read_output(output_path)
+        assert sorted(r["index"] for r in records) == list(range(50))
+        by_index = {r["index"]: r for r in records}
+        assert by_index[3]["response"] == {"content": "3"}
+        assert "bad line" in by_index[7]["error"]
+
+    def test_resumes_after_interruption(self, tmp_path) -> None:
+        input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        write_input(input_path, 30)
+        calls: list = []
+
+        async def create(config=None, messages=None):
+            index = int(messages[0]["content"])
+            calls.append(index)
+            if index == 20 and calls.count(20) == 1:
+                raise Interrupted
+            return {"content": index}
+
+        with pytest.raises(Interrupted):
+            asyncio.run(
+                run_batch(
+                    str(input_path),
+                    str(output_path),
+                    concurrency=1,
+                    checkpoint_every=5,
+                    create=create,
+                )
+            )
+        first_run = len(calls)
+        summary = asyncio.run(
+            run_batch(str(input_path), str(output_path), concurrency=1, create=create)
+        )
+        assert summary["skipped"] == 20
+        assert calls[first_run:] == list(range(20, 30))
+        records = read_output(output_path)
+        assert [r["index"] for r in records] == list(range(30))
+
+    def test_checkpoint_without_its_output_is_ignored(self, tmp_path) -> None:
+        input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        write_input(input_path, 10)
+
+        async def create(config=None, messages=None):
+            return {"content": messages[0]["content"]}
+
+        asyncio.run(run_batch(str(input_path), str(output_path), create=create))
+        output_path.unlink()
+        summary = asyncio.run(run_batch(str(input_path), str(output_path), create=create))
+        assert summary["skipped"] == 0 and summary["succeeded"] == 10
+        assert sorted(r["index"] for r in read_output(output_path)) == list(range(10))
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+
+from numexa import ChatCompletion, LLMOptions
+from numexa.api_resources.cache import InMemoryCache, request_cache_key, response_cache
+from tests.utils import chat, chat_completion_body, llms, mock_api_client, request_model
+
+messages = [{"role": "user", "content": "What is 2 + 2?"}]
+
+
+class TestInMemoryCache:
+    def test_lru_eviction_by_entries_and_bytes(self) -> None:
+        cache = InMemoryCache(max_entries=2, max_bytes=10)
+        cache.set_nowait("a", b"1234")
+        cache.set_nowait("b", b"1234")
+        assert cache.get_nowait("a") == b"1234"
+        cache.set_nowait("c", b"1234")  # evicts "b", the least recently used
+        assert cache.get_nowait("b") is None
+        cache.set_nowait("d", b"12345678")  # over max_bytes with "a" and "c"
+        assert cache.get_nowait("d") == b"12345678"
+        assert cache.stats()["entries"] == 1
+        assert cache.stats()["bytes"] == 8
+
+    def test_ttl_and_max_age(self) -> None:
+        cache = InMemoryCache()
+        cache.set_nowait("a", b"x", ttl=0)
+        assert cache.get_nowait("a") is None
+        cache.set_nowait("b", b"x", ttl=60)
+        time.sleep(0.02)
+        assert cache.get_nowait("b", max_age=0.01) is None
+        assert cache.get_nowait("b", max_age=60) == b"x"
+        assert cache.hits == 1 and cache.misses == 2
+
+    def test_key_covers_sampling_params_only(self) -> None:
+        base = {"messages": messages, "temperature": 0.0}
+        key = request_cache_key("/chat/completions", "openai:gpt-4", base)
+        assert key == request_cache_key(
+            "/chat/completions", "openai:gpt-4", {**base, "stream": False, "top_p": None}
+        )
+        assert key != request_cache_key(
+            "/chat/completions", "openai:gpt-4", {**base, "temperature": 1}
+        )
+        assert key != request_cache_key("/chat/completions", "openai:gpt-3.5", base)
+        assert key != request_cache_key("/chat/completions", "azure-openai:gpt-4", base)
+        assert key != request_cache_key("https://other/chat/completions", "openai:gpt-4", base)
+
+
+class TestResponseCaching:
+    def run_calls(self, targets, calls: int, **kwargs) -> list:
+        upstream: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            upstream.append(request_model(request))
+            return httpx.Response(200, json=chat_completion_body(request_model(request)))
+
+        async def run():
+            client = mock_api_client(handler)
+            results = [
+                await chat(client, targets, messages=messages, **kwargs)
+                for _ in range(calls)
+            ]
+            await client.aclose()
+            return results
+
+        response_cache.clear()
+        results = asyncio.run(run())
+        assert all(isinstance(res, ChatCompletion) for res in results)
+        return upstream
+
+    def test_identical_requests_hit_the_cache(self) -> None:
+        targets = llms("model-a")
+        targets[0].cache = True
+        assert self.run_calls(targets, 3) == ["model-a"]
+
+    def test_force_refresh_bypasses_the_cache(self) -> None:
+        targets = llms("model-a")
+        targets[0].cache = True
+        targets[0].cache_force_refresh = True
+        assert self.run_calls(targets, 2) == ["model-a", "model-a"]
+
+    def test_cache_off_by_default(self) -> None:
+        assert self.run_calls(llms("model-a"), 2) == ["model-a", "model-a"]
+
+    def test_targets_on_other_providers_or_accounts_do_not_share(self) -> None:
+        upstream: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            upstream.append(request_model(request))
+            return httpx.Response(200, json=chat_completion_body(request_model(request)))
+
+        def target(provider: str, virtual_key: str) -> list:
+            llm = LLMOptions(provider=provider, model="gpt-4", virtual_key=virtual_key)
+            llm.cache = True
+            return [llm]
+
+        variants = [
+            target("openai", "team-a"),
+            target("openai", "team-b"),
+            target("cohere", "team-a"),
+            target("openai", "team-a"),
+        ]
+
+        async def run():
+            client = mock_api_client(handler)
+            for targets in variants:
+                await chat(client, targets, messages=messages)
+            await client.aclose()
+
+        response_cache.clear()
+        asyncio.run(run())
+        response_cache.clear()
+        # Only the repeat of the first target is served from the cache.
+        assert len(upstream) == 3
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from numexa import CircuitBreakerSettings, Config
+from numexa.api_resources.circuit_breaker import CircuitBreaker, CircuitState
+from numexa.api_resources.exceptions import CircuitOpenError, InternalServerError
+from numexa.api_resources.utils import target_id
+from tests.utils import chat, chat_completion_body, llms, mock_api_client, request_model
+
+
+def breaker_config(*models: str, **settings) -> Config:
+    settings = {"min_requests": 2, "cooldown": 60, **settings}
+    return Config(
+        mode="fallback",
+        llms=llms(*models),
+        circuit_breaker=CircuitBreakerSettings(**settings),
+    )
+
+
+class TestCircuitBreaker:
+    def test_opens_on_failure_rate(self) -> None:
+        breaker = CircuitBreaker(
+            CircuitBreakerSettings(failure_rate=0.5, min_requests=4)
+        )
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow()
+        assert breaker.stats()["rejected"] == 1
+
+    def test_half_open_probe_closes_or_reopens(self) -> None:
+        breaker = CircuitBreaker(CircuitBreakerSettings(min_requests=1, cooldown=0))
+        breaker.record_failure()
+        assert breaker.allow()
+        assert breaker.state == CircuitState.HALF_OPEN
+        # Only one probe at a time.
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.stats()["times_opened"] == 2
+
+    def test_released_probe_frees_its_slot(self) -> None:
+        breaker = CircuitBreaker(CircuitBreakerSettings(min_requests=1, cooldown=0))
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.release()
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow()
+
+    def test_rejects_invalid_settings(self) -> None:
+        with pytest.raises(ValueError):
+            CircuitBreakerSettings(failure_rate=0)
+
+
+class TestFallbackWithCircuitBreaker:
+    def test_open_target_is_skipped_without_io(self) -> None:
+        calls: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            model = request_model(request)
+            calls.append(model)
+            if model == "dead":
+                return httpx.Response(503, json={"error": {"message": "down"}})
+            return httpx.Response(200, json=chat_completion_body(model))
+
+        config = breaker_config("dead", "backup")
+        for target in config.llms:
+            target.retry = {"attempts": 0}
+
+        async def run():
+            client = mock_api_client(handler)
+            for _ in range(4):
+                res = await chat(client, config.llms, mode="fallback", config=config)
+                assert res.model == "backup"
+            await client.aclose()
+            return client
+
+        client = asyncio.run(run())
+        assert calls == ["dead", "backup", "dead", "backup", "backup", "backup"]
+        stats = client.circuit_breaker_stats()
+        assert stats[target_id(config.llms[0])]["state"] == "open"
+        assert stats[target_id(config.llms[1])]["state"] == "closed"
+
+    def test_raises_when_every_circuit_is_open(self) -> None:
+        calls: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request_model(request))
+            return httpx.Response(500, json={"error": {"message": "down"}})
+
+        config = breaker_config("dead", min_requests=1)
+        config.llms[0].retry = {"attempts": 0}
+
+        async def run():
+            client = mock_api_client(handler)
+            try:
+                with pytest.raises(InternalServerError):
+                    await chat(client, config.llms, config=config)
+                with pytest.raises(CircuitOpenError):
+                    await chat(client, config.llms, config=config)
+            finally:
+                await client.aclose()
+
+        asyncio.run(run())
+        assert calls == ["dead"]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+
+from numexa.api_resources.client import ClientRegistry
+
+base_url = "https://example.invalid/v1"
+
+
+class TestClientRegistry:
+    def test_reuses_client_on_same_loop(self) -> None:
+        registry = ClientRegistry()
+
+        async def run():
+            first = registry.get(base_url=base_url, api_key="key-a")
+            second = registry.get(base_url=base_url, api_key="key-a")
+            other = registry.get(base_url=base_url, api_key="key-b")
+            await registry.aclose()
+            return first, second, other
+
+        first, second, other = asyncio.run(run())
+        assert first is second
+        assert first is not other
+        assert first.is_closed() and other.is_closed()
+        assert len(registry) == 0
+
+    def test_new_client_per_event_loop(self) -> None:
+        registry = ClientRegistry()
+
+        async def run():
+            return registry.get(base_url=base_url, api_key="key-a")
+
+        first = asyncio.run(run())
+        second = asyncio.run(run())
+        assert first is not second
+        # The entry of the first, now closed, loop has been dropped.
+        assert len(registry) == 1
+
+    def test_evicts_idle_clients(self) -> None:
+        registry = ClientRegistry(idle_timeout=0)
+
+        async def run():
+            first = registry.get(base_url=base_url, api_key="key-a")
+            await asyncio.sleep(0.01)
+            second = registry.get(base_url=base_url, api_key="key-b")
+            await asyncio.sleep(0)
+            await registry.aclose()
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first.is_closed()
+        assert len(registry) == 0
+
+    def test_keeps_busy_clients(self) -> None:
+        registry = ClientRegistry(idle_timeout=0)
+
+        async def run():
+            first = registry.get(base_url=base_url, api_key="key-a")
+            first._in_flight += 1
+            await asyncio.sleep(0.01)
+            registry.get(base_url=base_url, api_key="key-b")
+            closed = first.is_closed()
+            first._in_flight -= 1
+            await registry.aclose()
+            return closed
+
+        assert asyncio.run(run()) is False
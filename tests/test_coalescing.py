@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from numexa import Config
+from numexa.api_resources.coalescing import SingleFlight, StreamFanout
+from numexa.api_resources.cache import response_cache
+from tests.utils import (
+    chat,
+    chat_completion_body,
+    llms,
+    mock_api_client,
+    request_model,
+    sse_response,
+)
+
+tokens = ["The ", "answer ", "is ", "4"]
+
+
+def run_concurrently(
+    handler, callers: int, stream: bool = False, coalesce: bool = True, cache: bool = False
+):
+    async def call(client, config):
+        res = await chat(client, config.llms, stream=stream, config=config)
+        if not stream:
+            return res.choices[0].message["content"]
+        content = []
+        async for chunk in res:
+            content.append(chunk.choices[0].delta.get("content") or "")
+        return "".join(content)
+
+    async def run():
+        client = mock_api_client(handler)
+        targets = llms("model-a")
+        targets[0].cache = cache
+        config = Config(mode="single", llms=targets, coalesce=coalesce)
+        results = await asyncio.gather(*[call(client, config) for _ in range(callers)])
+        idle = client.is_idle()
+        await client.aclose()
+        return results, idle
+
+    return asyncio.run(run())
+
+
+class TestSingleFlight:
+    def test_concurrent_identical_requests_share_one_call(self) -> None:
+        upstream: list = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            upstream.append(request_model(request))
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json=chat_completion_body("model-a", "4"))
+
+        results, _ = run_concurrently(handler, 20)
+        assert results == ["4"] * 20
+        assert upstream == ["model-a"]
+
+    def test_streamed_response_fans_out_to_every_waiter(self) -> None:
+        upstream: list = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            upstream.append(request_model(request))
+            await asyncio.sleep(0.05)
+            return sse_response("model-a", tokens, chunk_size=5)
+
+        results, idle = run_concurrently(handler, 10, stream=True)
+        assert results == ["".join(tokens)] * 10
+        assert upstream == ["model-a"]
+        assert idle
+
+    def test_off_unless_enabled(self) -> None:
+        upstream: list = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            upstream.append(request_model(request))
+            return httpx.Response(200, json=chat_completion_body("model-a", "4"))
+
+        run_concurrently(handler, 3, coalesce=False)
+        assert len(upstream) == 3
+
+    def test_shared_response_is_cached_once(self) -> None:
+        upstream: list = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            upstream.append(request_model(request))
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json=chat_completion_body("model-a", "4"))
+
+        response_cache.clear()
+        results, _ = run_concurrently(handler, 10, cache=True)
+        assert results == ["4"] * 10
+        assert upstream == ["model-a"]
+        assert response_cache.stats()["entries"] == 1
+        response_cache.clear()
+
+
+def slow_upstream(chunks: list) -> httpx.Response:
+    async def body():
+        for chunk in chunks:
+            await asyncio.sleep(0.01)
+            yield chunk
+
+    return httpx.Response(
+        200, content=body(), request=httpx.Request("POST", "https://numexa.mock/v1")
+    )
+
+
+async def read_first(response: httpx.Response) -> bytes:
+    async for chunk in response.aiter_raw():
+        await response.aclose()
+        return chunk
+    return b""
+
+
+class TestStreamFanout:
+    def test_expected_reader_gets_the_whole_stream(self) -> None:
+        async def run():
+            fanout = StreamFanout(slow_upstream([b"a", b"b", b"c"]))
+            fanout.expect(2)
+            first = await read_first(fanout.response())
+            second = fanout.response()
+            return first, b"".join([chunk async for chunk in second.aiter_raw()])
+
+        assert asyncio.run(run()) == (b"a", b"abc")
+
+    def test_reader_after_the_stream_stopped_fails(self) -> None:
+        async def run():
+            fanout = StreamFanout(slow_upstream([b"a", b"b", b"c"]))
+            await read_first(fanout.response())
+            await asyncio.sleep(0.05)
+            late = fanout.response()
+            with pytest.raises(httpx.StreamClosed):
+                async for _ in late.aiter_raw():
+                    pass
+
+        asyncio.run(run())
+
+    def test_waiters_of_a_flight_are_expected(self) -> None:
+        async def run():
+            flight = SingleFlight()
+
+            async def call():
+                return StreamFanout(slow_upstream([b"a", b"b", b"c"]))
+
+            async def early():
+                shared = await flight.do("key", call)
+                return await read_first(shared.response())
+
+            async def late():
+                shared = await flight.do("key", call)
+                await asyncio.sleep(0.05)
+                response = shared.response()
+                return b"".join([chunk async for chunk in response.aiter_raw()])
+
+            return await asyncio.gather(early(), late())
+
+        assert asyncio.run(run()) == [b"a", b"abc"]
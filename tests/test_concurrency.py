@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from numexa import AdaptiveConcurrencySettings, Config
+from numexa.api_resources.concurrency import AdaptiveLimiter, Overloaded
+from numexa.api_resources.exceptions import ConcurrencyLimitError
+from numexa.api_resources.utils import target_id
+from tests.utils import chat, chat_completion_body, llms, mock_api_client
+
+request = httpx.Request("POST", "https://numexa.mock/v1/chat/completions")
+
+
+def limiter(**settings) -> AdaptiveLimiter:
+    return AdaptiveLimiter(AdaptiveConcurrencySettings(**settings))
+
+
+class TestAdaptiveLimiter:
+    def test_grows_additively_when_in_use(self) -> None:
+        aimd = limiter(initial_limit=2, max_limit=3)
+
+        async def run() -> None:
+            for _ in range(3):
+                await aimd.acquire(request)
+                aimd.release(0.1)
+
+        asyncio.run(run())
+        # in_flight was 1 of 2, then 1 of 3: only the first success counts.
+        assert aimd.stats()["limit"] == 3
+
+    def test_backs_off_multiplicatively(self) -> None:
+        aimd = limiter(initial_limit=10, backoff_ratio=0.5)
+
+        async def run() -> None:
+            await aimd.acquire(request)
+            aimd.release(overload=True)
+
+        asyncio.run(run())
+        assert aimd.stats()["limit"] == 5
+
+    def test_backs_off_on_latency_inflation(self) -> None:
+        aimd = limiter(initial_limit=1, min_samples=3, backoff_ratio=0.5)
+
+        async def run() -> None:
+            for latency in (0.1, 0.1, 0.1, 0.1):
+                await aimd.acquire(request)
+                aimd.release(latency)
+            before = aimd.limit
+            await aimd.acquire(request)
+            aimd.release(1.0)
+            assert aimd.limit == before * 0.5
+
+        asyncio.run(run())
+
+    def test_queues_in_order_and_sheds_over_the_queue(self) -> None:
+        aimd = limiter(initial_limit=1, max_queue=1)
+        order: list = []
+
+        async def run() -> None:
+            await aimd.acquire(request)
+
+            async def queued() -> None:
+                await aimd.acquire(request)
+                order.append("queued")
+                aimd.release()
+
+            task = asyncio.ensure_future(queued())
+            await asyncio.sleep(0)
+            with pytest.raises(Overloaded):
+                await aimd.acquire(request)
+            order.append("released")
+            aimd.release()
+            await task
+
+        asyncio.run(run())
+        assert order == ["released", "queued"]
+        assert aimd.stats()["shed"] == 1
+        assert aimd.in_flight == 0
+
+    def test_queue_timeout_sheds(self) -> None:
+        aimd = limiter(initial_limit=1, queue_timeout=0.01)
+
+        async def run() -> None:
+            await aimd.acquire(request)
+            with pytest.raises(Overloaded):
+                await aimd.acquire(request)
+
+        asyncio.run(run())
+        assert aimd.stats()["queued"] == 0
+
+
+class TestConcurrencyLimitedRequests:
+    def test_load_is_shed_past_the_queue(self) -> None:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json=chat_completion_body("model-a"))
+
+        config = Config(
+            mode="single",
+            llms=llms("model-a"),
+            adaptive_concurrency=AdaptiveConcurrencySettings(
+                initial_limit=1, min_limit=1, max_limit=1, max_queue=1
+            ),
+        )
+
+        async def run():
+            client = mock_api_client(handler)
+            results = await asyncio.gather(
+                *(chat(client, config.llms, config=config) for _ in range(3)),
+                return_exceptions=True,
+            )
+            await client.aclose()
+            return client, results
+
+        client, results = asyncio.run(run())
+        assert [type(r).__name__ for r in results].count("ChatCompletion") == 2
+        assert isinstance(results[2], ConcurrencyLimitError)
+        stats = client.concurrency_stats()[target_id(config.llms[0])]
+        assert stats["shed"] == 1 and stats["in_flight"] == 0
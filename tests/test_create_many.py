@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+
+import httpx
+import pytest
+
+from numexa import ChatCompletion, ChatCompletions, Config
+from numexa.api_resources import apis
+from numexa.api_resources.exceptions import BadRequestError
+from tests.utils import chat_completion_body, llms, mock_api_client
+
+
+def echo_handler(in_flight: list):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        content = json.loads(request.content)["messages"][0]["content"]
+        in_flight.append(1)
+        peak = len(in_flight)
+        await asyncio.sleep(random.random() / 100)
+        in_flight.pop()
+        if content == "bad":
+            return httpx.Response(400, json={"error": {"message": "bad"}})
+        return httpx.Response(200, json=chat_completion_body("model-a", f"{content}:{peak}"))
+
+    return handler
+
+
+def requests_for(*contents: str) -> list:
+    return [{"messages": [{"role": "user", "content": c}]} for c in contents]
+
+
+@pytest.fixture
+def config(monkeypatch) -> Config:
+    client = mock_api_client(echo_handler([]))
+    monkeypatch.setattr(apis, "get_client", lambda **kwargs: client)
+    return Config(mode="single", llms=llms("model-a"))
+
+
+class TestCreateMany:
+    def test_results_in_input_order_with_stats(self, config) -> None:
+        contents = [str(i) for i in range(20)]
+        results = asyncio.run(
+            ChatCompletions.create_many(requests_for(*contents), config=config, concurrency=3)
+        )
+        assert all(isinstance(res, ChatCompletion) for res in results)
+        answers = [res.choices[0].message["content"].split(":") for res in results]
+        assert [content for content, _ in answers] == contents
+        assert max(int(peak) for _, peak in answers) <= 3
+        summary = results.stats.summary()
+        assert summary["requests"] == summary["succeeded"] == 20
+        assert summary["throughput"] > 0
+        assert summary["p50"] <= summary["p95"] <= summary["p99"]
+
+    def test_return_exceptions(self, config) -> None:
+        requests = requests_for("a", "bad", "c")
+        results = asyncio.run(
+            ChatCompletions.create_many(requests, config=config, return_exceptions=True)
+        )
+        assert isinstance(results[1], BadRequestError)
+        assert results[2].choices[0].message["content"].startswith("c")
+        assert results.stats.failed == 1
+
+        with pytest.raises(BadRequestError):
+            asyncio.run(ChatCompletions.create_many(requests, config=config))
+
+    def test_iter_many_yields_as_completed(self, config) -> None:
+        async def run():
+            run = ChatCompletions.iter_many(
+                (r for r in requests_for("0", "1", "2", "3")), config=config, concurrency=2
+            )
+            seen = [index async for index, _ in run]
+            return seen, run.stats
+
+        seen, stats = asyncio.run(run())
+        assert sorted(seen) == [0, 1, 2, 3]
+        assert stats.succeeded == 4
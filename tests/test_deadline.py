@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from numexa import Config, TimeoutSettings
+from numexa.api_resources.deadline import Deadline, attempt_timeout
+from numexa.api_resources.exceptions import APITimeoutError, RateLimitError
+from tests.utils import chat, chat_completion_body, llms, mock_api_client, request_model
+
+
+class TestAttemptTimeout:
+    def test_phases_are_capped_by_the_deadline(self) -> None:
+        current = {"connect": 5.0, "read": 5.0, "write": 5.0, "pool": 5.0}
+        settings = TimeoutSettings(connect=1, read=30)
+        timeouts = attempt_timeout(current, settings, Deadline(10))
+        assert timeouts["connect"] == 1
+        assert 9 < timeouts["read"] <= 10
+        assert 9 < timeouts["pool"] <= 10
+
+    def test_without_deadline_unset_phases_are_kept(self) -> None:
+        current = {"connect": 5.0, "read": 5.0, "write": 5.0, "pool": 5.0}
+        timeouts = attempt_timeout(current, TimeoutSettings(read=60))
+        assert timeouts == {"connect": 5.0, "read": 60, "write": 5.0, "pool": 5.0}
+
+
+class TestDeadlineBudgets:
+    def test_budget_spans_every_fallback(self) -> None:
+        calls: list = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request_model(request))
+            await asyncio.sleep(0.2)
+            return httpx.Response(500, json={"error": {"message": "down"}})
+
+        targets = llms("model-a", "model-b", "model-c")
+        for target in targets:
+            target.retry = {"attempts": 0}
+
+        async def run() -> float:
+            client = mock_api_client(handler)
+            start = time.monotonic()
+            try:
+                with pytest.raises(APITimeoutError):
+                    await chat(client, targets, mode="fallback", params={"timeout": 0.3})
+            finally:
+                await client.aclose()
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+        assert elapsed < 0.5
+        assert calls == ["model-a", "model-b"]
+
+    def test_no_backoff_past_the_deadline(self) -> None:
+        calls: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request_model(request))
+            return httpx.Response(
+                429, headers={"retry-after": "1"}, json={"error": {"message": "slow"}}
+            )
+
+        async def run() -> float:
+            client = mock_api_client(handler)
+            start = time.monotonic()
+            try:
+                with pytest.raises(RateLimitError):
+                    await chat(client, llms("model-a"), params={"timeout": 0.5})
+            finally:
+                await client.aclose()
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) < 0.3
+        assert calls == ["model-a"]
+
+    def test_attempt_gets_remaining_time_per_phase(self) -> None:
+        seen: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.extensions["timeout"])
+            return httpx.Response(200, json=chat_completion_body(request_model(request)))
+
+        config = Config(
+            mode="single", llms=llms("model-a"), timeouts=TimeoutSettings(connect=1)
+        )
+
+        async def run() -> None:
+            client = mock_api_client(handler)
+            await chat(client, config.llms, config=config, params={"timeout": 10})
+            await client.aclose()
+
+        asyncio.run(run())
+        [timeouts] = seen
+        assert timeouts["connect"] == 1
+        assert 9 < timeouts["read"] <= 10
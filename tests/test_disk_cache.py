@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import time
+
+import httpx
+import pytest
+
+import numexa
+from numexa import ChatCompletion, SQLiteCache
+from tests.utils import chat, chat_completion_body, llms, mock_api_client, request_model
+
+
+def write_entries(path: str, start: int) -> None:
+    cache = SQLiteCache(path)
+    for i in range(start, start + 50):
+        cache.set_nowait(f"key-{i}", str(i).encode())
+
+
+class TestSQLiteCache:
+    def test_ttl_and_max_age(self, tmp_path) -> None:
+        cache = SQLiteCache(str(tmp_path / "cache.db"))
+        cache.set_nowait("a", b"x", ttl=0)
+        assert cache.get_nowait("a") is None
+        cache.set_nowait("b", b"x", ttl=60)
+        time.sleep(0.02)
+        assert cache.get_nowait("b", max_age=0.01) is None
+        assert cache.get_nowait("b", max_age=60) == b"x"
+        assert cache.hits == 1 and cache.misses == 2
+
+    def test_compact_drops_expired_then_oldest(self, tmp_path) -> None:
+        cache = SQLiteCache(str(tmp_path / "cache.db"), max_entries=2)
+        cache.set_nowait("expired", b"x", ttl=0)
+        for key in ("a", "b", "c"):
+            cache.set_nowait(key, b"x")
+        assert cache.compact() == 2
+        assert cache.get_nowait("a") is None
+        assert cache.stats()["entries"] == 2
+
+    def test_shared_across_processes(self, tmp_path) -> None:
+        path = str(tmp_path / "cache.db")
+        SQLiteCache(path)
+        workers = [
+            multiprocessing.Process(target=write_entries, args=(path, start))
+            for start in (0, 50, 100)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert all(worker.exitcode == 0 for worker in workers)
+        cache = SQLiteCache(path)
+        assert cache.stats()["entries"] == 150
+        assert cache.get_nowait("key-120") == b"120"
+
+
+class TestDiskBackedResponses:
+    @pytest.fixture
+    def backend(self, tmp_path):
+        numexa.cache_backend = SQLiteCache(str(tmp_path / "cache.db"))
+        yield numexa.cache_backend
+        numexa.cache_backend = None
+
+    def test_responses_survive_a_new_backend(self, backend, tmp_path) -> None:
+        upstream: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            upstream.append(request_model(request))
+            return httpx.Response(200, json=chat_completion_body(request_model(request)))
+
+        targets = llms("model-a")
+        targets[0].cache = True
+
+        async def run():
+            client = mock_api_client(handler)
+            first = await chat(client, targets)
+            # A fresh backend on the same file, as another worker would open.
+            numexa.cache_backend = SQLiteCache(backend.path)
+            second = await chat(client, targets)
+            await client.aclose()
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert isinstance(second, ChatCompletion)
+        assert second.id == first.id
+        assert upstream == ["model-a"]
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+
+from numexa import ChatCompletion, Config, HedgingSettings
+from numexa.api_resources.hedging import hedge_delay
+from numexa.api_resources.latency import LatencyTracker
+from tests.utils import chat, chat_completion_body, llms, mock_api_client, request_model
+
+
+def fallback_config(**hedging) -> Config:
+    return Config(mode="fallback", llms=llms("slow", "fast"), hedging=HedgingSettings(**hedging))
+
+
+class TestHedgeDelay:
+    def test_fixed_delay_until_enough_samples(self) -> None:
+        settings = HedgingSettings(delay=0.5, percentile=50, min_samples=3)
+        tracker = LatencyTracker()
+        tracker.record(0.1)
+        assert hedge_delay(settings, tracker) == 0.5
+        tracker.record(0.2)
+        tracker.record(0.3)
+        assert hedge_delay(settings, tracker) == 0.2
+
+    def test_delay_is_clamped(self) -> None:
+        settings = HedgingSettings(delay=5, max_delay=1, min_delay=0.1)
+        assert hedge_delay(settings) == 1
+
+
+class TestHedgedFallback:
+    def test_hedge_wins_over_slow_primary(self) -> None:
+        cancelled = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            model = request_model(request)
+            if model == "slow":
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(model)
+                    raise
+            return httpx.Response(200, json=chat_completion_body(model))
+
+        async def run():
+            client = mock_api_client(handler)
+            config = fallback_config(delay=0.05)
+            start = time.monotonic()
+            res = await chat(client, config.llms, mode="fallback", config=config)
+            elapsed = time.monotonic() - start
+            await client.aclose()
+            return res, elapsed
+
+        res, elapsed = asyncio.run(run())
+        assert isinstance(res, ChatCompletion)
+        assert res.model == "fast"
+        assert elapsed < 1
+        assert cancelled == ["slow"]
+
+    def test_failed_primary_falls_back_without_waiting(self) -> None:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            model = request_model(request)
+            if model == "slow":
+                return httpx.Response(400, json={"error": {"message": "bad request"}})
+            return httpx.Response(200, json=chat_completion_body(model))
+
+        async def run():
+            client = mock_api_client(handler)
+            config = fallback_config(delay=5)
+            start = time.monotonic()
+            res = await chat(client, config.llms, mode="fallback", config=config)
+            elapsed = time.monotonic() - start
+            await client.aclose()
+            return res, elapsed
+
+        res, elapsed = asyncio.run(run())
+        assert res.model == "fast"
+        assert elapsed < 1
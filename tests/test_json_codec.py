@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from decimal import Decimal
+
+import httpx
+import pytest
+
+from numexa.api_resources import base_client, json_codec
+from numexa.api_resources.json_codec import _select, ascii_dumps, dumps, loads, pretty
+from numexa.api_resources.streaming import ServerSentEvent
+from tests.utils import chat, chat_completion_body, llms, mock_api_client, sse_response
+
+document = {"model": "gpt-4", "messages": [{"role": "user", "content": "héllo"}], "n": 1}
+
+
+def backends():
+    names = ["json"]
+    for name in json_codec._BACKENDS:
+        try:
+            _select(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+class TestJsonCodec:
+    @pytest.mark.parametrize("name", backends())
+    def test_backends_agree_with_the_standard_library(self, name) -> None:
+        _, dumps, loads = _select(name)
+        encoded = dumps(document)
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == document
+        assert loads(json.dumps(document).encode()) == document
+        assert loads(json.dumps(document)) == document
+        assert json.loads(dumps({"cost": Decimal("0.5")}, default=str)) == {"cost": "0.5"}
+        with pytest.raises(ValueError):
+            loads(b"{not json")
+
+    def test_unknown_backend_is_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            _select("yaml")
+
+    def test_helpers(self) -> None:
+        assert loads(dumps(document)) == document
+        assert ascii_dumps({"name": "héllo"}) == '{"name":"h\\u00e9llo"}'
+        assert ascii_dumps({"name": "hello"}) == '{"name":"hello"}'
+        assert pretty(document) == json.dumps(document, indent=4)
+        assert json_codec.backend in backends()
+
+    def test_stream_events(self) -> None:
+        assert ServerSentEvent(data=b'{"a": 1}').json() == {"a": 1}
+        assert ServerSentEvent(data="[DONE]").json() == {"model": "", "choices": [{}]}
+        assert ServerSentEvent(data=b"[DONE]").json() == {"model": "", "choices": [{}]}
+
+
+class TestRequestBodies:
+    def test_fallback_bodies_share_one_encoding_of_the_messages(self, monkeypatch) -> None:
+        messages = [{"role": "user", "content": "héllo " * 100}]
+        sent = []
+        encoded = []
+
+        def counting_dumps(obj, default=None):
+            encoded.append(obj)
+            return dumps(obj, default)
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            sent.append(body)
+            if body["model"] != "model-c":
+                return httpx.Response(503, json={"error": {"message": "down"}})
+            return httpx.Response(200, json=chat_completion_body(body["model"]))
+
+        monkeypatch.setattr(base_client, "dumps", counting_dumps)
+
+        async def run():
+            client = mock_api_client(handler)
+            targets = llms("model-a", "model-b", "model-c")
+            params = {"temperature": 0.2, "max_tokens": 50, "timeout": 30}
+            res = await chat(client, targets, mode="fallback", messages=messages, params=params)
+            await client.aclose()
+            return res
+
+        res = asyncio.run(run())
+        assert res.model == "model-c"
+        # The SDK-side timeout is not sent upstream.
+        expected = {"messages": messages, "temperature": 0.2, "max_tokens": 50, "stream": False}
+        assert all(body == {**expected, "model": body["model"]} for body in sent)
+        assert {body["model"] for body in sent} == {"model-a", "model-b", "model-c"}
+        assert sum(obj.get("messages") == messages for obj in encoded if isinstance(obj, dict)) == 1
+
+    def test_stream_is_requested_upstream(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            if not body.get("stream"):
+                return httpx.Response(200, json=chat_completion_body(body["model"]))
+            return sse_response(body["model"], ["Hel", "lo"])
+
+        async def run():
+            client = mock_api_client(handler)
+            stream = await chat(client, llms("model-a"), stream=True)
+            chunks = [chunk async for chunk in stream]
+            await client.aclose()
+            return chunks
+
+        chunks = asyncio.run(run())
+        assert "".join(c.choices[0].delta.get("content") or "" for c in chunks) == "Hello"
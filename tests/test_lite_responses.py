@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from numexa import (
+    ChatCompletion,
+    ChatCompletionChunk,
+    Config,
+    LiteChatCompletion,
+    LiteChatCompletionChunk,
+    TextCompletion,
+    TextCompletionChunk,
+)
+from numexa.api_resources.lite_responses import lite_type
+from tests.utils import (
+    chat,
+    chat_completion_body,
+    chat_completion_chunk,
+    llms,
+    mock_api_client,
+    request_model,
+    sse_response,
+)
+
+
+class TestLiteResponses:
+    @pytest.mark.parametrize(
+        "model", [ChatCompletion, ChatCompletionChunk, TextCompletion, TextCompletionChunk]
+    )
+    def test_fields_match_the_models(self, model) -> None:
+        assert list(lite_type(model)._fields) == list(model.__fields__)
+
+    def test_same_access_and_dict_as_the_model(self) -> None:
+        body = chat_completion_body("gpt-4")
+        lite, model = LiteChatCompletion(**body), ChatCompletion(**body)
+        assert lite.dict() == model.dict()
+        assert str(lite) == str(model)
+        assert lite.choices[0].message["content"] == "Hello!"
+        assert lite["usage"].total_tokens == lite.get("usage")["total_tokens"] == 7
+        assert lite["missing"] is None
+        assert lite.get("missing", 1) == 1
+        with pytest.raises(AttributeError):
+            lite.missing
+
+    def test_chunk_defaults_and_done_event(self) -> None:
+        chunk = LiteChatCompletionChunk(**chat_completion_chunk("gpt-4", "Hi"))
+        assert chunk.choices[0].delta.content == "Hi"
+        assert chunk.choices[0].delta.role is None
+        assert chunk.choices is chunk.choices
+        done = LiteChatCompletionChunk(model="", choices=[{}])
+        assert done.choices[0].delta == {}
+        assert done.dict() == ChatCompletionChunk(model="", choices=[{}]).dict()
+        assert LiteChatCompletionChunk().choices == {}
+
+    def test_values_are_not_validated(self) -> None:
+        chunk = LiteChatCompletionChunk(created="soon", extra=1)
+        assert chunk.created == "soon"
+        assert not hasattr(chunk, "extra")
+
+
+class TestLiteClient:
+    def test_responses_and_chunks_are_lite(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            model = request_model(request)
+            if model == "streamed":
+                return sse_response(model, ["Hel", "lo"])
+            return httpx.Response(200, json=chat_completion_body(model))
+
+        config = Config(mode="single", llms=llms("model-a"), lite_responses=True)
+        streamed = Config(mode="single", llms=llms("streamed"), lite_responses=True)
+
+        async def run():
+            client = mock_api_client(handler)
+            response = await chat(client, config.llms, config=config)
+            stream = await chat(client, streamed.llms, stream=True, config=streamed)
+            chunks = [chunk async for chunk in stream]
+            await client.aclose()
+            return response, chunks
+
+        response, chunks = asyncio.run(run())
+        assert isinstance(response, LiteChatCompletion)
+        assert response.choices[0].message["content"] == "Hello!"
+        assert all(isinstance(chunk, LiteChatCompletionChunk) for chunk in chunks)
+        assert "".join(c.choices[0].delta.get("content") or "" for c in chunks) == "Hello"
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+
+from numexa.api_resources.log_shipper import LogShipper
+
+
+def make_client(received: list) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(
+            (request.headers["X-Numexa-Log-Type"], json.loads(request.content))
+        )
+        return httpx.Response(200, json={"success": True})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestLogShipper:
+    def test_groups_by_size_and_flushes_on_close(self) -> None:
+        received: list = []
+
+        async def run():
+            client = make_client(received)
+            shipper = LogShipper(client, max_batch_size=100, flush_interval=60)
+            for i in range(250):
+                shipper.submit("request", {"request_body": b'{"i": %d}' % i})
+            await shipper.aclose()
+            await client.aclose()
+            return shipper
+
+        shipper = asyncio.run(run())
+        assert len(received) == 250
+        assert received[0] == ("request", {"request_body": {"i": 0}})
+        assert shipper.shipped == 250 and shipper.flushes == 3
+
+    def test_flushes_after_interval(self) -> None:
+        received: list = []
+
+        async def run():
+            client = make_client(received)
+            shipper = LogShipper(client, max_batch_size=100, flush_interval=0.01)
+            shipper.submit("response", {"response_status_code": 200})
+            await asyncio.sleep(0.1)
+            shipped = len(received)
+            await shipper.aclose()
+            await client.aclose()
+            return shipped
+
+        assert asyncio.run(run()) == 1
+
+    def test_drops_when_queue_is_full(self) -> None:
+        received: list = []
+
+        async def run():
+            client = make_client(received)
+            shipper = LogShipper(client, max_queue_size=2)
+            accepted = [shipper.submit("request", {}) for _ in range(3)]
+            await shipper.aclose()
+            await client.aclose()
+            return shipper, accepted
+
+        shipper, accepted = asyncio.run(run())
+        assert accepted == [True, True, False]
+        assert shipper.dropped == 1 and shipper.shipped == 2
+
+    def test_failed_records_are_counted(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            status = 500 if request.headers["X-Numexa-Log-Type"] == "response" else 200
+            return httpx.Response(status)
+
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            shipper = LogShipper(client)
+            shipper.submit("request", {})
+            shipper.submit("response", {})
+            await shipper.aclose()
+            await client.aclose()
+            return shipper
+
+        shipper = asyncio.run(run())
+        assert shipper.shipped == 1 and shipper.failed == 1
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import httpx
+
+from numexa.api_resources.rate_limit import (
+    RateLimiter,
+    TokenBucket,
+    estimate_tokens,
+    usage_tokens,
+)
+from numexa.api_resources.utils import target_id
+from tests.utils import chat, chat_completion_body, llms, mock_api_client
+
+
+class TestEstimates:
+    def test_estimate_counts_messages_and_max_tokens(self) -> None:
+        params = {
+            "messages": [{"role": "user", "content": "x" * 400}],
+            "max_tokens": 50,
+            "n": 2,
+        }
+        assert estimate_tokens(params) == 100 + 4 + 100
+
+    def test_usage_tokens_reads_only_usage(self) -> None:
+        body = json.dumps(chat_completion_body("model-a")).encode("utf-8")
+        assert usage_tokens(body) == 7
+        assert usage_tokens(b'{"id": "x"}') is None
+        assert usage_tokens(b'{"usage": {"total_tokens": 3') is None
+
+
+class TestTokenBucket:
+    def test_large_cost_runs_into_debt(self) -> None:
+        bucket = TokenBucket(rate=10, capacity=10)
+        assert bucket.wait_time(100) == 0
+        bucket.take(100)
+        assert 8 < bucket.wait_time(1) <= 9.1
+
+
+class TestRateLimiter:
+    def test_requests_are_paced_in_order(self) -> None:
+        limiter = RateLimiter(requests_per_minute=600)
+        order: list = []
+
+        async def call(i: int) -> None:
+            await limiter.acquire()
+            order.append(i)
+
+        async def run() -> float:
+            start = time.monotonic()
+            await asyncio.gather(*(call(i) for i in range(12)))
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+        assert order == list(range(12))
+        # A second's worth up front, then one every 0.1s.
+        assert 0.15 < elapsed < 1
+        assert limiter.stats()["delayed"] == 2
+
+    def test_reconcile_refunds_unused_tokens(self) -> None:
+        limiter = RateLimiter(tokens_per_minute=600)
+        asyncio.run(limiter.acquire(10))
+        limiter.reconcile(10, 2)
+        assert limiter.tokens is not None and limiter.tokens.tokens >= 8
+
+
+class TestRateLimitedRequests:
+    def test_client_paces_target_and_reports_stats(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=chat_completion_body("model-a"))
+
+        targets = llms("model-a")
+        targets[0].rate_limit = {"requests_per_minute": 600}
+
+        async def run():
+            client = mock_api_client(handler)
+            start = time.monotonic()
+            await asyncio.gather(*(chat(client, targets) for _ in range(12)))
+            elapsed = time.monotonic() - start
+            await client.aclose()
+            return client, elapsed
+
+        client, elapsed = asyncio.run(run())
+        assert elapsed >= 0.15
+        stats = client.rate_limit_stats()[target_id(targets[0])]
+        assert stats["requests_per_minute"] == 600
+        assert stats["delayed"] == 2
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from numexa import ChatCompletions, Config, RawResponse, RawStream
+from numexa.api_resources import apis
+from numexa.api_resources.cache import response_cache
+from tests.utils import (
+    chat_completion_body,
+    chat_completion_chunk,
+    llms,
+    mock_api_client,
+    request_model,
+    sse_response,
+)
+
+messages = [{"role": "user", "content": "Hi"}]
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    model = request_model(request)
+    if model == "streamed":
+        return sse_response(model, ["Hel", "lo"])
+    body = json.dumps(chat_completion_body(model)).encode()
+    return httpx.Response(
+        200, headers={"content-type": "application/json", "x-upstream": "1"}, content=body
+    )
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = mock_api_client(handler)
+    monkeypatch.setattr(apis, "get_client", lambda **kwargs: client)
+    return client
+
+
+class TestRawResponses:
+    def test_body_is_returned_untouched(self, client) -> None:
+        config = Config(mode="single", llms=llms("model-a"))
+
+        async def run():
+            res = await ChatCompletions.create(messages=messages, config=config, raw=True)
+            await client.aclose()
+            return res
+
+        res = asyncio.run(run())
+        assert isinstance(res, RawResponse)
+        assert res.status_code == 200
+        assert res.headers["x-upstream"] == "1"
+        assert res.content == json.dumps(chat_completion_body("model-a")).encode()
+        assert res.json()["model"] == "model-a"
+
+    def test_stream_yields_data_payloads(self, client) -> None:
+        config = Config(mode="single", llms=llms("streamed"))
+
+        async def run():
+            stream = await ChatCompletions.create(
+                messages=messages, config=config, stream=True, raw=True
+            )
+            payloads = [payload async for payload in stream]
+            await client.aclose()
+            return stream, payloads
+
+        stream, payloads = asyncio.run(run())
+        assert isinstance(stream, RawStream)
+        assert stream.response.status_code == 200
+        assert payloads == [
+            json.dumps(chat_completion_chunk("streamed", "Hel")).encode(),
+            json.dumps(chat_completion_chunk("streamed", "lo")).encode(),
+            b"[DONE]",
+        ]
+
+    def test_cache_hit_is_raw(self, client) -> None:
+        targets = llms("model-a")
+        targets[0].cache = True
+        config = Config(mode="single", llms=targets)
+        response_cache.clear()
+
+        async def run():
+            first = await ChatCompletions.create(messages=messages, config=config, raw=True)
+            second = await ChatCompletions.create(messages=messages, config=config, raw=True)
+            await client.aclose()
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert isinstance(second, RawResponse)
+        assert second.content == first.content
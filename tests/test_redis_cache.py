@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import pytest
+
+import numexa
+from numexa import ChatCompletion, RedisCache
+from tests.utils import chat, chat_completion_body, llms, mock_api_client, request_model
+
+
+def parse_command(buffer: bytes) -> Tuple[Optional[List[bytes]], bytes]:
+    """First complete RESP command in `buffer` and the bytes after it."""
+    if b"\r\n" not in buffer:
+        return None, buffer
+    header, rest = buffer.split(b"\r\n", 1)
+    args = []
+    for _ in range(int(header[1:])):
+        if b"\r\n" not in rest:
+            return None, buffer
+        size, rest = rest.split(b"\r\n", 1)
+        size = int(size[1:])
+        if len(rest) < size + 2:
+            return None, buffer
+        args.append(rest[:size])
+        rest = rest[size + 2 :]
+    return args, rest
+
+
+class FakeRedis:
+    """In-process server speaking enough RESP for `RedisCache`."""
+
+    def __init__(self) -> None:
+        self.data: Dict[bytes, Tuple[bytes, float]] = {}
+        self.commands: List[List[bytes]] = []
+        # Number of commands that arrived in each read.
+        self.batches: List[int] = []
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.url = ""
+        # Sent after the next replies, answering no command.
+        self.unsolicited = b""
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.serve, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.url = f"redis://127.0.0.1:{port}/1"
+        return self.url
+
+    async def stop(self) -> None:
+        assert self.server is not None
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        buffer = b""
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            buffer += chunk
+            replies = []
+            while True:
+                args, buffer = parse_command(buffer)
+                if args is None:
+                    break
+                self.commands.append(args)
+                replies.append(self.execute(args))
+            self.batches.append(len(replies))
+            replies.append(self.unsolicited)
+            self.unsolicited = b""
+            writer.write(b"".join(replies))
+        writer.close()
+
+    def execute(self, args: List[bytes]) -> bytes:
+        name = args[0].upper()
+        if name == b"GET":
+            value, expires = self.data.get(args[1], (b"", 0.0))
+            if time.monotonic() >= expires:
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if name == b"SET":
+            self.data[args[1]] = (args[2], time.monotonic() + int(args[4]) / 1000)
+            return b"+OK\r\n"
+        if name == b"DEL":
+            return b":%d\r\n" % int(self.data.pop(args[1], None) is not None)
+        if name == b"SELECT":
+            return b"+OK\r\n"
+        return b"-ERR unknown command\r\n"
+
+
+def run_with_redis(test, **kwargs):
+    async def run():
+        fake = FakeRedis()
+        cache = RedisCache(await fake.start(), **kwargs)
+        try:
+            return await test(fake, cache)
+        finally:
+            await cache.aclose()
+            await fake.stop()
+
+    return asyncio.run(run())
+
+
+class TestRedisCache:
+    def test_round_trip_with_compression(self) -> None:
+        large = b"x" * 4096
+
+        async def test(fake: FakeRedis, cache: RedisCache):
+            await cache.set("small", b"tiny", ttl=60)
+            await cache.set("large", large, ttl=60)
+            stored = fake.data[b"numexa:cache:large"][0]
+            assert len(stored) < 200
+            assert await cache.get("small") == b"tiny"
+            assert await cache.get("large") == large
+            assert await cache.get("small", max_age=0) is None
+            await cache.delete("small")
+            assert await cache.get("small") is None
+            assert [c[0] for c in fake.commands][0] == b"SELECT"
+
+        run_with_redis(test, compress_min_bytes=1024)
+
+    def test_concurrent_commands_are_pipelined(self) -> None:
+        async def test(fake: FakeRedis, cache: RedisCache):
+            await cache.set("warm", b"1", ttl=60)
+            results = await asyncio.gather(*[cache.get("warm") for _ in range(20)])
+            assert results == [b"1"] * 20
+            return fake.batches
+
+        batches = run_with_redis(test, negative_ttl=0)
+        assert max(batches) == 20
+
+    def test_misses_are_negatively_cached(self) -> None:
+        async def test(fake: FakeRedis, cache: RedisCache):
+            assert await cache.get("cold") is None
+            assert await cache.get("cold") is None
+            gets = [c for c in fake.commands if c[0] == b"GET"]
+            assert len(gets) == 1
+            await asyncio.sleep(0.06)
+            assert await cache.get("cold") is None
+            # Storing a key forgets that it was missing.
+            await cache.set("cold", b"hot", ttl=60)
+            assert await cache.get("cold") == b"hot"
+            return cache.stats()
+
+        stats = run_with_redis(test, negative_ttl=0.05)
+        assert stats["negative_hits"] == 1
+        assert stats["hits"] == 1
+
+    def test_unreachable_server_is_a_miss(self) -> None:
+        async def run():
+            cache = RedisCache("redis://127.0.0.1:1/0", timeout=0.2)
+            await cache.set("key", b"value")
+            result = await cache.get("key")
+            await cache.aclose()
+            return result, cache.stats()["errors"]
+
+        assert asyncio.run(run()) == (None, 2)
+
+
+class TestSharedResponses:
+    @pytest.fixture(autouse=True)
+    def reset_backend(self):
+        yield
+        numexa.cache_backend = None
+
+    def test_second_process_is_served_from_redis(self) -> None:
+        upstream: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            upstream.append(request_model(request))
+            return httpx.Response(200, json=chat_completion_body(request_model(request)))
+
+        targets = llms("model-a")
+        targets[0].cache = True
+
+        async def test(fake: FakeRedis, cache: RedisCache):
+            client = mock_api_client(handler)
+            numexa.cache_backend = cache
+            first = await chat(client, targets)
+            # Another process on another node, with its own connection.
+            numexa.cache_backend = RedisCache(fake.url)
+            second = await chat(client, targets)
+            await numexa.cache_backend.aclose()
+            await client.aclose()
+            return first, second
+
+        first, second = run_with_redis(test)
+        assert isinstance(second, ChatCompletion)
+        assert second.id == first.id
+        assert upstream == ["model-a"]
+
+
+    def test_unsolicited_reply_fails_the_connection(self) -> None:
+        async def test(fake: FakeRedis, cache: RedisCache):
+            await cache.set("key", b"body", ttl=60)
+            first = cache._connection
+            fake.unsolicited = b"+OK\r\n"
+            assert await cache.get("key") == b"body"
+            await asyncio.sleep(0.05)
+            assert first.closed
+            started = time.monotonic()
+            assert await cache.get("key") == b"body"
+            assert time.monotonic() - started < cache.timeout
+            assert cache._connection is not first
+
+        run_with_redis(test, timeout=2.0)
+
+    def test_connection_of_a_finished_loop_is_replaced(self) -> None:
+        fake = FakeRedis()
+        server_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=server_loop.run_forever, daemon=True)
+        thread.start()
+        url = asyncio.run_coroutine_threadsafe(fake.start(), server_loop).result()
+        cache = RedisCache(url)
+        try:
+            asyncio.run(cache.set("key", b"body", ttl=60))
+            first = cache._connection
+            assert asyncio.run(cache.get("key")) == b"body"
+            assert first.closed and cache._connection is not first
+            asyncio.run(cache.aclose())
+        finally:
+            asyncio.run_coroutine_threadsafe(fake.stop(), server_loop).result()
+            server_loop.call_soon_threadsafe(server_loop.stop)
+            thread.join()
+            server_loop.close()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from numexa.api_resources.exceptions import BadRequestError, RateLimitError
+from numexa.api_resources.retries import RetryBudget, RetryPolicy, retry_after
+from tests.utils import chat, chat_completion_body, llms, mock_api_client, request_model
+
+
+class TestRetryAfter:
+    def test_parses_server_hints(self) -> None:
+        assert retry_after({"retry-after": "3"}) == 3
+        assert retry_after({"retry-after-ms": "250"}) == 0.25
+        assert retry_after({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+        assert (
+            retry_after(
+                {"x-ratelimit-reset-requests": "1s", "x-ratelimit-reset-tokens": "6m0s"}
+            )
+            == 360
+        )
+        assert retry_after({"x-ratelimit-reset-tokens": "20ms"}) == 0.02
+        assert retry_after({}) is None
+
+    def test_backoff_honours_hint_and_cap(self) -> None:
+        policy = RetryPolicy(base_delay=1, max_delay=4)
+        ok = httpx.Response(429, headers={"retry-after": "2"})
+        too_long = httpx.Response(429, headers={"retry-after": "60"})
+        assert policy.backoff(0, ok) == 2
+        assert policy.backoff(0, too_long) is None
+        assert all(0 <= policy.backoff(5) <= 4 for _ in range(100))
+
+    def test_policy_from_settings(self) -> None:
+        policy = RetryPolicy.from_settings(None, {"attempts": 4, "on_status_codes": [503]})
+        assert policy.attempts == 4 and policy.on_status_codes == {503}
+        assert RetryPolicy.from_settings({"attempts": 2, "on_status_codes": []}).on_status_codes == set()
+        assert RetryPolicy.from_settings({"attempts": 2}).on_status_codes
+
+
+class TestRetryBudget:
+    def test_caps_retries_to_ratio_of_requests(self) -> None:
+        budget = RetryBudget(ratio=0.1, min_per_second=0, window=60)
+        for _ in range(50):
+            budget.record_request()
+        granted = sum(budget.try_acquire() for _ in range(20))
+        assert granted == 5
+
+
+class TestRetryingRequests:
+    def test_retries_rate_limited_request(self) -> None:
+        calls: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request_model(request))
+            if len(calls) < 3:
+                return httpx.Response(429, headers={"retry-after": "0"}, json={})
+            return httpx.Response(200, json=chat_completion_body(request_model(request)))
+
+        async def run():
+            client = mock_api_client(handler)
+            res = await chat(client, llms("model-a"))
+            await client.aclose()
+            return res
+
+        assert asyncio.run(run()).model == "model-a"
+        assert calls == ["model-a"] * 3
+
+    def test_raises_once_retries_and_fallbacks_are_exhausted(self) -> None:
+        calls: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request_model(request))
+            return httpx.Response(
+                429, headers={"retry-after": "0"}, json={"error": {"message": "slow down"}}
+            )
+
+        targets = llms("model-a", "model-b")
+        targets[0].retry = {"attempts": 1, "on_status_codes": [429]}
+        targets[1].retry = {"attempts": 0, "on_status_codes": [429]}
+
+        async def run():
+            client = mock_api_client(handler)
+            try:
+                await chat(client, targets, mode="fallback")
+            finally:
+                await client.aclose()
+
+        with pytest.raises(RateLimitError, match="slow down"):
+            asyncio.run(run())
+        assert calls == ["model-a", "model-a", "model-b"]
+
+    def test_does_not_retry_client_errors(self) -> None:
+        calls: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request_model(request))
+            return httpx.Response(400, json={"error": {"message": "bad"}})
+
+        async def run():
+            client = mock_api_client(handler)
+            try:
+                await chat(client, llms("model-a"))
+            finally:
+                await client.aclose()
+
+        with pytest.raises(BadRequestError):
+            asyncio.run(run())
+        assert calls == ["model-a"]
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+
+import httpx
+import pytest
+
+from numexa.api_resources import base_client
+from numexa.api_resources.router import WeightedRouter
+from tests.utils import chat, chat_completion_body, llms, mock_api_client, request_model
+
+
+class TestWeightedRouter:
+    def test_exact_split_over_a_cycle(self) -> None:
+        router = WeightedRouter([5, 1, 1])
+        picks = [router.select() for _ in range(70)]
+        assert Counter(picks) == {0: 50, 1: 10, 2: 10}
+        # Smooth: the heavy target is never picked more than 5 times running.
+        assert "0" * 6 not in "".join(map(str, picks))
+
+    def test_zero_weight_is_never_selected(self) -> None:
+        router = WeightedRouter([0, 1])
+        for _ in range(10):
+            router.select()
+        assert router.stats() == {0: 0, 1: 10}
+
+    def test_rejects_invalid_weights(self) -> None:
+        with pytest.raises(ValueError):
+            WeightedRouter([0, 0])
+        with pytest.raises(ValueError):
+            WeightedRouter([-1, 2])
+
+
+class TestABTestRouting:
+    def test_ab_test_uses_llm_weights(self) -> None:
+        seen: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request_model(request))
+            return httpx.Response(200, json=chat_completion_body(request_model(request)))
+
+        targets = llms("model-a", "model-b")
+        targets[0].weight = 0.75
+        targets[1].weight = 0.25
+
+        async def run():
+            client = mock_api_client(handler)
+            for _ in range(8):
+                await chat(client, targets, mode="ab_test")
+            await client.aclose()
+            return client
+
+        client = asyncio.run(run())
+        assert Counter(seen) == {"model-a": 6, "model-b": 2}
+        assert client.routing_stats() == [{0: 6, 1: 2}]
+
+    def test_per_call_weights_override(self) -> None:
+        seen: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request_model(request))
+            return httpx.Response(200, json=chat_completion_body(request_model(request)))
+
+        async def run():
+            client = mock_api_client(handler)
+            for _ in range(4):
+                await chat(client, llms("model-a", "model-b"), mode="ab_test", weights=[0, 1])
+            await client.aclose()
+
+        asyncio.run(run())
+        assert seen == ["model-b"] * 4
+
+    def test_interleaved_weight_overrides_keep_their_split(self) -> None:
+        seen: dict = {(1, 1): [], (1, 2): []}
+        current: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            current.append(request_model(request))
+            return httpx.Response(200, json=chat_completion_body(request_model(request)))
+
+        async def run():
+            client = mock_api_client(handler)
+            for _ in range(6):
+                for weights in seen:
+                    await chat(
+                        client, llms("model-a", "model-b"), mode="ab_test", weights=list(weights)
+                    )
+                    seen[weights].append(current.pop())
+            await client.aclose()
+
+        asyncio.run(run())
+        assert Counter(seen[(1, 1)]) == {"model-a": 3, "model-b": 3}
+        assert Counter(seen[(1, 2)]) == {"model-a": 2, "model-b": 4}
+
+    def test_routers_are_bounded(self, monkeypatch) -> None:
+        monkeypatch.setattr(base_client, "DEFAULT_MAX_ROUTERS", 2)
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=chat_completion_body(request_model(request)))
+
+        async def run():
+            client = mock_api_client(handler)
+            for i in range(5):
+                await chat(client, llms("model-a", "model-b"), mode="ab_test", weights=[1, i + 1])
+            await client.aclose()
+            return client
+
+        assert len(asyncio.run(run()).routing_stats()) == 2
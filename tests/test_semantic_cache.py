@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+pytest.importorskip("numpy")
+
+from numexa import ChatCompletion  # noqa: E402
+from numexa.api_resources.semantic_cache import (  # noqa: E402
+    SemanticCache,
+    embed,
+    semantic_cache,
+)
+from tests.utils import (  # noqa: E402
+    chat,
+    chat_completion_body,
+    llms,
+    mock_api_client,
+    request_model,
+)
+
+SCOPE = "0" * 64
+
+
+class TestEmbed:
+    def test_paraphrases_are_closer_than_other_questions(self) -> None:
+        question = embed("How do I reset my password?")
+        assert float(embed("how can I reset my password") @ question) > 0.8
+        assert float(embed("How do I change my email address?") @ question) < 0.6
+
+    def test_numbers_weigh_more(self) -> None:
+        order = embed("Where is my order 1234?")
+        assert float(embed("Where is my order 1235?") @ order) < 0.6
+
+
+class TestSemanticCache:
+    def test_similar_prompt_hits_above_threshold(self) -> None:
+        cache = SemanticCache(max_entries=8, dim=256)
+        cache.set(SCOPE, "How do I reset my password?", b"reset")
+        assert cache.get(SCOPE, "how can I reset my password", threshold=0.8) == b"reset"
+        assert cache.get(SCOPE, "how can I reset my password", threshold=0.99) is None
+        assert cache.get("1" * 64, "How do I reset my password?", threshold=0.8) is None
+        assert cache.hits == 1 and cache.misses == 2
+
+    def test_lru_eviction(self) -> None:
+        cache = SemanticCache(max_entries=2, dim=256)
+        cache.set(SCOPE, "first question", b"1")
+        cache.set(SCOPE, "second question", b"2")
+        assert cache.get(SCOPE, "first question", threshold=0.99) == b"1"
+        cache.set(SCOPE, "third question", b"3")  # evicts "second question"
+        assert cache.get(SCOPE, "second question", threshold=0.99) is None
+        assert cache.stats()["entries"] == 2
+        assert cache.evictions == 1
+
+    def test_quantized_index_finds_the_best_match(self) -> None:
+        cache = SemanticCache(max_entries=64, dim=512, quantize=True, candidates=4)
+        for i in range(40):
+            cache.set(SCOPE, f"unrelated filler text number {i} about topic {i * 7}", b"x")
+        cache.set(SCOPE, "What are your opening hours?", b"hours")
+        assert cache.get(SCOPE, "what are the opening hours", threshold=0.75) == b"hours"
+
+
+class TestSemanticResponses:
+    def test_paraphrase_is_served_from_cache(self) -> None:
+        upstream: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            upstream.append(request_model(request))
+            return httpx.Response(200, json=chat_completion_body(request_model(request)))
+
+        targets = llms("model-a")
+        targets[0].cache = True
+        targets[0].cache_status = "semantic"
+        targets[0].cache_threshold = 0.8
+
+        async def run():
+            client = mock_api_client(handler)
+            results = [
+                await chat(client, targets, messages=[{"role": "user", "content": q}])
+                for q in (
+                    "How do I reset my password?",
+                    "how can I reset my password",
+                    "How do I change my email address?",
+                )
+            ]
+            await client.aclose()
+            return results
+
+        semantic_cache.clear()
+        results = asyncio.run(run())
+        assert all(isinstance(res, ChatCompletion) for res in results)
+        assert upstream == ["model-a", "model-a"]
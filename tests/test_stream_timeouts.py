@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from numexa import Completions, Config, StreamSettings
+from numexa.api_resources import apis
+from numexa.api_resources.stream_timeouts import StreamStalled
+from tests.utils import chat, llms, mock_api_client, request_model, sse_body, sse_response
+
+
+def stalled_response(model: str, before: bytes = b"") -> httpx.Response:
+    async def body():
+        if before:
+            yield before
+        await asyncio.sleep(5)
+        yield sse_body(model, ["late"])
+
+    return httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, content=body()
+    )
+
+
+def broken_response(model: str, tokens: list) -> httpx.Response:
+    async def body():
+        yield sse_body(model, tokens)[: -len(b"data: [DONE]\n\n")]
+        raise httpx.RemoteProtocolError("peer closed connection")
+
+    return httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, content=body()
+    )
+
+
+def streaming_config(*models: str, **settings) -> Config:
+    config = Config(
+        mode="fallback", llms=llms(*models), streaming=StreamSettings(**settings)
+    )
+    for target in config.llms:
+        target.retry = {"attempts": 2}
+    return config
+
+
+async def read_all(stream) -> str:
+    return "".join(
+        [chunk.choices[0].delta.get("content") or "" async for chunk in stream]
+    )
+
+
+class TestFirstTokenTimeout:
+    @pytest.mark.parametrize("before", [b"", b": ping\n\n"])
+    def test_stalled_stream_falls_back(self, before: bytes) -> None:
+        calls: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            model = request_model(request)
+            calls.append(model)
+            if model == "stalled":
+                return stalled_response(model, before)
+            return sse_response(model, ["Hel", "lo"])
+
+        config = streaming_config("stalled", "backup", first_token_timeout=0.1)
+
+        async def run():
+            client = mock_api_client(handler)
+            start = time.monotonic()
+            stream = await chat(
+                client, config.llms, mode="fallback", stream=True, config=config
+            )
+            tokens = await read_all(stream)
+            elapsed = time.monotonic() - start
+            await client.aclose()
+            return tokens, elapsed
+
+        tokens, elapsed = asyncio.run(run())
+        assert tokens == "Hello"
+        assert elapsed < 1
+        # The stalled target is not retried.
+        assert calls == ["stalled", "backup"]
+
+
+class TestIdleTimeout:
+    def test_stream_going_quiet_raises(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            model = request_model(request)
+            done = b"data: [DONE]\n\n"
+            return stalled_response(model, sse_body(model, ["Hi"])[: -len(done)])
+
+        config = streaming_config("model-a", first_token_timeout=1, idle_timeout=0.1)
+
+        async def run():
+            client = mock_api_client(handler)
+            stream = await chat(client, config.llms, stream=True, config=config)
+            tokens: list = []
+            try:
+                with pytest.raises(StreamStalled):
+                    async for chunk in stream:
+                        tokens.append(chunk.choices[0].delta.get("content"))
+            finally:
+                await client.aclose()
+            return tokens
+
+        assert asyncio.run(run()) == ["Hi"]
+
+
+class TestResume:
+    def test_broken_stream_continues_on_next_llm(self) -> None:
+        sent: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            sent.append((body["model"], body["messages"]))
+            if body["model"] == "broken":
+                return broken_response("broken", ["Hel"])
+            return sse_response(body["model"], ["lo"])
+
+        config = streaming_config("broken", "backup", resume=True)
+
+        async def run():
+            client = mock_api_client(handler)
+            stream = await chat(
+                client, config.llms, mode="fallback", stream=True, config=config
+            )
+            text = await read_all(stream)
+            idle = client.is_idle()
+            await client.aclose()
+            return text, idle
+
+        text, idle = asyncio.run(run())
+        assert text == "Hello"
+        assert idle
+        assert sent[1] == (
+            "backup",
+            [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hel"}],
+        )
+
+    def test_error_is_raised_without_a_next_llm(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            return broken_response("broken", ["Hel"])
+
+        config = streaming_config("broken", resume=True)
+
+        async def run():
+            client = mock_api_client(handler)
+            stream = await chat(client, config.llms, stream=True, config=config)
+            try:
+                with pytest.raises(httpx.RemoteProtocolError):
+                    await read_all(stream)
+            finally:
+                await client.aclose()
+
+        asyncio.run(run())
+
+    def test_broken_completion_continues_the_prompt(self, monkeypatch) -> None:
+        sent: list = []
+
+        def text_events(model: str, tokens: list) -> bytes:
+            events = [
+                "data: "
+                + json.dumps({"model": model, "choices": [{"index": 0, "text": token}]})
+                + "\n\n"
+                for token in tokens
+            ]
+            return "".join(events).encode("utf-8")
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            sent.append(body)
+            if body["model"] == "broken":
+
+                async def broken():
+                    yield text_events("broken", ["Hel"])
+                    raise httpx.RemoteProtocolError("peer closed connection")
+
+                content = broken()
+            else:
+                content = text_events(body["model"], ["lo"]) + b"data: [DONE]\n\n"
+            return httpx.Response(
+                200, headers={"content-type": "text/event-stream"}, content=content
+            )
+
+        client = mock_api_client(handler)
+        monkeypatch.setattr(apis, "get_client", lambda **kwargs: client)
+        config = streaming_config("broken", "backup", resume=True)
+
+        async def run():
+            stream = await Completions.create(prompt="Say hello: ", config=config, stream=True)
+            text = "".join([chunk.choices[0].text or "" async for chunk in stream])
+            await client.aclose()
+            return text
+
+        assert asyncio.run(run()) == "Hello"
+        assert sent[-1]["model"] == "backup"
+        assert sent[-1]["prompt"] == "Say hello: Hel"
+        assert "messages" not in sent[-1]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from numexa import AsyncStream
+from numexa.api_resources.streaming import SSEBytesDecoder, SSEDecoder
+from tests.utils import chat, llms, mock_api_client, request_model, sse_response
+
+tokens = ["Hel", "lo ", "wörld", "!"]
+
+
+class TestAsyncStream:
+    def test_async_iteration(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            # Tiny chunks split events, lines and multi-byte characters.
+            return sse_response(request_model(request), tokens, chunk_size=7)
+
+        async def run():
+            client = mock_api_client(handler)
+            stream = await chat(client, llms("model-a"), stream=True)
+            assert isinstance(stream, AsyncStream)
+            content = []
+            async for chunk in stream:
+                content.append(chunk.choices[0].delta.get("content") or "")
+            idle = client.is_idle()
+            await client.aclose()
+            return "".join(content), stream, idle
+
+        content, stream, idle = asyncio.run(run())
+        assert content == "".join(tokens)
+        assert stream.response.is_closed
+        assert idle
+
+    def test_context_manager_releases_connection_on_early_exit(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            return sse_response(request_model(request), tokens)
+
+        async def run():
+            client = mock_api_client(handler)
+            async with await chat(client, llms("model-a"), stream=True) as stream:
+                first = await stream.__anext__()
+                busy = not client.is_idle()
+            idle = client.is_idle()
+            await client.aclose()
+            return first, stream, busy, idle
+
+        first, stream, busy, idle = asyncio.run(run())
+        assert first.choices[0].delta.content == "Hel"
+        assert stream.response.is_closed
+        assert busy and idle
+
+
+def decode_lines(body: bytes) -> list:
+    decoder = SSEDecoder()
+    return [
+        (sse.event, sse.data, sse.id)
+        for sse in decoder.iter(iter(body.decode("utf-8").splitlines()))
+    ]
+
+
+def decode_chunks(body: bytes, chunk_size: int) -> list:
+    decoder = SSEBytesDecoder()
+    events = []
+    for i in range(0, len(body), chunk_size):
+        events.extend(decoder.feed(body[i : i + chunk_size]))
+    events.extend(decoder.flush())
+    return [(sse.event, sse.data, sse.id) for sse in events]
+
+
+class TestSSEBytesDecoder:
+    body = (
+        ": keep-alive\n\n"
+        "event: ping\ndata: {}\n\n"
+        'data: {"text": "naïve ☃"}\n\n'
+        "id: 7\ndata: first\ndata:second\n\n"
+        "data: [DONE]\n\n"
+    )
+
+    def test_matches_line_decoder_for_any_chunking(self) -> None:
+        body = self.body.encode("utf-8")
+        expected = decode_lines(body)
+        assert len(expected) == 4
+        for chunk_size in range(1, len(body) + 1):
+            assert decode_chunks(body, chunk_size) == expected
+
+    def test_crlf_and_cr_line_endings(self) -> None:
+        expected = decode_lines(self.body.encode("utf-8"))
+        for newline in ("\r\n", "\r"):
+            body = self.body.replace("\n", newline).encode("utf-8")
+            for chunk_size in (1, 2, 3, 5, len(body)):
+                assert decode_chunks(body, chunk_size) == expected
+
+    def test_yields_raw_payloads(self) -> None:
+        [sse] = SSEBytesDecoder().feed(b'data: {"a": 1}\n\n')
+        assert sse.raw_data == b'{"a": 1}'
+        assert sse.json() == {"a": 1}
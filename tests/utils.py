@@ -1,2 +1,104 @@
+import json
+from typing import Any, Callable, List, Optional, Sequence
+
+import httpx
+
+from numexa import ChatCompletion, ChatCompletionChunk, LLMOptions, Params
+from numexa.api_resources.base_client import APIClient
+from numexa.api_resources.streaming import AsyncStream
+
+mock_base_url = "https://numexa.mock/v1"
+
+
 def assert_matches_type(text_completion, completion, path):
     assert text_completion == completion
+
+
+def mock_api_client(handler: Callable[[httpx.Request], Any]) -> APIClient:
+    """APIClient whose requests are answered in-process by `handler`."""
+    http_client = httpx.AsyncClient(
+        base_url=mock_base_url, transport=httpx.MockTransport(handler)
+    )
+    return APIClient(base_url=mock_base_url, api_key="test-key", http_client=http_client)
+
+
+def chat_completion_body(model: str, content: str = "Hello!") -> dict:
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "created": 0,
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+    }
+
+
+def request_model(request: httpx.Request) -> str:
+    return json.loads(request.content)["model"]
+
+
+def llms(*models: str) -> List[LLMOptions]:
+    return [LLMOptions(provider="openai", model=m, api_key=f"key-{m}") for m in models]
+
+
+async def chat(
+    client: APIClient,
+    targets: Sequence[LLMOptions],
+    mode: str = "single",
+    stream: bool = False,
+    messages: Optional[list] = None,
+    params: Optional[dict] = None,
+    **kwargs: Any,
+) -> Any:
+    params = Params(
+        messages=messages or [{"role": "user", "content": "Hi"}], **(params or {})
+    )
+    return await client.post(
+        "/chat/completions",
+        body=targets,
+        mode=mode,
+        params=params,
+        cast_to=ChatCompletion,
+        stream_cls=AsyncStream[ChatCompletionChunk],
+        stream=stream,
+        **kwargs,
+    )
+
+
+def chat_completion_chunk(model: str, content: str) -> dict:
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": model,
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+    }
+
+
+def sse_body(model: str, tokens: List[str]) -> bytes:
+    events = [f"data: {json.dumps(chat_completion_chunk(model, t))}\n\n" for t in tokens]
+    events.append("data: [DONE]\n\n")
+    return "".join(events).encode("utf-8")
+
+
+def sse_response(model: str, tokens: List[str], chunk_size: int = 0) -> httpx.Response:
+    """Streamed chat completion, split into `chunk_size` byte chunks if set."""
+    body = sse_body(model, tokens)
+    if chunk_size:
+
+        async def chunks():
+            for i in range(0, len(body), chunk_size):
+                yield body[i : i + chunk_size]
+
+        content: Any = chunks()
+    else:
+        content = body
+    return httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, content=content
+    )